@@ -4,11 +4,25 @@ Main application orchestrator.
 Menangani initialization, dependency injection, dan routing ke menu.
 """
 
-from infrastructure.database.connection import get_connection
+import os
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from datetime import date
+from itertools import count, islice
+
+from infrastructure.database.connection import get_pool
+from infrastructure.repositories.antrean_tulis import AntreanTulis, AntreanTulisError
+from domain.entities.presensi import Presensi
+from domain.entities.grading_strategy import GradingFactory
+from domain.services.statistik import StatistikAkademik
 from application.use_cases.login import Login
 from loaders.db_loaders import DBLoader
+from loaders.penyegar import PenyegarState
+from loaders.snapshot import SnapshotState
 from domain.services.akademik_services import AkademikService
 from domain.services.mahasiswa_service import MahasiswaService
+from utils.konkurensi import KunciAgregat, PenghitungID, dengan_kunci
 from presentation.menus.AdminMenu import AdminMenu
 from presentation.menus.MahasiswaMenu import MahasiswaMenu
 from presentation.menus.DosenMenu import DosenMenu
@@ -18,6 +32,14 @@ class AppState:
     """
     Application state management.
     Menyimpan semua data yang dimuat dari database.
+
+    Konkurensi (banyak sesi/thread):
+    - Mutasi index berjalan di bawah `_kunci_index` (critical section pendek,
+      hanya update dict/list/counter di memori).
+    - Cek-lalu-ubah tingkat bisnis (KRS per mahasiswa, presensi per jadwal,
+      nilai per mata kuliah) memakai `kunci` (KunciAgregat) di service.
+    - Pembacaan tanpa lock: query mengembalikan salinan (list(...)) dan index
+      yang di-bisect diganti utuh (copy-on-write), bukan diubah di tempat.
     """
     def __init__(self):
         self.daftar_admin = []
@@ -27,11 +49,847 @@ class AppState:
         self.daftar_krs = []
         self.daftar_presensi = []
         self.daftar_nilai = []
-        self.next_id_presensi = 1
+        self.id_presensi = PenghitungID()  # id sementara presensi sebelum disimpan ke DB
+        self.kunci = KunciAgregat()
+        self._kunci_index = threading.RLock()
+        self._kunci_cache = threading.RLock()    # serialisasi muat/buang cache mode lazy
         self.dosen_by_id = {}
         self.mahasiswa_by_id = {}
         self.mk_by_id = {}
+        self.mk_by_kode = {}
+        self.kode_mk_terurut = []        # kode_mk terurut, untuk pencarian prefix (bisect)
         self.krs_by_id = {}
+        self.presensi_by_id = {}
+        # Agregat dashboard admin, diperbarui di setiap mutasi (lihat StatistikAkademik)
+        self.statistik = StatistikAkademik()
+        # kunci_mk -> [(tanggal, urut, presensi)] terurut tanggal, untuk query rentang tanggal
+        self.presensi_by_mk_id = {}
+        self._urut_presensi = count()
+        self.presensi_by_dosen_id = {}   # kunci_dosen -> [presensi]
+        self.presensi_by_jadwal = {}     # (kunci_dosen, kunci_mk, tanggal) -> presensi
+        # Index nilai: pasangan unik dan tampilan per dosen / per mata kuliah
+        self.nilai_by_pasangan = {}      # (id_mhs, kunci_mk) -> nilai
+        self.nilai_by_dosen_id = {}      # kunci_dosen -> {(id_mhs, kunci_mk): nilai}
+        self.nilai_by_mk_id = {}         # kunci_mk -> {id_mhs: nilai}
+        self.nilai_by_mahasiswa_id = {}  # id_mhs -> {kunci_mk: nilai}
+        # Index sekunder unik (identifier login -> objek) agar lookup O(1)
+        self.mahasiswa_by_nim = {}
+        self.dosen_by_nidn = {}
+        self.admin_by_username = {}
+        # id_mahasiswa -> list KRS (satu entri per semester yang diambil)
+        self.krs_by_mahasiswa_id = {}
+        # kunci MK -> {id_mahasiswa: Mahasiswa} (roster kelas, urut sesuai waktu ambil)
+        self.mahasiswa_by_mk_id = {}
+        # Akumulator IPK: id_mahasiswa -> [total bobot x sks, total sks]
+        self.ipk_akumulator = {}
+        # (id_mahasiswa, kunci MK) -> (bobot x sks, sks) yang sudah masuk akumulator
+        self.kontribusi_ipk = {}
+        # Mode lazy: loader dipakai untuk memuat KRS/nilai per mahasiswa on-demand.
+        # None berarti semua data sudah dimuat di awal (mode eager).
+        self.loader = None
+        self.batas_cache_mahasiswa = 1000
+        self.mahasiswa_termuat = OrderedDict()   # id_mahasiswa -> None, urutan LRU
+        # id_mahasiswa -> jumlah sesi login aktif; tidak pernah dibuang dari cache LRU
+        self.mahasiswa_aktif = {}
+        # id_log change_log terakhir yang sudah diterapkan (DBLoader.refresh);
+        # None jika database belum punya change_log
+        self.posisi_perubahan = None
+
+    @property
+    def next_id_presensi(self):
+        """ID presensi sementara berikutnya (alokasi pakai id_presensi.ambil())"""
+        return self.id_presensi.berikutnya
+
+    @next_id_presensi.setter
+    def next_id_presensi(self, nilai):
+        self.id_presensi.atur(nilai)
+
+    # ============ Snapshot (pickle) ============
+
+    # Objek runtime yang tidak ikut snapshot (lock dibuat ulang, loader lazy dipasang ulang)
+    # (sesi login aktif juga tidak ikut, dan tetap dipegang state ini saat ambil_alih)
+    _TANPA_SNAPSHOT = ("kunci", "_kunci_index", "_kunci_cache", "id_presensi", "_urut_presensi", "loader",
+                       "mahasiswa_aktif")
+
+    def __getstate__(self):
+        data = {k: v for k, v in self.__dict__.items() if k not in self._TANPA_SNAPSHOT}
+        data["_id_presensi_berikutnya"] = self.id_presensi.berikutnya
+        return data
+
+    def __setstate__(self, data):
+        berikutnya = data.pop("_id_presensi_berikutnya", 1)
+        self.__dict__.update(data)
+        self.id_presensi = PenghitungID(berikutnya)
+        self.kunci = KunciAgregat()
+        self._kunci_index = threading.RLock()
+        self._kunci_cache = threading.RLock()
+        self.loader = None
+        self.mahasiswa_aktif = {}
+        # Lanjutkan nomor urut presensi agar entri baru tidak bentrok dengan yang dipulihkan
+        urut = max((e[1] for sesi in self.presensi_by_mk_id.values() for e in sesi), default=-1)
+        self._urut_presensi = count(urut + 1)
+
+    @dengan_kunci("_kunci_index")
+    def ambil_alih(self, lain):
+        """
+        Ganti seluruh isi state dengan isi `lain` (hasil load ulang penuh ke
+        AppState terpisah). Objek state ini tetap dipakai service/menu, jadi
+        observer KRS/presensi dipindah ke method milik state ini.
+        """
+        for krs in lain.daftar_krs:
+            krs.hapus_observer(lain._on_krs_berubah)
+            krs.tambah_observer(self._on_krs_berubah)
+        for presensi in lain.daftar_presensi:
+            presensi.hapus_observer(lain._on_presensi_berubah)
+            presensi.tambah_observer(self._on_presensi_berubah)
+        for nama, nilai in vars(lain).items():
+            if nama not in self._TANPA_SNAPSHOT:
+                setattr(self, nama, nilai)
+        self.id_presensi.naikkan_ke(lain.id_presensi.berikutnya)
+        self._urut_presensi = lain._urut_presensi
+
+    # ============ Identitas (Admin/Dosen/Mahasiswa) ============
+
+    @dengan_kunci("_kunci_index")
+    def tambah_admin(self, admin):
+        """Tambah admin ke state dan index username."""
+        if admin.username in self.admin_by_username:
+            raise ValueError(f"Username admin {admin.username} sudah terdaftar")
+        self.daftar_admin.append(admin)
+        self.admin_by_username[admin.username] = admin
+        return admin
+
+    @dengan_kunci("_kunci_index")
+    def tambah_dosen(self, dosen):
+        """Tambah dosen ke state, index id dan index NIDN."""
+        if dosen.nidn in self.dosen_by_nidn:
+            raise ValueError(f"NIDN {dosen.nidn} sudah terdaftar")
+        self.daftar_dosen.append(dosen)
+        self.dosen_by_id[dosen.id] = dosen
+        self.dosen_by_nidn[dosen.nidn] = dosen
+        return dosen
+
+    @dengan_kunci("_kunci_index")
+    def tambah_mahasiswa(self, mhs):
+        """Tambah mahasiswa ke state, index id dan index NIM."""
+        if mhs.nim in self.mahasiswa_by_nim:
+            raise ValueError(f"NIM {mhs.nim} sudah terdaftar")
+        self.daftar_mahasiswa.append(mhs)
+        self.mahasiswa_by_id[mhs.id] = mhs
+        self.mahasiswa_by_nim[mhs.nim] = mhs
+        self.statistik.mahasiswa_ditambah(mhs)
+        return mhs
+
+    @dengan_kunci("_kunci_index")
+    def ganti_daftar_admin(self, daftar_admin):
+        """Ganti daftar admin sekaligus index username (dibangun dulu, lalu dipasang)"""
+        self.admin_by_username = {admin.username: admin for admin in daftar_admin}
+        self.daftar_admin = list(daftar_admin)
+
+    @dengan_kunci("_kunci_index")
+    def perbarui_dosen(self, dosen, nama, email, password, nidn, departemen):
+        """
+        Perbarui data dosen di tempat sekaligus re-key index NIDN.
+
+        Raises:
+            ValueError: Jika NIDN baru sudah dipakai dosen lain
+        """
+        lain = self.dosen_by_nidn.get(nidn)
+        if lain is not None and lain is not dosen:
+            raise ValueError(f"NIDN {nidn} sudah terdaftar")
+        if self.dosen_by_nidn.get(dosen.nidn) is dosen:
+            del self.dosen_by_nidn[dosen.nidn]
+        dosen.perbarui_akun(nama, email, password)
+        dosen.nidn = nidn
+        dosen.departemen = departemen
+        self.dosen_by_nidn[nidn] = dosen
+
+    @dengan_kunci("_kunci_index")
+    def hapus_dosen(self, dosen):
+        """Keluarkan dosen dari state beserta index id dan NIDN."""
+        self.daftar_dosen = [d for d in self.daftar_dosen if d is not dosen]
+        if self.dosen_by_id.get(dosen.id) is dosen:
+            del self.dosen_by_id[dosen.id]
+        if self.dosen_by_nidn.get(dosen.nidn) is dosen:
+            del self.dosen_by_nidn[dosen.nidn]
+
+    @dengan_kunci("_kunci_index")
+    def perbarui_mahasiswa(self, mhs, nama, email, password, nim, prodi):
+        """
+        Perbarui data mahasiswa di tempat sekaligus re-key index NIM dan counter prodi.
+
+        Raises:
+            ValueError: Jika NIM baru sudah dipakai mahasiswa lain
+        """
+        lain = self.mahasiswa_by_nim.get(nim)
+        if lain is not None and lain is not mhs:
+            raise ValueError(f"NIM {nim} sudah terdaftar")
+        if self.mahasiswa_by_nim.get(mhs.nim) is mhs:
+            del self.mahasiswa_by_nim[mhs.nim]
+        self.statistik.mahasiswa_dihapus(mhs)
+        mhs.perbarui_akun(nama, email, password)
+        mhs.nim = nim
+        mhs.prodi = prodi
+        self.mahasiswa_by_nim[nim] = mhs
+        self.statistik.mahasiswa_ditambah(mhs)
+
+    @dengan_kunci("_kunci_index")
+    def hapus_mahasiswa(self, mhs):
+        """Keluarkan mahasiswa beserta KRS, nilai dan kehadirannya dari state."""
+        self.lupakan_mahasiswa(mhs.id)
+        if not any(m is mhs for m in self.daftar_mahasiswa):
+            return
+        self.daftar_mahasiswa = [m for m in self.daftar_mahasiswa if m is not mhs]
+        if self.mahasiswa_by_id.get(mhs.id) is mhs:
+            del self.mahasiswa_by_id[mhs.id]
+        if self.mahasiswa_by_nim.get(mhs.nim) is mhs:
+            del self.mahasiswa_by_nim[mhs.nim]
+        self.statistik.mahasiswa_dihapus(mhs)
+
+    # ============ Katalog Mata Kuliah ============
+
+    @dengan_kunci("_kunci_index")
+    def tambah_mk(self, mk):
+        """Tambah mata kuliah ke katalog, index id dan index kode."""
+        if mk.kode_mk in self.mk_by_kode:
+            raise ValueError(f"Kode mata kuliah {mk.kode_mk} sudah ada")
+        self.daftar_mk.append(mk)
+        if mk.id_mk is not None:
+            self.mk_by_id[mk.id_mk] = mk
+        self.mk_by_kode[mk.kode_mk] = mk
+        self._sisip_kode_terurut(mk.kode_mk)
+        return mk
+
+    @dengan_kunci("_kunci_index")
+    def hapus_mk(self, mk):
+        """Keluarkan mata kuliah dari katalog beserta index id dan kode."""
+        self.daftar_mk = [m for m in self.daftar_mk if m is not mk]
+        if self.mk_by_id.get(mk.id_mk) is mk:
+            del self.mk_by_id[mk.id_mk]
+        if self.mk_by_kode.get(mk.kode_mk) is mk:
+            del self.mk_by_kode[mk.kode_mk]
+            self._hapus_kode_terurut(mk.kode_mk)
+
+    @dengan_kunci("_kunci_index")
+    def ganti_kode_mk(self, mk, kode_baru):
+        """
+        Ganti kode mata kuliah sekaligus re-key index kode.
+        Kode baru dicek dulu, jadi gagal tidak mengubah apa pun.
+
+        Raises:
+            ValueError: Jika kode baru sudah dipakai mata kuliah lain
+        """
+        lain = self.mk_by_kode.get(kode_baru)
+        if lain is not None and lain is not mk:
+            raise ValueError(f"Kode mata kuliah {kode_baru} sudah ada")
+        kode_lama = mk.kode_mk
+        mk.kode_mk = kode_baru
+        self.sinkron_kode_mk(mk, kode_lama)
+
+    @dengan_kunci("_kunci_index")
+    def sinkron_kode_mk(self, mk, kode_lama):
+        """Pindahkan entri index dari kode_lama ke mk.kode_mk (aman dipanggil ulang)"""
+        if kode_lama == mk.kode_mk:
+            return
+        if self.mk_by_kode.get(kode_lama) is mk:
+            del self.mk_by_kode[kode_lama]
+            self._hapus_kode_terurut(kode_lama)
+        if self.mk_by_kode.get(mk.kode_mk) is not mk:
+            self.mk_by_kode[mk.kode_mk] = mk
+            self._sisip_kode_terurut(mk.kode_mk)
+
+    @dengan_kunci("_kunci_index")
+    def ganti_id_mk(self, mk, id_baru):
+        """
+        Pakai id_mk dari database untuk mata kuliah yang tadinya belum tersimpan
+        (mode write-behind). Index yang memakai kunci_mk(mk) = objek MK dipindah
+        ke kunci id_baru, termasuk KRS.daftar_mk milik mahasiswa di roster MK
+        (agar cek MK ganda di KRS tetap mengenali MK ini).
+        """
+        lama = self.kunci_mk(mk)
+        mk.id_mk = id_baru
+        self.mk_by_id[id_baru] = mk
+        if lama is not mk:
+            return
+
+        for index in (self.mahasiswa_by_mk_id, self.nilai_by_mk_id, self.presensi_by_mk_id):
+            if lama in index:
+                index[id_baru] = index.pop(lama)
+
+        for id_mhs in self.mahasiswa_by_mk_id.get(id_baru, ()):
+            for krs in self.krs_by_mahasiswa_id.get(id_mhs, ()):
+                krs.daftar_mk.ganti_kunci(lama, mk)
+
+        pasangan = []
+        for id_mhs, nilai in self.nilai_by_mk_id.get(id_baru, {}).items():
+            p_lama, p_baru = (id_mhs, lama), (id_mhs, id_baru)
+            pasangan.append((p_lama, p_baru))
+            if p_lama in self.nilai_by_pasangan:
+                self.nilai_by_pasangan[p_baru] = self.nilai_by_pasangan.pop(p_lama)
+            if p_lama in self.kontribusi_ipk:
+                self.kontribusi_ipk[p_baru] = self.kontribusi_ipk.pop(p_lama)
+            per_dosen = self.nilai_by_dosen_id.get(self.kunci_dosen(nilai.dosen), {})
+            if p_lama in per_dosen:
+                per_dosen[p_baru] = per_dosen.pop(p_lama)
+            per_mahasiswa = self.nilai_by_mahasiswa_id.get(id_mhs, {})
+            if lama in per_mahasiswa:
+                per_mahasiswa[id_baru] = per_mahasiswa.pop(lama)
+        self.statistik.ganti_kunci_mk(lama, id_baru, pasangan)
+
+        for _, _, presensi in self.presensi_by_mk_id.get(id_baru, ()):
+            tanggal = Presensi.parse_tanggal(presensi.tanggal) or presensi.tanggal
+            kunci_lama = (self.kunci_dosen(presensi.dosen), lama, tanggal)
+            if self.presensi_by_jadwal.get(kunci_lama) is presensi:
+                del self.presensi_by_jadwal[kunci_lama]
+                self.presensi_by_jadwal[self._kunci_jadwal(presensi)] = presensi
+
+    # kode_mk_terurut diganti utuh (copy-on-write) agar pembaca bisect tanpa lock
+    def _sisip_kode_terurut(self, kode):
+        baru = list(self.kode_mk_terurut)
+        insort(baru, kode)
+        self.kode_mk_terurut = baru
+
+    def _hapus_kode_terurut(self, kode):
+        i = bisect_left(self.kode_mk_terurut, kode)
+        if i < len(self.kode_mk_terurut) and self.kode_mk_terurut[i] == kode:
+            baru = list(self.kode_mk_terurut)
+            del baru[i]
+            self.kode_mk_terurut = baru
+
+    def cari_mk_prefix(self, prefix, batas=None):
+        """
+        Mata kuliah yang kodenya diawali `prefix`, urut kode.
+        Binary search pada kode_mk_terurut: O(log n + jumlah hasil).
+
+        Args:
+            prefix: Awalan kode (mis. "IF2")
+            batas: Jumlah hasil maksimum (optional)
+
+        Returns:
+            List MataKuliah
+        """
+        return list(islice(self.iterasi_mk_prefix(prefix), batas))
+
+    def iterasi_mk_prefix(self, prefix):
+        """Generator versi cari_mk_prefix (hasil diambil sesuai kebutuhan, mis. per halaman)"""
+        kode = self.kode_mk_terurut
+        i = bisect_left(kode, prefix)
+        while i < len(kode) and kode[i].startswith(prefix):
+            mk = self.mk_by_kode.get(kode[i])
+            if mk is not None:          # bisa sudah dihapus sesi lain sejak snapshot diambil
+                yield mk
+            i += 1
+
+    # ============ KRS ============
+
+    @staticmethod
+    def kunci_mk(mk):
+        """Kunci index untuk MataKuliah: id_mk, atau objeknya jika belum tersimpan di DB"""
+        return mk.id_mk if mk.id_mk is not None else mk
+
+    @dengan_kunci("_kunci_index")
+    def tambah_krs(self, krs):
+        """
+        Daftarkan KRS ke state dan semua index-nya.
+        Aman dipanggil ulang (mis. setelah KRS disimpan dan mendapat id_krs).
+        """
+        daftar = self.krs_by_mahasiswa_id.setdefault(krs.mahasiswa.id, [])
+        if not any(k is krs for k in daftar):
+            daftar.append(krs)
+            self.daftar_krs.append(krs)
+            for mk in krs.daftar_mk:
+                self._on_krs_berubah(krs, mk, 'tambah')
+            krs.tambah_observer(self._on_krs_berubah)
+        if krs.id_krs is not None:
+            self.krs_by_id[krs.id_krs] = krs
+        return krs
+
+    @dengan_kunci("_kunci_index")
+    def _on_krs_berubah(self, krs, mk, aksi):
+        """Observer KRS: jaga roster mahasiswa_by_mk_id tetap sinkron"""
+        mhs = krs.mahasiswa
+        kunci = self.kunci_mk(mk)
+        if aksi == 'tambah':
+            roster = self.mahasiswa_by_mk_id.setdefault(kunci, {})
+            if mhs.id not in roster:
+                self.statistik.peserta_ditambah(kunci)
+            roster[mhs.id] = mhs
+            return
+
+        # Hapus dari roster hanya jika tidak ada KRS lain milik mahasiswa yang memuat MK ini
+        if any(mk in k.daftar_mk for k in self.krs_by_mahasiswa_id.get(mhs.id, ())):
+            return
+        roster = self.mahasiswa_by_mk_id.get(kunci)
+        if roster is not None and roster.pop(mhs.id, None) is not None:
+            self.statistik.peserta_dihapus(kunci)
+            if not roster:
+                del self.mahasiswa_by_mk_id[kunci]
+
+    @dengan_kunci("_kunci_index")
+    def hapus_krs(self, krs):
+        """Keluarkan KRS dari state; roster MK-nya ikut diperbarui"""
+        daftar = self.krs_by_mahasiswa_id.get(krs.mahasiswa.id, [])
+        if not any(k is krs for k in daftar):
+            return
+        sisa = [k for k in daftar if k is not krs]
+        if sisa:
+            self.krs_by_mahasiswa_id[krs.mahasiswa.id] = sisa
+        else:
+            del self.krs_by_mahasiswa_id[krs.mahasiswa.id]
+        self.daftar_krs = [k for k in self.daftar_krs if k is not krs]
+        if krs.id_krs is not None and self.krs_by_id.get(krs.id_krs) is krs:
+            del self.krs_by_id[krs.id_krs]
+        krs.hapus_observer(self._on_krs_berubah)
+        for mk in krs.daftar_mk:
+            self._on_krs_berubah(krs, mk, 'hapus')
+
+    def roster_mk(self, mk):
+        """Daftar mahasiswa yang mengambil mata kuliah (tanpa scan KRS)"""
+        return list(self.mahasiswa_by_mk_id.get(self.kunci_mk(mk), {}).values())
+
+    def mk_dipakai(self, mk):
+        """True jika mata kuliah sudah diambil minimal satu mahasiswa"""
+        return bool(self.mahasiswa_by_mk_id.get(self.kunci_mk(mk)))
+
+    # ============ Nilai & IPK ============
+
+    def kunci_dosen(self, dosen):
+        """Kunci index per dosen: id_dosen, atau objeknya jika belum punya id"""
+        id_dosen = getattr(dosen, 'id', None)
+        return dosen if id_dosen is None else id_dosen
+
+    @dengan_kunci("_kunci_index")
+    def tambah_nilai(self, nilai):
+        """Tambah nilai baru ke state, index nilai dan akumulator IPK"""
+        self.daftar_nilai.append(nilai)
+        kunci_mk = self.kunci_mk(nilai.mata_kuliah)
+        pasangan = (nilai.mahasiswa.id, kunci_mk)
+        self.nilai_by_pasangan[pasangan] = nilai
+        self.nilai_by_dosen_id.setdefault(self.kunci_dosen(nilai.dosen), {})[pasangan] = nilai
+        self.nilai_by_mk_id.setdefault(kunci_mk, {})[nilai.mahasiswa.id] = nilai
+        self.nilai_by_mahasiswa_id.setdefault(nilai.mahasiswa.id, {})[kunci_mk] = nilai
+        self.catat_nilai(nilai)
+        return nilai
+
+    def _hapus_index_nilai(self, nilai):
+        kunci_mk = self.kunci_mk(nilai.mata_kuliah)
+        pasangan = (nilai.mahasiswa.id, kunci_mk)
+        self.kontribusi_ipk.pop(pasangan, None)
+        self.statistik.nilai_dihapus(pasangan)
+        if self.nilai_by_pasangan.get(pasangan) is nilai:
+            del self.nilai_by_pasangan[pasangan]
+        for index, kunci, sub in (
+            (self.nilai_by_dosen_id, self.kunci_dosen(nilai.dosen), pasangan),
+            (self.nilai_by_mk_id, kunci_mk, nilai.mahasiswa.id),
+            (self.nilai_by_mahasiswa_id, nilai.mahasiswa.id, kunci_mk),
+        ):
+            isi = index.get(kunci)
+            if isi is not None and isi.get(sub) is nilai:
+                del isi[sub]
+                if not isi:
+                    del index[kunci]
+
+    @dengan_kunci("_kunci_index")
+    def hapus_nilai(self, nilai):
+        """Keluarkan nilai dari state, index nilai dan akumulator IPK"""
+        if not any(n is nilai for n in self.daftar_nilai):
+            return
+        self.daftar_nilai = [n for n in self.daftar_nilai if n is not nilai]
+        pasangan = (nilai.mahasiswa.id, self.kunci_mk(nilai.mata_kuliah))
+        bobot, sks = self.kontribusi_ipk.get(pasangan, (0.0, 0))
+        akumulator = self.ipk_akumulator.get(nilai.mahasiswa.id)
+        if akumulator is not None:
+            akumulator[0] -= bobot
+            akumulator[1] -= sks
+        self._hapus_index_nilai(nilai)
+
+    def cari_nilai(self, mahasiswa, mk):
+        """Nilai untuk pasangan (mahasiswa, mata kuliah) atau None (O(1))"""
+        return self.nilai_by_pasangan.get((mahasiswa.id, self.kunci_mk(mk)))
+
+    def nilai_dosen(self, dosen):
+        """Semua nilai yang diinput dosen"""
+        return list(self.nilai_by_dosen_id.get(self.kunci_dosen(dosen), {}).values())
+
+    def nilai_mk(self, mk):
+        """Semua nilai suatu mata kuliah"""
+        return list(self.nilai_by_mk_id.get(self.kunci_mk(mk), {}).values())
+
+    def nilai_mahasiswa(self, mahasiswa):
+        """Semua nilai seorang mahasiswa"""
+        return list(self.nilai_by_mahasiswa_id.get(mahasiswa.id, {}).values())
+
+    @dengan_kunci("_kunci_index")
+    def catat_nilai(self, nilai):
+        """
+        Perbarui akumulator IPK untuk satu nilai.
+        Kontribusi lama untuk pasangan (mahasiswa, MK) dikurangkan dulu,
+        jadi aman dipanggil ulang saat nilai ditimpa.
+        """
+        id_mhs = nilai.mahasiswa.id
+        kunci = (id_mhs, self.kunci_mk(nilai.mata_kuliah))
+        sks = nilai.mata_kuliah.sks
+        baru = (nilai.bobot() * sks, sks)
+        lama = self.kontribusi_ipk.get(kunci, (0.0, 0))
+
+        akumulator = self.ipk_akumulator.setdefault(id_mhs, [0.0, 0])
+        akumulator[0] += baru[0] - lama[0]
+        akumulator[1] += baru[1] - lama[1]
+        self.kontribusi_ipk[kunci] = baru
+        self.statistik.nilai_dicatat(kunci, kunci[1], nilai.nilai_huruf)
+
+    @dengan_kunci("_kunci_index")
+    def sinkron_sks_mk(self, mk):
+        """Hitung ulang kontribusi IPK semua nilai suatu MK setelah SKS-nya diubah"""
+        for nilai in self.nilai_mk(mk):
+            self.catat_nilai(nilai)
+
+    def hitung_ipk(self, mahasiswa):
+        """IPK mahasiswa dari akumulator (O(1))"""
+        total_bobot, total_sks = self.ipk_akumulator.get(mahasiswa.id, (0.0, 0))
+        if total_sks == 0:
+            return 0.0
+        return round(total_bobot / total_sks, 2)
+
+    # ============ Presensi ============
+
+    @dengan_kunci("_kunci_index")
+    def tambah_presensi(self, presensi):
+        """Tambah sesi presensi ke state, index id dan index per mata kuliah"""
+        self.daftar_presensi.append(presensi)
+        if presensi.id is not None:
+            self.presensi_by_id[presensi.id] = presensi
+        entri = (presensi.tanggal_date() or date.min, next(self._urut_presensi), presensi)
+        kunci_mk = self.kunci_mk(presensi.mata_kuliah)
+        # Copy-on-write: presensi_mk() membaca list lama tanpa lock
+        sesi = list(self.presensi_by_mk_id.get(kunci_mk, ()))
+        insort(sesi, entri)
+        self.presensi_by_mk_id[kunci_mk] = sesi
+        self.presensi_by_dosen_id.setdefault(self.kunci_dosen(presensi.dosen), []).append(presensi)
+        self.presensi_by_jadwal[self._kunci_jadwal(presensi)] = presensi
+        self.statistik.sesi_ditambah(self.kunci_mk(presensi.mata_kuliah), len(presensi.daftar_hadir))
+        presensi.tambah_observer(self._on_presensi_berubah)
+        return presensi
+
+    @dengan_kunci("_kunci_index")
+    def _on_presensi_berubah(self, presensi, mahasiswa, aksi):
+        """Observer Presensi: jaga counter kehadiran statistik tetap sinkron"""
+        kunci = self.kunci_mk(presensi.mata_kuliah)
+        if aksi == 'tambah':
+            self.statistik.hadir_ditambah(kunci)
+        else:
+            self.statistik.hadir_dihapus(kunci)
+
+    def _kunci_jadwal(self, presensi):
+        return self.kunci_jadwal(presensi.dosen, presensi.mata_kuliah, presensi.tanggal)
+
+    def kunci_jadwal(self, dosen, mk, tanggal):
+        """Kunci presensi_by_jadwal: (kunci_dosen, kunci_mk, tanggal sebagai date)"""
+        return (self.kunci_dosen(dosen), self.kunci_mk(mk), Presensi.parse_tanggal(tanggal) or tanggal)
+
+    def cari_presensi_jadwal(self, dosen, mk, tanggal):
+        """Sesi presensi dosen untuk mata kuliah dan tanggal tertentu, atau None"""
+        return self.presensi_by_jadwal.get(self.kunci_jadwal(dosen, mk, tanggal))
+
+    def presensi_dosen(self, dosen):
+        """Semua sesi presensi yang dibuat dosen"""
+        return list(self.presensi_by_dosen_id.get(self.kunci_dosen(dosen), ()))
+
+    @dengan_kunci("_kunci_index")
+    def ganti_id_presensi(self, presensi, id_baru):
+        """Pakai id dari database untuk presensi yang tadinya ber-id sementara"""
+        if self.presensi_by_id.get(presensi.id) is presensi:
+            del self.presensi_by_id[presensi.id]
+        presensi.id = presensi.id_presensi = id_baru
+        self.presensi_by_id[id_baru] = presensi
+        self.id_presensi.naikkan_ke(id_baru + 1)
+
+    @dengan_kunci("_kunci_index")
+    def hapus_presensi(self, presensi):
+        """Keluarkan sesi presensi dari state (mis. gagal disimpan ke database)"""
+        if not any(p is presensi for p in self.daftar_presensi):
+            return
+        self.daftar_presensi = [p for p in self.daftar_presensi if p is not presensi]
+        if self.presensi_by_id.get(presensi.id) is presensi:
+            del self.presensi_by_id[presensi.id]
+        presensi.hapus_observer(self._on_presensi_berubah)
+        self.statistik.sesi_dihapus(self.kunci_mk(presensi.mata_kuliah), len(presensi.daftar_hadir))
+        kunci = self.kunci_mk(presensi.mata_kuliah)
+        sisa = [e for e in self.presensi_by_mk_id.get(kunci, ()) if e[2] is not presensi]
+        if sisa:
+            self.presensi_by_mk_id[kunci] = sisa
+        else:
+            self.presensi_by_mk_id.pop(kunci, None)
+
+        kunci_dosen = self.kunci_dosen(presensi.dosen)
+        sisa = [p for p in self.presensi_by_dosen_id.get(kunci_dosen, ()) if p is not presensi]
+        if sisa:
+            self.presensi_by_dosen_id[kunci_dosen] = sisa
+        else:
+            self.presensi_by_dosen_id.pop(kunci_dosen, None)
+        if self.presensi_by_jadwal.get(self._kunci_jadwal(presensi)) is presensi:
+            del self.presensi_by_jadwal[self._kunci_jadwal(presensi)]
+
+    def presensi_mk(self, mk, dari=None, sampai=None):
+        """
+        Sesi presensi suatu mata kuliah, urut tanggal (binary search pada index).
+
+        Args:
+            mk: Objek MataKuliah
+            dari: date awal (inklusif, optional)
+            sampai: date akhir (inklusif, optional)
+
+        Returns:
+            List Presensi
+        """
+        entri = self.presensi_by_mk_id.get(self.kunci_mk(mk), ())
+        awal = bisect_left(entri, (dari,)) if dari else 0
+        akhir = bisect_right(entri, (sampai, float('inf'))) if sampai else len(entri)
+        return [e[2] for e in entri[awal:akhir]]
+
+    def presensi_terbuka(self, mahasiswa, daftar_mk, dari=None, sampai=None):
+        """
+        Sesi presensi dari `daftar_mk` yang belum diisi mahasiswa.
+        Biaya O(jumlah mata kuliah x sesi dalam rentang), tidak tergantung
+        total sesi di sistem; cek kehadiran O(1) lewat daftar_hadir.
+        """
+        hasil = []
+        for mk in daftar_mk:
+            for presensi in self.presensi_mk(mk, dari, sampai):
+                if mahasiswa not in presensi.daftar_hadir:
+                    hasil.append(presensi)
+        return hasil
+
+    # ============ Mode Lazy (cache LRU per mahasiswa) ============
+
+    @dengan_kunci("_kunci_cache")
+    def pastikan_mahasiswa_termuat(self, daftar_mahasiswa):
+        """
+        Pastikan KRS dan nilai mahasiswa sudah ada di state (mode lazy).
+        Mahasiswa yang sudah di-cache ditandai baru dipakai; sisanya dimuat
+        dengan satu query terindex, lalu cache dipangkas ke batas_cache_mahasiswa.
+        Mahasiswa yang sedang login (mulai_sesi_mahasiswa) dan yang diminta di
+        pemanggilan ini tidak dibuang, jadi cache bisa sementara melebihi batas.
+        """
+        if self.loader is None:
+            return
+        belum = []
+        for mhs in daftar_mahasiswa:
+            if mhs.id in self.mahasiswa_termuat:
+                self.mahasiswa_termuat.move_to_end(mhs.id)
+            else:
+                belum.append(mhs)
+        if belum:
+            self.loader.load_data_mahasiswa(self, belum)
+            for mhs in belum:
+                self.mahasiswa_termuat[mhs.id] = None
+
+        kelebihan = len(self.mahasiswa_termuat) - self.batas_cache_mahasiswa
+        if kelebihan <= 0:
+            return
+        dipakai = {mhs.id for mhs in daftar_mahasiswa}
+        buang = []
+        for id_mhs in self.mahasiswa_termuat:      # urutan LRU: paling lama dipakai dulu
+            if id_mhs not in dipakai and id_mhs not in self.mahasiswa_aktif:
+                buang.append(id_mhs)
+                if len(buang) == kelebihan:
+                    break
+        for id_mhs in buang:
+            self.lupakan_mahasiswa(id_mhs)
+
+    @dengan_kunci("_kunci_cache")
+    def mulai_sesi_mahasiswa(self, mhs):
+        """
+        Tandai mahasiswa sedang login lalu pastikan datanya termuat (mode lazy).
+        Selama sesinya aktif, KRS/nilai/kehadirannya tidak dibuang dari cache
+        sehingga cek KRS ganda dan tampilan nilai tetap memakai data lengkap.
+        """
+        self.mahasiswa_aktif[mhs.id] = self.mahasiswa_aktif.get(mhs.id, 0) + 1
+        try:
+            self.pastikan_mahasiswa_termuat([mhs])
+        except Exception:
+            self.akhiri_sesi_mahasiswa(mhs)
+            raise
+
+    @dengan_kunci("_kunci_cache")
+    def akhiri_sesi_mahasiswa(self, mhs):
+        """Lepas tanda login (mahasiswa kembali bisa dibuang dari cache LRU)"""
+        sisa = self.mahasiswa_aktif.get(mhs.id, 0) - 1
+        if sisa > 0:
+            self.mahasiswa_aktif[mhs.id] = sisa
+        else:
+            self.mahasiswa_aktif.pop(mhs.id, None)
+
+    def pastikan_roster_termuat(self, mk):
+        """Mode lazy: muat data semua mahasiswa yang mengambil MK ini"""
+        if self.loader is None or mk.id_mk is None:
+            return
+        ids = self.loader.cari_id_mahasiswa_by_mk(mk.id_mk)
+        daftar = [self.mahasiswa_by_id[i] for i in ids if i in self.mahasiswa_by_id]
+        self.pastikan_mahasiswa_termuat(daftar)
+
+    @dengan_kunci("_kunci_index")
+    def lupakan_mahasiswa(self, id_mhs):
+        """
+        Keluarkan KRS, nilai dan kehadiran satu mahasiswa dari state beserta
+        semua index-nya. Nilai diambil dari nilai_by_mahasiswa_id dan sesi
+        presensi dicari lewat mata kuliah di KRS (presensi_by_mk_id), bukan scan penuh.
+        """
+        self.mahasiswa_termuat.pop(id_mhs, None)
+
+        daftar_krs = self.krs_by_mahasiswa_id.pop(id_mhs, [])
+        kunci_diambil = {}
+        for krs in daftar_krs:
+            krs.hapus_observer(self._on_krs_berubah)
+            if krs.id_krs is not None:
+                self.krs_by_id.pop(krs.id_krs, None)
+            for mk in krs.daftar_mk:
+                kunci = self.kunci_mk(mk)
+                kunci_diambil[kunci] = mk
+                roster = self.mahasiswa_by_mk_id.get(kunci)
+                if roster is not None and roster.pop(id_mhs, None) is not None:
+                    self.statistik.peserta_dihapus(kunci)
+                    if not roster:
+                        del self.mahasiswa_by_mk_id[kunci]
+        if daftar_krs:
+            dibuang = {id(k) for k in daftar_krs}
+            self.daftar_krs = [k for k in self.daftar_krs if id(k) not in dibuang]
+
+        self.ipk_akumulator.pop(id_mhs, None)
+        daftar_nilai = list(self.nilai_by_mahasiswa_id.get(id_mhs, {}).values())
+        for nilai in daftar_nilai:
+            self._hapus_index_nilai(nilai)
+        if daftar_nilai:
+            dibuang = {id(n) for n in daftar_nilai}
+            self.daftar_nilai = [n for n in self.daftar_nilai if id(n) not in dibuang]
+
+        mhs = self.mahasiswa_by_id.get(id_mhs)
+        if mhs is not None:
+            for kunci in kunci_diambil:
+                for _, _, presensi in self.presensi_by_mk_id.get(kunci, ()):
+                    presensi.hapus_hadir(mhs)
+
+    def ringkasan_statistik(self):
+        """
+        Statistik untuk dashboard admin.
+        Mode eager: counter inkremental (tanpa scan). Mode lazy: state hanya
+        memuat sebagian mahasiswa, jadi agregat dihitung database.
+
+        Returns:
+            (StatistikAkademik, dict total_krs/total_nilai/total_presensi, sumber)
+            dengan sumber 'memori' atau 'database'
+        """
+        if self.loader is not None:
+            stat, total = self.loader.hitung_statistik(self)
+            return stat, total, 'database'
+        total = {
+            'total_krs': len(self.daftar_krs),
+            'total_nilai': len(self.daftar_nilai),
+            'total_presensi': len(self.daftar_presensi),
+        }
+        return self.statistik, total, 'memori'
+
+    @dengan_kunci("_kunci_index")
+    def hitung_ulang_statistik(self):
+        """
+        Hitung ulang statistik dengan scan penuh lalu pakai hasilnya.
+
+        Returns:
+            List selisih counter inkremental terhadap hasil hitung ulang
+        """
+        baru = StatistikAkademik.dari_state(self)
+        selisih = self.statistik.bandingkan(baru)
+        self.statistik = baru
+        return selisih
+
+    @dengan_kunci("_kunci_index")
+    def validasi_index(self):
+        """
+        Cek konsistensi index sekunder terhadap daftar_*.
+
+        Returns:
+            List pesan error (kosong jika konsisten)
+        """
+        errors = []
+        pasangan = [
+            ('admin_by_username', self.daftar_admin, self.admin_by_username, 'username'),
+            ('dosen_by_nidn', self.daftar_dosen, self.dosen_by_nidn, 'nidn'),
+            ('mahasiswa_by_nim', self.daftar_mahasiswa, self.mahasiswa_by_nim, 'nim'),
+            ('mk_by_kode', self.daftar_mk, self.mk_by_kode, 'kode_mk'),
+        ]
+        if self.kode_mk_terurut != sorted(self.mk_by_kode):
+            errors.append("kode_mk_terurut: tidak sama dengan kunci mk_by_kode")
+        for nama_index, daftar, index, atribut in pasangan:
+            if len(index) != len(daftar):
+                errors.append(
+                    f"{nama_index}: {len(index)} entri, daftar berisi {len(daftar)} objek"
+                )
+            for obj in daftar:
+                kunci = getattr(obj, atribut)
+                if index.get(kunci) is not obj:
+                    errors.append(f"{nama_index}: {kunci} tidak menunjuk ke objek yang benar")
+
+        jumlah_krs = sum(len(daftar) for daftar in self.krs_by_mahasiswa_id.values())
+        if jumlah_krs != len(self.daftar_krs):
+            errors.append(
+                f"krs_by_mahasiswa_id: {jumlah_krs} entri, daftar berisi {len(self.daftar_krs)} KRS"
+            )
+        for krs in self.daftar_krs:
+            daftar = self.krs_by_mahasiswa_id.get(krs.mahasiswa.id, [])
+            if not any(k is krs for k in daftar):
+                errors.append(f"krs_by_mahasiswa_id: KRS {krs.id_krs} tidak ter-index")
+
+        roster_seharusnya = {}
+        for krs in self.daftar_krs:
+            for mk in krs.daftar_mk:
+                roster_seharusnya.setdefault(self.kunci_mk(mk), set()).add(krs.mahasiswa.id)
+        roster_index = {k: set(v) for k, v in self.mahasiswa_by_mk_id.items()}
+        if roster_index != roster_seharusnya:
+            errors.append("mahasiswa_by_mk_id: roster tidak sama dengan isi daftar_krs")
+
+        kontribusi = {}
+        for nilai in self.daftar_nilai:
+            sks = nilai.mata_kuliah.sks
+            kunci = (nilai.mahasiswa.id, self.kunci_mk(nilai.mata_kuliah))
+            kontribusi[kunci] = (nilai.bobot() * sks, sks)
+        akumulator = {}
+        for (id_mhs, _), (bobot, sks) in kontribusi.items():
+            total = akumulator.setdefault(id_mhs, [0.0, 0])
+            total[0] += bobot
+            total[1] += sks
+        for id_mhs, (bobot, sks) in akumulator.items():
+            bobot_index, sks_index = self.ipk_akumulator.get(id_mhs, (0.0, 0))
+            if sks_index != sks or abs(bobot_index - bobot) > 1e-6:
+                errors.append(f"ipk_akumulator: mahasiswa {id_mhs} tidak sesuai daftar_nilai")
+
+        if len(self.nilai_by_pasangan) != len(self.daftar_nilai):
+            errors.append(
+                f"nilai_by_pasangan: {len(self.nilai_by_pasangan)} entri, "
+                f"daftar berisi {len(self.daftar_nilai)} nilai"
+            )
+        for nama_index, index in (('nilai_by_dosen_id', self.nilai_by_dosen_id),
+                                  ('nilai_by_mk_id', self.nilai_by_mk_id),
+                                  ('nilai_by_mahasiswa_id', self.nilai_by_mahasiswa_id)):
+            jumlah = sum(len(isi) for isi in index.values())
+            if jumlah != len(self.nilai_by_pasangan):
+                errors.append(f"{nama_index}: {jumlah} entri, seharusnya {len(self.nilai_by_pasangan)}")
+
+        jumlah_presensi = sum(len(entri) for entri in self.presensi_by_mk_id.values())
+        if jumlah_presensi != len(self.daftar_presensi):
+            errors.append(
+                f"presensi_by_mk_id: {jumlah_presensi} entri, "
+                f"daftar berisi {len(self.daftar_presensi)} presensi"
+            )
+        if len(self.presensi_by_jadwal) != len(self.daftar_presensi):
+            errors.append(
+                f"presensi_by_jadwal: {len(self.presensi_by_jadwal)} entri, "
+                f"daftar berisi {len(self.daftar_presensi)} presensi"
+            )
+        for entri in self.presensi_by_mk_id.values():
+            if [e[:2] for e in entri] != sorted(e[:2] for e in entri):
+                errors.append("presensi_by_mk_id: entri tidak urut tanggal")
+                break
+        return errors
 
 
 class SistemAkademik:
@@ -40,32 +898,163 @@ class SistemAkademik:
     Menangani initialization, dependency injection, dan menu routing.
     """
     
-    def __init__(self):
-        """Initialize application dan load data dari database"""
+    def __init__(self, mode_load=None, write_behind=None, snapshot=None, refresh_interval=None):
+        """
+        Initialize application dan load data dari database.
+
+        Args:
+            mode_load: 'eager' (semua data dimuat di awal) atau 'lazy'
+                (KRS/nilai dimuat per mahasiswa saat login).
+                Default dari env SIAK_LOAD_MODE, atau 'eager'.
+            write_behind: True agar simpan MK/nilai/KRS dari menu dicatat ke
+                jurnal lokal dan dikirim ke database di background.
+                Default dari env SIAK_WRITE_BEHIND (1 = aktif).
+            snapshot: True agar mode eager memakai snapshot biner AppState
+                (warm start: hanya baris yang berubah diambil dari database).
+                Default dari env SIAK_SNAPSHOT (1 = aktif).
+            refresh_interval: Detik antar refresh delta state di background
+                (perubahan dari node lain/SQL langsung lewat change_log).
+                Default dari env SIAK_REFRESH_INTERVAL; 0 = nonaktif.
+        """
+        self.mode_load = mode_load or os.environ.get("SIAK_LOAD_MODE", "eager")
+        if write_behind is None:
+            write_behind = os.environ.get("SIAK_WRITE_BEHIND", "0") == "1"
+        self.write_behind = write_behind
+        if snapshot is None:
+            snapshot = os.environ.get("SIAK_SNAPSHOT", "0") == "1"
+        self.snapshot = snapshot
+        if refresh_interval is None:
+            refresh_interval = float(os.environ.get("SIAK_REFRESH_INTERVAL", "0"))
+        self.refresh_interval = refresh_interval
+        self.antrean = None
+        self.penyegar = None
         self.state = AppState()
-        self.conn = self._initialize_database()
+        self.state.batas_cache_mahasiswa = int(
+            os.environ.get("SIAK_CACHE_MAHASISWA", self.state.batas_cache_mahasiswa)
+        )
+        folder_skala = os.environ.get("SIAK_GRADING_DIR")
+        if folder_skala:
+            try:
+                skala = GradingFactory.register_from_directory(folder_skala)
+                print(f"[OK] Skala grading dimuat: {', '.join(skala) or '-'}")
+            except (OSError, ValueError) as e:
+                print(f"[WARNING] Gagal memuat skala grading: {e}")
+        self.pool = self._initialize_database()
         self._setup_services()
         self._setup_menus()
 
     def _initialize_database(self):
         """
-        Initialize database connection dan load data.
+        Initialize connection pool dan load data.
         
         Returns:
-            Database connection object atau None jika gagal
+            ConnectionPool atau None jika gagal koneksi
         """
-        conn = get_connection()
+        pool = get_pool()
 
-        if conn:
+        if pool and self.write_behind:
+            self.antrean = self._initialize_antrean(pool)
+
+        if pool:
             try:
-                DBLoader(conn).load_all(self.state)
-                print("[OK] Data berhasil dimuat dari database")
+                loader = DBLoader(pool)
+                if self.mode_load == "lazy":
+                    loader.load_awal(self.state)
+                    self.state.loader = loader
+                    print("[OK] Data awal dimuat (mode lazy)")
+                elif self.snapshot:
+                    self._load_snapshot(loader)
+                else:
+                    loader.load_all(self.state)
+                    print("[OK] Data berhasil dimuat dari database")
+                    self._cetak_waktu_muat(loader)
+                for error in self.state.validasi_index():
+                    print(f"[WARNING] Index tidak konsisten: {error}")
+                if self.refresh_interval > 0:
+                    self.penyegar = self._initialize_penyegar(loader)
             except Exception as e:
                 print(f"[WARNING] Gagal load data: {str(e)}")
         else:
             print("[WARNING] Gagal koneksi ke database. Data hanya ada di memori.")
         
-        return conn
+        return pool
+
+    def _load_snapshot(self, loader):
+        """Load eager lewat snapshot biner (warm start) dan ganti self.state"""
+        snapshot = SnapshotState()
+        state, ringkasan = loader.load_snapshot(self.state, snapshot)
+        state.batas_cache_mahasiswa = self.state.batas_cache_mahasiswa
+        self.state = state
+        if ringkasan["mode"] == "hangat":
+            keterangan = f"{ringkasan['baris_baru']} baris baru"
+            if ringkasan["dimuat_ulang"]:
+                keterangan += f", dimuat ulang: {', '.join(ringkasan['dimuat_ulang'])}"
+            print(f"[OK] Data dimuat dari snapshot {snapshot.path} ({keterangan})")
+        else:
+            print("[OK] Data berhasil dimuat dari database (snapshot dibuat ulang)")
+            self._cetak_waktu_muat(loader)
+        if "peringatan" in ringkasan:
+            print(f"[WARNING] {ringkasan['peringatan']}")
+
+    def _cetak_waktu_muat(self, loader):
+        """Ringkasan durasi load_all: total dan tahap fetch/link terlama"""
+        waktu = loader.waktu_muat
+        if not waktu or not waktu["link"]:
+            return
+        fetch = max(waktu["fetch"].items(), key=lambda x: x[1])
+        link = max(waktu["link"].items(), key=lambda x: x[1])
+        print(f"[OK] Waktu muat {waktu['total']:.2f} s ({waktu['paralel']} koneksi fetch); "
+              f"terlama: fetch {fetch[0]} {fetch[1]:.2f} s, link {link[0]} {link[1]:.2f} s")
+
+    def _initialize_antrean(self, pool):
+        """
+        Siapkan antrean write-behind: replay jurnal dari sesi sebelumnya
+        dulu (sebelum data dimuat) lalu jalankan flusher.
+
+        Returns:
+            AntreanTulis, atau None jika jurnal tidak bisa dipakai
+        """
+        try:
+            antrean = AntreanTulis(pool)
+        except (AntreanTulisError, OSError) as e:
+            print(f"[WARNING] Jurnal write-behind tidak bisa dibuka, simpan langsung ke database: {e}")
+            return None
+        try:
+            jumlah = antrean.replay()
+            if jumlah:
+                print(f"[OK] {jumlah} perubahan dari jurnal dikirim ke database")
+        except AntreanTulisError as e:
+            # Entri tetap di jurnal; flusher mencoba lagi di background
+            print(f"[WARNING] {e}")
+        antrean.mulai()
+        print(f"[OK] Mode write-behind aktif (jurnal: {antrean.path})")
+        return antrean
+
+    def _initialize_penyegar(self, loader):
+        """
+        Jalankan refresh delta berkala di background.
+
+        Returns:
+            PenyegarState, atau None jika database belum punya change_log
+        """
+        if self.state.posisi_perubahan is None:
+            print("[WARNING] Tabel change_log belum ada (lihat siak.sql), refresh berkala tidak dijalankan")
+            return None
+        penyegar = PenyegarState(loader, self.state, self.refresh_interval, self.antrean)
+        penyegar.mulai()
+        print(f"[OK] Refresh state tiap {penyegar.interval:g} detik (posisi change_log {self.state.posisi_perubahan})")
+        return penyegar
+
+    def tutup(self, batas_waktu=10.0):
+        """Hentikan refresh berkala dan kirim sisa antrean write-behind sebelum aplikasi keluar"""
+        if self.penyegar is not None:
+            self.penyegar.berhenti(batas_waktu)
+            self.penyegar = None
+        if self.antrean is not None:
+            sisa = self.antrean.berhenti(batas_waktu)
+            if sisa:
+                print(f"[WARNING] {sisa} perubahan belum terkirim, disimpan di jurnal untuk startup berikutnya")
+            self.antrean = None
 
     def _setup_services(self):
         """Setup service layer dengan dependency injection"""
@@ -74,9 +1063,21 @@ class SistemAkademik:
 
     def _setup_menus(self):
         """Setup menu dengan dependency injection"""
-        self.admin_menu = AdminMenu(self.state, self.akademik_service, self.conn)
-        self.mhs_menu = MahasiswaMenu(self.state, self.akademik_service, self.conn)
-        self.dosen_menu = DosenMenu(self.state, self.akademik_service, self.conn)
+        self.admin_menu = AdminMenu(self.state, self.akademik_service, self.pool, self.antrean)
+        self.mhs_menu = MahasiswaMenu(self.state, self.akademik_service, self.pool, self.antrean)
+        self.dosen_menu = DosenMenu(self.state, self.akademik_service, self.pool, self.antrean)
+
+    def jalankan(self):
+        """Loop login sampai user memilih keluar (satu sesi terminal)"""
+        while True:
+            self.login()
+            lagi = input("\nIngin login lagi? (y/n): ").lower()
+            if lagi == 'n':
+                print("Keluar dari sistem.")
+                break
+            elif lagi != 'y':
+                print("Input tidak valid. Keluar dari sistem.")
+                break
 
     def login(self):
         """
@@ -108,8 +1109,12 @@ class SistemAkademik:
         mhs = self.akademik_service.cari_mahasiswa_by_nim(nim)
         
         if mhs and mhs.password == password:
-            print(f"\n[OK] Login berhasil. Selamat datang, {mhs.nama}!")
-            self.mhs_menu.run(mhs)
+            self.state.mulai_sesi_mahasiswa(mhs)
+            try:
+                print(f"\n[OK] Login berhasil. Selamat datang, {mhs.nama}!")
+                self.mhs_menu.run(mhs)
+            finally:
+                self.state.akhiri_sesi_mahasiswa(mhs)
         else:
             print("[ERROR] Mahasiswa tidak ditemukan atau password salah")
 
@@ -125,13 +1130,9 @@ class SistemAkademik:
 
     def _login_admin(self, username, password):
         """Login handler untuk admin"""
-        admin = next(
-            (a for a in self.state.daftar_admin
-             if a.username == username and a.password == password),
-            None
-        )
+        admin = self.state.admin_by_username.get(username)
         
-        if admin:
+        if admin and admin.password == password:
             print(f"\n[OK] Login berhasil. Selamat datang, Admin {admin.username}!")
             self.admin_menu.run(admin)
         else:
@@ -16,6 +16,12 @@ class User:
         """Getter untuk password"""
         return self.__password
 
+    def perbarui_akun(self, nama, email, password):
+        """Samakan data akun dengan baris users terbaru di database"""
+        self.nama = nama
+        self.__email = email
+        self.__password = password
+
     def tampilkan_profil(self):
         print(f"ID      : {self.id}")
         print(f"Nama    : {self.nama}")
@@ -1,4 +1,7 @@
 # Application - Use Cases
 from .login import Login
+from .import_nilai import ImportNilai, ImportNilaiError, HasilImport
+from .export_laporan import ExportLaporan, ExportLaporanError, HasilExport
 
-__all__ = ['Login']
+__all__ = ['Login', 'ImportNilai', 'ImportNilaiError', 'HasilImport',
+           'ExportLaporan', 'ExportLaporanError', 'HasilExport']
@@ -0,0 +1,263 @@
+"""
+application/use_cases/export_laporan.py
+Use case export transkrip mahasiswa dan lembar nilai mata kuliah ke CSV / JSON Lines.
+
+Data dibaca langsung dari database lewat cursor streaming NilaiRepository
+(tanpa fetchall) dan ditulis baris per baris. Yang ditahan di memori hanya
+satu grup (nilai satu mahasiswa atau satu mata kuliah), jadi export seluruh
+universitas tetap memakai memori terbatas.
+"""
+
+import csv
+import json
+import os
+from collections import Counter
+from itertools import groupby
+from operator import itemgetter
+
+from domain.entities.nilai import bobot_huruf
+from infrastructure.repositories.base_repository import RepositoryError
+
+
+class ExportLaporanError(Exception):
+    """Custom exception untuk ExportLaporan"""
+    pass
+
+
+class HasilExport:
+    """Ringkasan hasil export"""
+
+    def __init__(self, path):
+        self.path = path
+        self.jumlah_grup = 0      # mahasiswa (transkrip) atau mata kuliah (lembar nilai)
+        self.jumlah_nilai = 0
+
+
+class PenulisCSV:
+    """
+    Tulis record transkrip/lembar nilai sebagai CSV.
+    Satu baris per nilai, ditutup satu baris ringkasan per grup.
+    """
+
+    def __init__(self, f, kolom_grup, kolom_nilai, kolom_ringkasan):
+        self._writer = csv.writer(f)
+        self._kolom_grup = kolom_grup
+        self._kolom_nilai = kolom_nilai
+        self._kolom_ringkasan = kolom_ringkasan
+        self._writer.writerow(kolom_grup + kolom_nilai + kolom_ringkasan)
+
+    def tulis(self, grup, daftar_nilai, ringkasan):
+        awal = [grup[k] for k in self._kolom_grup]
+        kosong_ringkasan = [''] * len(self._kolom_ringkasan)
+        for nilai in daftar_nilai:
+            self._writer.writerow(awal + [nilai[k] for k in self._kolom_nilai] + kosong_ringkasan)
+        self._writer.writerow(
+            awal + [''] * len(self._kolom_nilai)
+            + [self._sel(ringkasan[k]) for k in self._kolom_ringkasan]
+        )
+
+    @staticmethod
+    def _sel(nilai):
+        # Dict (mis. distribusi huruf) diratakan jadi "A=3 B+=2"
+        if isinstance(nilai, dict):
+            return " ".join(f"{k}={v}" for k, v in nilai.items())
+        return nilai
+
+
+class PenulisJSONL:
+    """Tulis satu objek JSON per grup (data grup, list nilai, ringkasan) per baris"""
+
+    def __init__(self, f, kolom_grup, kolom_nilai, kolom_ringkasan):
+        self._f = f
+
+    def tulis(self, grup, daftar_nilai, ringkasan):
+        record = dict(grup)
+        record['nilai'] = daftar_nilai
+        record.update(ringkasan)
+        self._f.write(json.dumps(record, ensure_ascii=False))
+        self._f.write('\n')
+
+
+class ExportLaporan:
+    """
+    Export laporan nilai dari database.
+
+    - ekspor_transkrip: transkrip per mahasiswa (nilai, SKS, IPK)
+    - ekspor_lembar_nilai: lembar nilai per mata kuliah (rata-rata, distribusi huruf)
+
+    File ditulis ke `<path>.tmp` lalu di-rename, jadi file tujuan tidak pernah
+    berisi export setengah jadi.
+    """
+
+    FORMAT = {
+        'csv': PenulisCSV,
+        'jsonl': PenulisJSONL,
+    }
+
+    KOLOM_MAHASISWA = ['nim', 'nama', 'prodi', 'angkatan']
+    KOLOM_NILAI_TRANSKRIP = ['kode_mk', 'nama_mk', 'sks', 'nilai_angka', 'nilai_huruf']
+    KOLOM_RINGKASAN_TRANSKRIP = ['total_sks', 'ipk']
+
+    KOLOM_MATA_KULIAH = ['kode_mk', 'nama_mk', 'sks', 'dosen']
+    KOLOM_NILAI_LEMBAR = ['nim', 'nama', 'nilai_angka', 'nilai_huruf']
+    KOLOM_RINGKASAN_LEMBAR = ['jumlah_peserta', 'rata_rata', 'distribusi']
+
+    def __init__(self, nilai_repo, ukuran_batch=None):
+        """
+        Args:
+            nilai_repo: NilaiRepository (sumber data streaming)
+            ukuran_batch: Jumlah baris per fetch dari database (default ukuran_fetch repository)
+        """
+        self.nilai_repo = nilai_repo
+        self.ukuran_batch = ukuran_batch
+
+    @classmethod
+    def get_available_formats(cls):
+        """Dapatkan daftar format export yang tersedia"""
+        return list(cls.FORMAT.keys())
+
+    def ekspor_transkrip(self, path, format='csv', prodi=None, angkatan=None, tahun_ajaran=None):
+        """
+        Export transkrip semua mahasiswa yang lolos filter.
+
+        Args:
+            path: Path file tujuan
+            format: 'csv' atau 'jsonl'
+            prodi: Filter prodi (optional)
+            angkatan: Filter angkatan (optional)
+            tahun_ajaran: Hanya nilai dari KRS tahun ajaran ini (optional);
+                IPK dihitung dari nilai yang ikut diexport
+
+        Returns:
+            HasilExport
+
+        Raises:
+            ExportLaporanError: Jika format tidak dikenal, query gagal, atau file tidak bisa ditulis
+        """
+        baris = self.nilai_repo.iterasi_transkrip(
+            prodi=prodi, angkatan=angkatan, tahun_ajaran=tahun_ajaran,
+            ukuran_batch=self.ukuran_batch
+        )
+        return self._ekspor(
+            path, format, baris,
+            (self.KOLOM_MAHASISWA, self.KOLOM_NILAI_TRANSKRIP, self.KOLOM_RINGKASAN_TRANSKRIP),
+            self._grup_transkrip
+        )
+
+    def ekspor_lembar_nilai(self, path, format='csv', id_dosen=None, prodi=None,
+                            angkatan=None, tahun_ajaran=None):
+        """
+        Export lembar nilai per mata kuliah.
+
+        Args:
+            path: Path file tujuan
+            format: 'csv' atau 'jsonl'
+            id_dosen: Hanya mata kuliah dosen ini (optional, default semua dosen)
+            prodi, angkatan, tahun_ajaran: Filter mahasiswa (lihat ekspor_transkrip)
+
+        Returns:
+            HasilExport
+
+        Raises:
+            ExportLaporanError: Jika format tidak dikenal, query gagal, atau file tidak bisa ditulis
+        """
+        baris = self.nilai_repo.iterasi_lembar_nilai(
+            id_dosen=id_dosen, prodi=prodi, angkatan=angkatan, tahun_ajaran=tahun_ajaran,
+            ukuran_batch=self.ukuran_batch
+        )
+        return self._ekspor(
+            path, format, baris,
+            (self.KOLOM_MATA_KULIAH, self.KOLOM_NILAI_LEMBAR, self.KOLOM_RINGKASAN_LEMBAR),
+            self._grup_lembar_nilai
+        )
+
+    # ============ Helper ============
+
+    def _ekspor(self, path, format, baris, kolom, bangun_grup):
+        if format not in self.FORMAT:
+            raise ExportLaporanError(
+                f"Format tidak dikenal: {format}. Pilihan: {', '.join(self.FORMAT)}"
+            )
+
+        hasil = HasilExport(path)
+        path_tmp = f"{path}.tmp"
+        selesai = False
+        try:
+            with open(path_tmp, 'w', newline='', encoding='utf-8') as f:
+                penulis = self.FORMAT[format](f, *kolom)
+                for grup, daftar_nilai, ringkasan in bangun_grup(baris):
+                    penulis.tulis(grup, daftar_nilai, ringkasan)
+                    hasil.jumlah_grup += 1
+                    hasil.jumlah_nilai += len(daftar_nilai)
+            os.replace(path_tmp, path)
+            selesai = True
+        except (OSError, RepositoryError) as e:
+            raise ExportLaporanError(f"Export gagal: {e}")
+        finally:
+            # Kembalikan koneksi segera walau export berhenti di tengah, dan
+            # jangan tinggalkan file sementara apa pun penyebab gagalnya
+            baris.close()
+            if not selesai:
+                try:
+                    os.remove(path_tmp)
+                except OSError:
+                    pass
+        return hasil
+
+    def _grup_transkrip(self, baris):
+        """Kelompokkan baris per mahasiswa dan hitung IPK sambil jalan"""
+        for _, rows in groupby(baris, key=itemgetter(0)):
+            daftar_nilai = []
+            total_bobot = 0.0
+            total_sks = 0
+            for (_, nim, nama, prodi, angkatan, kode_mk, nama_mk,
+                 sks, nilai_angka, nilai_huruf, bobot) in rows:
+                daftar_nilai.append({
+                    'kode_mk': kode_mk,
+                    'nama_mk': nama_mk,
+                    'sks': sks,
+                    'nilai_angka': _angka(nilai_angka),
+                    'nilai_huruf': nilai_huruf,
+                })
+                total_bobot += bobot_huruf(nilai_huruf, bobot) * sks
+                total_sks += sks
+
+            grup = {'nim': nim, 'nama': nama, 'prodi': prodi, 'angkatan': angkatan}
+            ipk = round(total_bobot / total_sks, 2) if total_sks else 0.0
+            yield grup, daftar_nilai, {'total_sks': total_sks, 'ipk': ipk}
+
+    def _grup_lembar_nilai(self, baris):
+        """Kelompokkan baris per mata kuliah dan hitung rata-rata serta distribusi"""
+        for _, rows in groupby(baris, key=itemgetter(0)):
+            daftar_nilai = []
+            total = 0.0
+            distribusi = Counter()
+            for (_, kode_mk, nama_mk, sks, nama_dosen, nim, nama,
+                 nilai_angka, nilai_huruf) in rows:
+                angka = _angka(nilai_angka)
+                daftar_nilai.append({
+                    'nim': nim,
+                    'nama': nama,
+                    'nilai_angka': angka,
+                    'nilai_huruf': nilai_huruf,
+                })
+                total += angka or 0.0
+                distribusi[nilai_huruf] += 1
+
+            grup = {'kode_mk': kode_mk, 'nama_mk': nama_mk, 'sks': sks, 'dosen': nama_dosen}
+            ringkasan = {
+                'jumlah_peserta': len(daftar_nilai),
+                'rata_rata': round(total / len(daftar_nilai), 2),
+                'distribusi': dict(sorted(distribusi.items(), key=_kunci_huruf)),
+            }
+            yield grup, daftar_nilai, ringkasan
+
+
+def _angka(nilai_angka):
+    """DECIMAL dari MySQL -> float (JSON tidak bisa serialisasi Decimal)"""
+    return float(nilai_angka) if nilai_angka is not None else None
+
+
+def _kunci_huruf(item):
+    huruf = item[0] or ''
+    return (huruf[:1], {'+': 0, '': 1, '-': 2}.get(huruf[1:], 1))
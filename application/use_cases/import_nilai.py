@@ -0,0 +1,184 @@
+"""
+application/use_cases/import_nilai.py
+Use case import nilai akhir semester dari file CSV (ekspor spreadsheet).
+
+File dibaca baris per baris dan ditulis per chunk, jadi memori yang dipakai
+pipeline konstan berapa pun jumlah barisnya.
+"""
+
+import csv
+
+from domain.entities.grading_strategy import GradingFactory
+from domain.entities.nilai import Nilai
+from domain.services.dosen_service import DosenServiceError
+from infrastructure.repositories.base_repository import RepositoryError
+
+
+class ImportNilaiError(Exception):
+    """Custom exception untuk ImportNilai (file tidak bisa diproses sama sekali)"""
+    pass
+
+
+class HasilImport:
+    """Ringkasan hasil import nilai"""
+
+    def __init__(self, maks_error):
+        self.total_baris = 0
+        self.berhasil = 0
+        self.jumlah_error = 0
+        self.errors = []             # (nomor_baris, pesan), maksimal maks_error entri
+        self._maks_error = maks_error
+
+    def catat_error(self, nomor_baris, pesan):
+        self.jumlah_error += 1
+        if len(self.errors) < self._maks_error:
+            self.errors.append((nomor_baris, pesan))
+
+
+class ImportNilai:
+    """
+    Import nilai satu mata kuliah dari CSV.
+
+    Format file: header dengan kolom `nim` dan `nilai` (atau `nilai_angka`),
+    pemisah koma, titik koma, atau tab. Setiap baris divalidasi dengan
+    DosenService.validasi_input_nilai dan roster mata kuliah, dikonversi
+    dengan GradingStrategy terpilih, lalu ditulis per chunk lewat
+    NilaiRepository.simpan_banyak (satu transaksi per chunk). Baris yang
+    salah atau chunk yang gagal disimpan dicatat tanpa menghentikan import.
+    """
+
+    KOLOM_NIM = ('nim',)
+    KOLOM_NILAI = ('nilai', 'nilai_angka')
+
+    def __init__(self, state, dosen_service, nilai_repo=None, strategy=None,
+                 ukuran_chunk=1000, maks_error=1000):
+        """
+        Args:
+            state: AppState
+            dosen_service: DosenService (validasi dan update state)
+            nilai_repo: NilaiRepository TANPA state (optional). State diperbarui
+                lewat dosen_service setelah chunk berhasil di-commit.
+            strategy: GradingStrategy (default skala GradingFactory.DEFAULT)
+            ukuran_chunk: Jumlah baris per transaksi
+            maks_error: Jumlah pesan error per baris yang disimpan di hasil
+        """
+        self.state = state
+        self.dosen_service = dosen_service
+        self.nilai_repo = nilai_repo
+        self.strategy = strategy or GradingFactory.create_strategy(GradingFactory.DEFAULT)
+        self.ukuran_chunk = ukuran_chunk
+        self.maks_error = maks_error
+
+    def jalankan(self, path, dosen, mata_kuliah):
+        """
+        Import file nilai untuk satu mata kuliah.
+
+        Args:
+            path: Path file CSV
+            dosen: Dosen pengampu
+            mata_kuliah: MataKuliah tujuan
+
+        Returns:
+            HasilImport
+
+        Raises:
+            ImportNilaiError: Jika file tidak bisa dibaca atau header tidak dikenal
+        """
+        try:
+            with open(path, newline='', encoding='utf-8-sig') as f:
+                return self.jalankan_stream(f, dosen, mata_kuliah)
+        except OSError as e:
+            raise ImportNilaiError(f"Gagal membuka file {path}: {e}")
+
+    def jalankan_stream(self, baris_file, dosen, mata_kuliah):
+        """Import dari file object / iterable baris teks (lihat jalankan)"""
+        reader = self._buat_reader(baris_file)
+        i_nim, i_nilai = self._cari_kolom(next(reader, None))
+
+        self.state.pastikan_roster_termuat(mata_kuliah)
+        roster = self.state.mahasiswa_by_mk_id.get(self.state.kunci_mk(mata_kuliah), {})
+
+        hasil = HasilImport(self.maks_error)
+        chunk = []
+        for row in reader:
+            if not any(kolom.strip() for kolom in row):
+                continue
+            hasil.total_baris += 1
+            nomor_baris = reader.line_num
+            entri = self._validasi_baris(row, i_nim, i_nilai, mata_kuliah, roster)
+            if isinstance(entri, str):
+                hasil.catat_error(nomor_baris, entri)
+                continue
+            chunk.append((nomor_baris,) + entri)
+            if len(chunk) >= self.ukuran_chunk:
+                self._proses_chunk(chunk, dosen, mata_kuliah, hasil)
+                chunk = []
+        if chunk:
+            self._proses_chunk(chunk, dosen, mata_kuliah, hasil)
+        return hasil
+
+    # ============ Helper ============
+
+    def _buat_reader(self, baris_file):
+        baris_file = iter(baris_file)
+        header = next(baris_file, '')
+        try:
+            dialect = csv.Sniffer().sniff(header, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+
+        def semua_baris():
+            yield header
+            yield from baris_file
+
+        return csv.reader(semua_baris(), dialect)
+
+    def _cari_kolom(self, header):
+        if not header:
+            raise ImportNilaiError("File kosong")
+        nama = [h.strip().lower() for h in header]
+        i_nim = next((nama.index(k) for k in self.KOLOM_NIM if k in nama), None)
+        i_nilai = next((nama.index(k) for k in self.KOLOM_NILAI if k in nama), None)
+        if i_nim is None or i_nilai is None:
+            raise ImportNilaiError("Header wajib berisi kolom 'nim' dan 'nilai'")
+        return i_nim, i_nilai
+
+    def _validasi_baris(self, row, i_nim, i_nilai, mata_kuliah, roster):
+        """Kembalikan (mahasiswa, nilai_angka) atau pesan error"""
+        if len(row) <= max(i_nim, i_nilai):
+            return "Jumlah kolom kurang"
+        nim = row[i_nim].strip()
+        mhs = self.state.mahasiswa_by_nim.get(nim)
+        if mhs is None:
+            return f"NIM {nim} tidak ditemukan"
+        if mhs.id not in roster:
+            return f"NIM {nim} tidak terdaftar di {mata_kuliah.kode_mk}"
+
+        teks_nilai = row[i_nilai].strip().replace(',', '.')
+        errors = self.dosen_service.validasi_input_nilai(mhs, mata_kuliah, teks_nilai)
+        if errors:
+            return "; ".join(errors)
+        return mhs, float(teks_nilai)
+
+    def _proses_chunk(self, chunk, dosen, mata_kuliah, hasil):
+        """Konversi satu chunk, simpan dalam satu transaksi, lalu perbarui state"""
+        daftar_huruf, daftar_bobot = self.strategy.konversi_batch([angka for _, _, angka in chunk])
+
+        if self.nilai_repo:
+            try:
+                self.nilai_repo.simpan_banyak([
+                    Nilai(dosen, mata_kuliah, mhs, angka, nilai_huruf=huruf, nilai_bobot=bobot)
+                    for (_, mhs, angka), huruf, bobot in zip(chunk, daftar_huruf, daftar_bobot)
+                ])
+            except RepositoryError as e:
+                for nomor_baris, _, _ in chunk:
+                    hasil.catat_error(nomor_baris, f"Gagal disimpan: {e}")
+                return
+
+        for (nomor_baris, mhs, angka), huruf, bobot in zip(chunk, daftar_huruf, daftar_bobot):
+            try:
+                self.dosen_service.input_nilai(dosen, mhs, mata_kuliah, angka,
+                                               nilai_huruf=huruf, nilai_bobot=bobot)
+                hasil.berhasil += 1
+            except DosenServiceError as e:
+                hasil.catat_error(nomor_baris, str(e))
@@ -0,0 +1,65 @@
+"""
+benchmarks/bench_grading.py
+Perbandingan konversi nilai: if/elif (lama), bisect skalar, dan konversi_batch.
+
+Data sintetis di memori (tanpa database). Jalankan dari root project:
+    python -m benchmarks.bench_grading [jumlah_nilai]
+"""
+
+import random
+import sys
+import time
+
+from domain.entities.grading_strategy import GradingFactory
+
+
+def konversi_if_elif(nilai_angka):
+    """Rantai if/elif skala standar seperti implementasi sebelum tabel"""
+    if nilai_angka >= 80:
+        return 'A', 4.0
+    elif nilai_angka >= 75:
+        return 'A-', 3.7
+    elif nilai_angka >= 70:
+        return 'B+', 3.3
+    elif nilai_angka >= 65:
+        return 'B', 3.0
+    elif nilai_angka >= 60:
+        return 'B-', 2.7
+    elif nilai_angka >= 55:
+        return 'C+', 2.3
+    elif nilai_angka >= 50:
+        return 'C', 2.0
+    elif nilai_angka >= 45:
+        return 'C-', 1.7
+    elif nilai_angka >= 40:
+        return 'D+', 1.3
+    elif nilai_angka >= 35:
+        return 'D', 1.0
+    else:
+        return 'E', 0.0
+
+
+def ukur(label, fungsi, jumlah):
+    mulai = time.perf_counter()
+    hasil = fungsi()
+    durasi = time.perf_counter() - mulai
+    print(f"{label:<32} {durasi * 1000:10.1f} ms   {durasi * 1e9 / jumlah:8.1f} ns/nilai")
+    return hasil
+
+
+def main():
+    jumlah = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    random.seed(42)
+    daftar_nilai = [round(random.uniform(0, 100), 1) for _ in range(jumlah)]
+    strategi = GradingFactory.create_strategy('standard')
+    print(f"Konversi {jumlah} nilai (skala standard)\n")
+
+    lama = ukur("skalar if/elif", lambda: [konversi_if_elif(n) for n in daftar_nilai], jumlah)
+    skalar = ukur("skalar bisect", lambda: [strategi.konversi_nilai(n) for n in daftar_nilai], jumlah)
+    huruf, bobot = ukur("konversi_batch", lambda: strategi.konversi_batch(daftar_nilai), jumlah)
+
+    assert lama == skalar == list(zip(huruf, bobot)), "Hasil konversi tidak sama"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+benchmarks/bench_index_dosen.py
+Microbenchmark DosenService: scan daftar_nilai/daftar_presensi vs index AppState.
+
+Data sintetis di memori (tanpa database). Jalankan dari root project:
+    python -m benchmarks.bench_index_dosen [jumlah_nilai]
+"""
+
+import sys
+import time
+
+from app import AppState
+from application.dto.dosen import Dosen
+from application.dto.mahasiswa import Mahasiswa
+from domain.entities.matakuliah import MataKuliah
+from domain.entities.nilai import Nilai
+from domain.entities.presensi import Presensi
+from domain.services.dosen_service import DosenService
+
+
+def ukur(label, fungsi, ulang):
+    mulai = time.perf_counter()
+    for _ in range(ulang):
+        fungsi()
+    durasi = (time.perf_counter() - mulai) / ulang
+    print(f"{label:<44} {durasi * 1e6:14.1f} us/panggilan")
+
+
+def bangun_state(jumlah_nilai, jumlah_mk=200, jumlah_dosen=50):
+    state = AppState()
+    daftar_dosen = [
+        Dosen(i, f"Dosen {i}", f"d{i}@x", "pw", f"{i:08d}", "IF") for i in range(1, jumlah_dosen + 1)
+    ]
+    daftar_mk = [
+        MataKuliah(f"MK{i:04d}", f"Mata Kuliah {i}", 3, daftar_dosen[i % jumlah_dosen], id_mk=i)
+        for i in range(1, jumlah_mk + 1)
+    ]
+    jumlah_mhs = jumlah_nilai // jumlah_mk + 1
+    daftar_mhs = [
+        Mahasiswa(i, f"Mhs {i}", f"m{i}@x", "pw", f"{i:09d}", "IF") for i in range(1, jumlah_mhs + 1)
+    ]
+    for dosen in daftar_dosen:
+        state.tambah_dosen(dosen)
+    for mk in daftar_mk:
+        state.tambah_mk(mk)
+
+    for i in range(jumlah_nilai):
+        mk = daftar_mk[i % jumlah_mk]
+        mhs = daftar_mhs[i // jumlah_mk]
+        state.tambah_nilai(Nilai(mk.dosen, mk, mhs, 50 + i % 50))
+
+    for i, mk in enumerate(daftar_mk):
+        for hari in range(1, 15):
+            state.tambah_presensi(Presensi(
+                id=i * 14 + hari, mata_kuliah=mk, dosen=mk.dosen, tanggal=f"{hari:02d}-09-2025"
+            ))
+    return state, daftar_dosen, daftar_mk, daftar_mhs
+
+
+def main():
+    jumlah_nilai = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    mulai = time.perf_counter()
+    state, daftar_dosen, daftar_mk, daftar_mhs = bangun_state(jumlah_nilai)
+    print(f"Data: {len(state.daftar_nilai)} nilai, {len(state.daftar_presensi)} presensi "
+          f"(dibangun {time.perf_counter() - mulai:.1f} s)\n")
+
+    service = DosenService(state)
+    # MK terakhir: sesi presensinya ada di ujung daftar_presensi (kasus terburuk scan)
+    dosen, mk, mhs = daftar_dosen[1], daftar_mk[-1], daftar_mhs[len(daftar_mhs) // 2]
+    ulang_scan, ulang_index = 3, 1000
+
+    print("== Cari nilai (mahasiswa, mata kuliah) untuk input_nilai ==")
+    ukur("scan daftar_nilai", lambda: next(
+        (n for n in state.daftar_nilai if n.mahasiswa == mhs and n.mata_kuliah == mk), None
+    ), ulang_scan)
+    ukur("index nilai_by_pasangan", lambda: state.cari_nilai(mhs, mk), ulang_index)
+
+    print("\n== lihat_nilai_by_dosen ==")
+    ukur("scan daftar_nilai", lambda: [n for n in state.daftar_nilai if n.dosen == dosen], ulang_scan)
+    ukur("index nilai_by_dosen_id", lambda: service.lihat_nilai_by_dosen(dosen), ulang_scan)
+
+    print("\n== lihat_nilai_mata_kuliah ==")
+    ukur("scan daftar_nilai", lambda: [
+        n for n in state.daftar_nilai if n.dosen == mk.dosen and n.mata_kuliah == mk
+    ], ulang_scan)
+    ukur("index nilai_by_mk_id", lambda: service.lihat_nilai_mata_kuliah(mk.dosen, mk), ulang_index)
+
+    print("\n== Cek duplikat buat_presensi ==")
+    ukur("scan daftar_presensi", lambda: any(
+        p.dosen == mk.dosen and p.mata_kuliah == mk and p.tanggal == "14-09-2025"
+        for p in state.daftar_presensi
+    ), ulang_index)
+    ukur("index presensi_by_jadwal",
+         lambda: state.cari_presensi_jadwal(mk.dosen, mk, "14-09-2025"), ulang_index)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+benchmarks/bench_konkurensi.py
+Stress test multi-thread untuk AppState + service: cek tidak ada lost update
+dan ukur throughput untuk beberapa jumlah thread.
+
+Setiap putaran menjalankan penulis (buat_presensi, ambil_presensi, input_nilai,
+ambil_krs) yang sengaja berebut agregat yang sama, ditambah thread pembaca
+tanpa lock (presensi_mk, roster_mk, statistik, cari_mk_prefix). Setelah selesai
+hasilnya dibandingkan dengan jumlah yang seharusnya dan validasi_index().
+
+Data sintetis di memori (tanpa database). Jalankan dari root project:
+    python -m benchmarks.bench_konkurensi [operasi_per_thread] [--tanpa-kunci]
+
+--tanpa-kunci mematikan kunci agregat dan kunci index untuk pembanding
+(biasanya menghasilkan duplikat / counter yang tidak konsisten).
+"""
+
+import sys
+import threading
+import time
+from contextlib import nullcontext
+
+from app import AppState
+from application.dto.dosen import Dosen
+from application.dto.mahasiswa import Mahasiswa
+from domain.entities.matakuliah import MataKuliah
+from domain.services.dosen_service import DosenService, DosenServiceError
+from domain.services.mahasiswa_service import MahasiswaService, MahasiswaServiceError
+
+JUMLAH_MK = 20
+JUMLAH_MHS = 400
+JUMLAH_TANGGAL = 30
+
+
+class _TanpaKunci:
+    """Pengganti KunciAgregat yang tidak mengunci apa pun (mode pembanding)"""
+
+    def tulis(self, jenis, kunci):
+        return nullcontext()
+
+    baca = tulis
+
+
+def bangun_state(tanpa_kunci=False):
+    state = AppState()
+    if tanpa_kunci:
+        state.kunci = _TanpaKunci()
+        state._kunci_index = nullcontext()
+    daftar_dosen = [Dosen(i, f"Dosen {i}", f"d{i}@x", "pw", f"{i:08d}", "IF") for i in range(1, 6)]
+    daftar_mk = [
+        MataKuliah(f"MK{i:03d}", f"Mata Kuliah {i}", 3, daftar_dosen[i % 5], id_mk=i)
+        for i in range(1, JUMLAH_MK + 1)
+    ]
+    daftar_mhs = [
+        Mahasiswa(i, f"Mhs {i}", f"m{i}@x", "pw", f"{i:09d}", "IF") for i in range(1, JUMLAH_MHS + 1)
+    ]
+    for dosen in daftar_dosen:
+        state.tambah_dosen(dosen)
+    for mk in daftar_mk:
+        state.tambah_mk(mk)
+    for mhs in daftar_mhs:
+        state.tambah_mahasiswa(mhs)
+    return state, daftar_mk, daftar_mhs
+
+
+def tanggal_ke(i):
+    return f"{i % JUMLAH_TANGGAL + 1:02d}-{i // JUMLAH_TANGGAL % 12 + 1:02d}-2025"
+
+
+def penulis(nomor, jumlah_thread, operasi, state, daftar_mk, daftar_mhs, hasil):
+    """
+    Semua thread memakai urutan target yang sama (digeser per thread),
+    jadi setiap agregat diperebutkan oleh semua thread.
+    """
+    dosen_service = DosenService(state)
+    mhs_service = MahasiswaService(state)
+    sukses = {'presensi': 0, 'hadir': 0, 'nilai': 0, 'krs': 0}
+    for j in range(operasi):
+        i = j + nomor
+        mk = daftar_mk[i % JUMLAH_MK]
+        mhs = daftar_mhs[i % JUMLAH_MHS]
+        jenis = j % 4
+        try:
+            if jenis == 0:
+                dosen_service.buat_presensi(mk.dosen, mk, tanggal_ke(i // JUMLAH_MK))
+                sukses['presensi'] += 1
+            elif jenis == 1:
+                mhs_service.ambil_krs(mhs, [mk, daftar_mk[(i + 1) % JUMLAH_MK]])
+                sukses['krs'] += 1
+            elif jenis == 2:
+                krs = mhs_service.cari_krs_by_mahasiswa(mhs)
+                sesi = state.presensi_mk(krs.daftar_mk[0]) if krs else []
+                if sesi:
+                    mhs_service.ambil_presensi(mhs, sesi[i % len(sesi)])
+                    sukses['hadir'] += 1
+            else:
+                dosen_service.input_nilai(mk.dosen, mhs, mk, (i * 7) % 101)
+                sukses['nilai'] += 1
+        except (DosenServiceError, MahasiswaServiceError):
+            pass
+    hasil[nomor] = sukses
+
+
+def pembaca(state, daftar_mk, daftar_mhs, berhenti, hasil):
+    """Pembacaan tanpa lock selama penulis berjalan; error apa pun dicatat"""
+    jumlah = 0
+    try:
+        while not berhenti.is_set():
+            mk = daftar_mk[jumlah % JUMLAH_MK]
+            state.presensi_mk(mk)
+            state.roster_mk(mk)
+            state.nilai_mk(mk)
+            state.cari_mk_prefix("MK0", batas=5)
+            state.statistik.distribusi_nilai()
+            state.statistik.tingkat_kehadiran()
+            state.hitung_ipk(daftar_mhs[jumlah % JUMLAH_MHS])
+            jumlah += 1
+    except Exception as e:
+        hasil['error'] = repr(e)
+    hasil['baca'] = jumlah
+
+
+def periksa(state):
+    """Bandingkan state dengan invariant; kembalikan list masalah"""
+    masalah = list(state.validasi_index())
+    masalah += state.statistik.bandingkan(type(state.statistik).dari_state(state))
+
+    jadwal = [state._kunci_jadwal(p) for p in state.daftar_presensi]
+    if len(jadwal) != len(set(jadwal)):
+        masalah.append(f"presensi: {len(jadwal) - len(set(jadwal))} jadwal ganda")
+    ids = [p.id for p in state.daftar_presensi]
+    if len(ids) != len(set(ids)):
+        masalah.append(f"presensi: {len(ids) - len(set(ids))} id ganda")
+    per_mhs = [len(v) for v in state.krs_by_mahasiswa_id.values()]
+    if any(n > 1 for n in per_mhs):
+        masalah.append(f"krs: {sum(n - 1 for n in per_mhs if n > 1)} KRS ganda")
+    pasangan = [(n.mahasiswa.id, n.mata_kuliah.id_mk) for n in state.daftar_nilai]
+    if len(pasangan) != len(set(pasangan)):
+        masalah.append(f"nilai: {len(pasangan) - len(set(pasangan))} nilai ganda")
+    hadir = sum(len(p.daftar_hadir) for p in state.daftar_presensi)
+    if hadir != sum(state.statistik.hadir.values()):
+        masalah.append("presensi: counter hadir tidak sama dengan daftar_hadir")
+    return masalah
+
+
+def putaran(jumlah_thread, operasi, tanpa_kunci):
+    state, daftar_mk, daftar_mhs = bangun_state(tanpa_kunci)
+    hasil, hasil_baca = {}, {}
+    berhenti = threading.Event()
+    thread_baca = threading.Thread(target=pembaca, args=(state, daftar_mk, daftar_mhs, berhenti, hasil_baca))
+    threads = [
+        threading.Thread(target=penulis, args=(n, jumlah_thread, operasi, state, daftar_mk, daftar_mhs, hasil))
+        for n in range(jumlah_thread)
+    ]
+    thread_baca.start()
+    mulai = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    durasi = time.perf_counter() - mulai
+    berhenti.set()
+    thread_baca.join()
+
+    total = {k: sum(h[k] for h in hasil.values()) for k in ('presensi', 'krs', 'hadir', 'nilai')}
+    masalah = periksa(state)
+    if 'error' in hasil_baca:
+        masalah.append(f"pembaca: {hasil_baca['error']}")
+    if total['presensi'] != len(state.daftar_presensi):
+        masalah.append(
+            f"presensi: {total['presensi']} sukses, state berisi {len(state.daftar_presensi)}"
+        )
+    if total['krs'] != len(state.daftar_krs):
+        masalah.append(f"krs: {total['krs']} sukses, state berisi {len(state.daftar_krs)}")
+    hadir = sum(len(p.daftar_hadir) for p in state.daftar_presensi)
+    if total['hadir'] != hadir:
+        masalah.append(f"hadir: {total['hadir']} sukses, state berisi {hadir} (lost update)")
+
+    ops = jumlah_thread * operasi
+    print(f"{jumlah_thread:>7} {ops:>9} {durasi * 1000:9.1f} {ops / durasi:12.0f} "
+          f"{hasil_baca.get('baca', 0):>9}   {'OK' if not masalah else 'GAGAL'}")
+    for m in masalah[:5]:
+        print(f"        - {m}")
+    return not masalah
+
+
+def main():
+    argumen = [a for a in sys.argv[1:] if not a.startswith("--")]
+    operasi = int(argumen[0]) if argumen else 20_000
+    tanpa_kunci = "--tanpa-kunci" in sys.argv
+    # Switch interval kecil memperbanyak interleaving antar thread (memancing race)
+    sys.setswitchinterval(1e-5)
+
+    print(f"Stress AppState: {operasi} operasi/thread, {JUMLAH_MK} MK, {JUMLAH_MHS} mahasiswa"
+          f"{' (TANPA KUNCI)' if tanpa_kunci else ''}")
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'aktif' if gil else 'nonaktif'}\n")
+    print(f"{'thread':>7} {'operasi':>9} {'ms':>9} {'operasi/s':>12} {'baca':>9}   hasil")
+    semua_ok = all([putaran(n, operasi, tanpa_kunci) for n in (1, 2, 4, 8)])
+    sys.exit(0 if semua_ok or tanpa_kunci else 1)
+
+
+if __name__ == "__main__":
+    main()
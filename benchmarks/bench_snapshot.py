@@ -0,0 +1,73 @@
+"""
+benchmarks/bench_snapshot.py
+Perbandingan startup: load dingin (DBLoader.load_all) vs warm start dari
+snapshot biner AppState (DBLoader.load_snapshot).
+
+Warm start = baca snapshot (mmap + unpickle) + cek watermark per tabel di
+server + ambil baris baru. Snapshot ditulis ke file sementara; database
+tidak diubah.
+
+Jalankan dari root project (butuh database `siak` yang bisa diakses):
+    python -m benchmarks.bench_snapshot [jumlah_ulang]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from app import AppState
+from infrastructure.database.connection import get_connection
+from loaders.db_loaders import DBLoader
+from loaders.snapshot import SnapshotState
+
+
+def ukur(label, fungsi, ulang=1):
+    """Jalankan fungsi `ulang` kali, cetak waktu terbaik; kembalikan hasil terakhir"""
+    terbaik = None
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        hasil = fungsi()
+        durasi = time.perf_counter() - mulai
+        terbaik = durasi if terbaik is None else min(terbaik, durasi)
+    print(f"{label:<34} {terbaik * 1000:10.1f} ms")
+    return hasil
+
+
+def main():
+    ulang = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    conn = get_connection()
+    if not conn:
+        print("Benchmark butuh koneksi database")
+        return
+
+    loader = DBLoader(conn)
+    folder = tempfile.mkdtemp(prefix="siak-snapshot-")
+    snapshot = SnapshotState(os.path.join(folder, "state.snap"))
+
+    def dingin():
+        state = AppState()
+        loader.load_all(state)
+        return state
+
+    state = ukur("dingin: load_all", dingin, ulang)
+    print(f"  mahasiswa={len(state.daftar_mahasiswa)} krs={len(state.daftar_krs)} "
+          f"nilai={len(state.daftar_nilai)} presensi={len(state.daftar_presensi)}")
+
+    watermark = ukur("watermark (checksum semua tabel)", loader.watermark, ulang)
+    ukur("tulis snapshot", lambda: snapshot.simpan(state, watermark))
+    print(f"  ukuran file {os.path.getsize(snapshot.path) / 1024 / 1024:.1f} MiB")
+    ukur("baca snapshot (mmap + unpickle)", snapshot.muat, ulang)
+
+    hasil = ukur("hangat: load_snapshot", lambda: loader.load_snapshot(AppState(), snapshot), ulang)
+    _, ringkasan = hasil
+    print(f"  mode={ringkasan['mode']} baris_baru={ringkasan['baris_baru']} "
+          f"dimuat_ulang={','.join(ringkasan['dimuat_ulang']) or '-'}")
+
+    os.remove(snapshot.path)
+    os.rmdir(folder)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+benchmarks/bench_startup_loader.py
+Perbandingan waktu startup dan memori: DBLoader eager (load_all) vs mode lazy,
+serta load_all dengan fetch berurutan (satu koneksi) vs paralel (ConnectionPool),
+lengkap dengan durasi fetch/link per tabel.
+
+Jalankan dari root project (butuh database `siak` yang bisa diakses):
+    python -m benchmarks.bench_startup_loader [jumlah_login]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from app import AppState
+from infrastructure.database.connection import get_connection, get_pool
+from loaders.db_loaders import DBLoader
+
+
+def ukur(label, fungsi):
+    tracemalloc.start()
+    mulai = time.perf_counter()
+    hasil = fungsi()
+    durasi = time.perf_counter() - mulai
+    _, puncak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {durasi * 1000:10.1f} ms   puncak memori {puncak / 1024 / 1024:8.2f} MiB")
+    return hasil
+
+
+def cetak_waktu(loader):
+    for baris in loader.format_waktu_muat():
+        print(f"    {baris}")
+
+
+def main():
+    jumlah_login = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    conn = get_connection()
+    if not conn:
+        print("Benchmark butuh koneksi database")
+        return
+
+    loader = DBLoader(conn)
+
+    def eager():
+        state = AppState()
+        loader.load_all(state)
+        return state
+
+    def lazy():
+        state = AppState()
+        loader.load_awal(state)
+        state.loader = loader
+        return state
+
+    state_eager = ukur("eager: load_all (1 koneksi)", eager)
+    cetak_waktu(loader)
+
+    pool = get_pool()
+    if pool:
+        loader_pool = DBLoader(pool)
+
+        def paralel():
+            state = AppState()
+            loader_pool.load_all(state)
+            return state
+
+        ukur(f"eager: load_all (pool {pool.size})", paralel)
+        cetak_waktu(loader_pool)
+        pool.close_all()
+
+    state_lazy = ukur("lazy: load_awal", lazy)
+
+    sampel = state_lazy.daftar_mahasiswa[:jumlah_login]
+    ukur(f"lazy: {len(sampel)} login mahasiswa",
+         lambda: [state_lazy.pastikan_mahasiswa_termuat([m]) for m in sampel])
+
+    print(f"\nKRS di memori: eager={len(state_eager.daftar_krs)} lazy={len(state_lazy.daftar_krs)}")
+    print(f"Nilai di memori: eager={len(state_eager.daftar_nilai)} lazy={len(state_lazy.daftar_nilai)}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
 # Domain - Entities (business objects)
+from .koleksi import KoleksiTerurut
 from .matakuliah import MataKuliah
 from .krs import KRS
 from .presensi import Presensi
 from .nilai import Nilai
-from .grading_strategy import GradingStrategy, StandardGradingStrategy, StrictGradingStrategy, LenientGradingStrategy, GradingFactory
+from .grading_strategy import (
+    GradingStrategy, TabelGradingStrategy, StandardGradingStrategy, StrictGradingStrategy,
+    LenientGradingStrategy, DefaultGradingStrategy, GradingFactory
+)
 
 __all__ = [
-    'MataKuliah', 'KRS', 'Presensi', 'Nilai',
-    'GradingStrategy', 'StandardGradingStrategy', 'StrictGradingStrategy', 
-    'LenientGradingStrategy', 'GradingFactory'
+    'KoleksiTerurut', 'MataKuliah', 'KRS', 'Presensi', 'Nilai',
+    'GradingStrategy', 'TabelGradingStrategy', 'StandardGradingStrategy', 'StrictGradingStrategy',
+    'LenientGradingStrategy', 'DefaultGradingStrategy', 'GradingFactory'
 ]
@@ -4,7 +4,12 @@ Strategy Pattern untuk flexible grading logic.
 Mengganti hardcoded konversi nilai di Nilai class.
 """
 
+import json
+import os
 from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_right
+from itertools import repeat
 
 
 class GradingStrategy(ABC):
@@ -28,8 +33,87 @@ class GradingStrategy(ABC):
         """Deskripsi dari strategi grading"""
         pass
 
+    def konversi_batch(self, daftar_nilai):
+        """
+        Konversi banyak nilai sekaligus.
+        
+        Args:
+            daftar_nilai: Iterable nilai angka
+        
+        Returns:
+            Tuple (list nilai huruf, array('d') bobot) yang sejajar dengan input
+        """
+        daftar_huruf = []
+        daftar_bobot = array('d')
+        for nilai_angka in daftar_nilai:
+            huruf, bobot = self.konversi_nilai(nilai_angka)
+            daftar_huruf.append(huruf)
+            daftar_bobot.append(bobot)
+        return daftar_huruf, daftar_bobot
+
 
-class StandardGradingStrategy(GradingStrategy):
+class TabelGradingStrategy(GradingStrategy):
+    """
+    Strategi grading berbasis tabel ambang batas.
+    
+    TABEL berisi (batas_bawah, huruf, bobot) urut dari batas tertinggi,
+    nilai di bawah semua batas mendapat NILAI_TERENDAH. Pencarian memakai
+    bisect pada daftar batas (O(log jumlah huruf)).
+    """
+    
+    TABEL = ()
+    NILAI_TERENDAH = ('E', 0.0)
+    DESKRIPSI = ""
+    
+    def __init__(self, tabel=None, nilai_terendah=None, deskripsi=None):
+        """
+        Args:
+            tabel: Override TABEL (optional)
+            nilai_terendah: Override NILAI_TERENDAH (optional)
+            deskripsi: Override DESKRIPSI (optional)
+        
+        Raises:
+            ValueError: Jika tabel kosong atau batasnya tidak urut turun
+        """
+        tabel = tuple(tuple(baris) for baris in (tabel if tabel is not None else self.TABEL))
+        if not tabel:
+            raise ValueError("Tabel grading tidak boleh kosong")
+        batas = [float(b) for b, _, _ in tabel]
+        if any(a <= b for a, b in zip(batas, batas[1:])):
+            raise ValueError("Batas pada tabel grading harus urut turun dan unik")
+        
+        self.tabel = tabel
+        self.nilai_terendah = tuple(nilai_terendah or self.NILAI_TERENDAH)
+        self.deskripsi = deskripsi if deskripsi is not None else self.DESKRIPSI
+        
+        # Disimpan urut naik untuk bisect; indeks 0 = di bawah semua batas
+        self._batas = batas[::-1]
+        self._huruf = [self.nilai_terendah[0]] + [h for _, h, _ in reversed(tabel)]
+        self._bobot = [float(self.nilai_terendah[1])] + [float(w) for _, _, w in reversed(tabel)]
+    
+    def konversi_nilai(self, nilai_angka):
+        """Konversi nilai dengan binary search pada tabel batas"""
+        i = bisect_right(self._batas, nilai_angka)
+        return self._huruf[i], self._bobot[i]
+    
+    def konversi_batch(self, daftar_nilai):
+        """
+        Konversi banyak nilai dalam satu pass (mis. satu kelas atau satu fakultas).
+        Indeks tabel dihitung sekali per nilai lalu dipetakan ke huruf dan bobot.
+        
+        Returns:
+            Tuple (list nilai huruf, array('d') bobot) yang sejajar dengan input
+        """
+        indeks = list(map(bisect_right, repeat(self._batas), daftar_nilai))
+        daftar_huruf = list(map(self._huruf.__getitem__, indeks))
+        daftar_bobot = array('d', map(self._bobot.__getitem__, indeks))
+        return daftar_huruf, daftar_bobot
+    
+    def get_description(self):
+        return self.deskripsi
+
+
+class StandardGradingStrategy(TabelGradingStrategy):
     """
     Strategi grading standar.
     - A: 80-100
@@ -41,36 +125,22 @@ class StandardGradingStrategy(GradingStrategy):
     - E: <50
     """
     
-    def konversi_nilai(self, nilai_angka):
-        """Konversi nilai menggunakan skala standar"""
-        if nilai_angka >= 80:
-            return 'A', 4.0
-        elif nilai_angka >= 75:
-            return 'A-', 3.7
-        elif nilai_angka >= 70:
-            return 'B+', 3.3
-        elif nilai_angka >= 65:
-            return 'B', 3.0
-        elif nilai_angka >= 60:
-            return 'B-', 2.7
-        elif nilai_angka >= 55:
-            return 'C+', 2.3
-        elif nilai_angka >= 50:
-            return 'C', 2.0
-        elif nilai_angka >= 45:
-            return 'C-', 1.7
-        elif nilai_angka >= 40:
-            return 'D+', 1.3
-        elif nilai_angka >= 35:
-            return 'D', 1.0
-        else:
-            return 'E', 0.0
-    
-    def get_description(self):
-        return "Skala Standar (A=80+, B+=75+, B=70+, C+=65+, C=60+, D+=40+, E=<35)"
+    TABEL = (
+        (80, 'A', 4.0),
+        (75, 'A-', 3.7),
+        (70, 'B+', 3.3),
+        (65, 'B', 3.0),
+        (60, 'B-', 2.7),
+        (55, 'C+', 2.3),
+        (50, 'C', 2.0),
+        (45, 'C-', 1.7),
+        (40, 'D+', 1.3),
+        (35, 'D', 1.0),
+    )
+    DESKRIPSI = "Skala Standar (A=80+, B+=75+, B=70+, C+=65+, C=60+, D+=40+, E=<35)"
 
 
-class StrictGradingStrategy(GradingStrategy):
+class StrictGradingStrategy(TabelGradingStrategy):
     """
     Strategi grading ketat.
     - A: 85-100
@@ -82,32 +152,20 @@ class StrictGradingStrategy(GradingStrategy):
     - E: <50
     """
     
-    def konversi_nilai(self, nilai_angka):
-        """Konversi nilai menggunakan skala ketat"""
-        if nilai_angka >= 85:
-            return 'A', 4.0
-        elif nilai_angka >= 80:
-            return 'B+', 3.3
-        elif nilai_angka >= 75:
-            return 'B', 3.0
-        elif nilai_angka >= 70:
-            return 'B-', 2.7
-        elif nilai_angka >= 65:
-            return 'C+', 2.3
-        elif nilai_angka >= 60:
-            return 'C', 2.0
-        elif nilai_angka >= 55:
-            return 'C-', 1.7
-        elif nilai_angka >= 50:
-            return 'D', 1.0
-        else:
-            return 'E', 0.0
-    
-    def get_description(self):
-        return "Skala Ketat (A=85+, B+=80+, B=75+, C+=70+, C=65+, D=50+, E=<50)"
+    TABEL = (
+        (85, 'A', 4.0),
+        (80, 'B+', 3.3),
+        (75, 'B', 3.0),
+        (70, 'B-', 2.7),
+        (65, 'C+', 2.3),
+        (60, 'C', 2.0),
+        (55, 'C-', 1.7),
+        (50, 'D', 1.0),
+    )
+    DESKRIPSI = "Skala Ketat (A=85+, B+=80+, B=75+, C+=70+, C=65+, D=50+, E=<50)"
 
 
-class LenientGradingStrategy(GradingStrategy):
+class LenientGradingStrategy(TabelGradingStrategy):
     """
     Strategi grading lenient.
     - A: 75-100
@@ -119,49 +177,59 @@ class LenientGradingStrategy(GradingStrategy):
     - E: <45
     """
     
-    def konversi_nilai(self, nilai_angka):
-        """Konversi nilai menggunakan skala lenient"""
-        if nilai_angka >= 75:
-            return 'A', 4.0
-        elif nilai_angka >= 70:
-            return 'B+', 3.3
-        elif nilai_angka >= 65:
-            return 'B', 3.0
-        elif nilai_angka >= 60:
-            return 'B-', 2.7
-        elif nilai_angka >= 55:
-            return 'C+', 2.3
-        elif nilai_angka >= 50:
-            return 'C', 2.0
-        elif nilai_angka >= 45:
-            return 'C-', 1.7
-        elif nilai_angka >= 40:
-            return 'D+', 1.3
-        elif nilai_angka >= 35:
-            return 'D', 1.0
-        else:
-            return 'E', 0.0
+    TABEL = (
+        (75, 'A', 4.0),
+        (70, 'B+', 3.3),
+        (65, 'B', 3.0),
+        (60, 'B-', 2.7),
+        (55, 'C+', 2.3),
+        (50, 'C', 2.0),
+        (45, 'C-', 1.7),
+        (40, 'D+', 1.3),
+        (35, 'D', 1.0),
+    )
+    DESKRIPSI = "Skala Lenient (A=75+, B+=70+, B=65+, C+=60+, C=55+, D+=40+, E=<35)"
+
+
+class DefaultGradingStrategy(TabelGradingStrategy):
+    """
+    Skala bawaan: dipakai Nilai.konversi_huruf, input nilai manual dan
+    import nilai jika dosen tidak memilih skala lain.
+    - A: 85-100
+    - B: 75-84
+    - C: 65-74
+    - D: 55-64
+    - E: <55
+    """
     
-    def get_description(self):
-        return "Skala Lenient (A=75+, B+=70+, B=65+, C+=60+, C=55+, D+=40+, E=<35)"
+    TABEL = (
+        (85, 'A', 4.0),
+        (75, 'B', 3.0),
+        (65, 'C', 2.0),
+        (55, 'D', 1.0),
+    )
+    DESKRIPSI = "Skala Bawaan Nilai (A=85+, B=75+, C=65+, D=55+, E=<55)"
 
 
 class GradingFactory:
     """Factory untuk membuat grading strategy instances"""
     
+    DEFAULT = 'default'
+
     _strategies = {
+        'default': DefaultGradingStrategy,
         'standard': StandardGradingStrategy,
         'strict': StrictGradingStrategy,
         'lenient': LenientGradingStrategy
     }
     
     @classmethod
-    def create_strategy(cls, strategy_type='standard'):
+    def create_strategy(cls, strategy_type=DEFAULT):
         """
         Buat strategy berdasarkan tipe.
         
         Args:
-            strategy_type: Tipe strategi ('standard', 'strict', 'lenient')
+            strategy_type: Tipe strategi ('default', 'standard', 'strict', 'lenient')
         
         Returns:
             GradingStrategy instance
@@ -180,3 +248,73 @@ class GradingFactory:
     def get_available_strategies(cls):
         """Dapatkan daftar strategi yang tersedia"""
         return list(cls._strategies.keys())
+    
+    @classmethod
+    def register_strategy(cls, strategy_type, factory):
+        """
+        Daftarkan strategi baru.
+        
+        Args:
+            strategy_type: Nama strategi
+            factory: Class GradingStrategy atau callable tanpa argumen yang
+                mengembalikan GradingStrategy
+        """
+        cls._strategies[strategy_type] = factory
+    
+    @classmethod
+    def register_from_file(cls, path):
+        """
+        Daftarkan skala grading dari file JSON.
+        
+        Format file:
+            {
+                "nama": "fakultas_teknik",
+                "deskripsi": "Skala FT (A=82+, ...)",
+                "tabel": [[82, "A", 4.0], [76, "B+", 3.5], ...],
+                "nilai_terendah": ["E", 0.0]
+            }
+        
+        Args:
+            path: Path file JSON
+        
+        Returns:
+            Nama strategi yang didaftarkan
+        
+        Raises:
+            ValueError: Jika isi file tidak valid
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"Gagal membaca skala grading {path}: {e}")
+        
+        nama = data.get("nama") or os.path.splitext(os.path.basename(path))[0]
+        try:
+            tabel = [(float(b), str(h), float(w)) for b, h, w in data["tabel"]]
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Skala grading {path}: 'tabel' harus list [batas, huruf, bobot]")
+        
+        # Validasi sekali saat didaftarkan; instance baru dibuat setiap create_strategy
+        kwargs = {
+            "tabel": tabel,
+            "nilai_terendah": data.get("nilai_terendah"),
+            "deskripsi": data.get("deskripsi", f"Skala {nama}"),
+        }
+        TabelGradingStrategy(**kwargs)
+        cls.register_strategy(nama, lambda: TabelGradingStrategy(**kwargs))
+        return nama
+    
+    @classmethod
+    def register_from_directory(cls, folder):
+        """
+        Daftarkan semua file *.json di folder sebagai skala grading.
+        
+        Returns:
+            List nama strategi yang didaftarkan
+        """
+        return [
+            cls.register_from_file(os.path.join(folder, nama_file))
+            for nama_file in sorted(os.listdir(folder))
+            if nama_file.endswith(".json")
+        ]
@@ -0,0 +1,115 @@
+"""
+domain/entities/koleksi.py
+Koleksi terurut berbasis dict: urutan sisip seperti list, cek keanggotaan O(1).
+Dipakai untuk KRS.daftar_mk dan Presensi.daftar_hadir.
+"""
+
+from itertools import islice
+
+
+class KoleksiTerurut:
+    """
+    Pengganti list untuk kumpulan objek unik.
+
+    Item di-index berdasarkan kunci (mis. id_mk / id mahasiswa) sehingga
+    `in`, `append` dan `remove` O(1), sementara iterasi, len(), indexing,
+    slicing dan perbandingan dengan list tetap berperilaku seperti list.
+    Item yang kuncinya None (belum tersimpan di DB) di-index pakai objeknya.
+    """
+
+    def __init__(self, key_attr, items=()):
+        """
+        Args:
+            key_attr: Nama atribut yang dipakai sebagai kunci unik
+            items: Item awal (optional)
+        """
+        self._key_attr = key_attr
+        self._items = {}
+        for item in items:
+            self.append(item)
+
+    def _kunci(self, item):
+        kunci = getattr(item, self._key_attr, None)
+        return item if kunci is None else kunci
+
+    def append(self, item):
+        """Tambah item di akhir; item yang sudah ada diabaikan"""
+        self._items.setdefault(self._kunci(item), item)
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def remove(self, item):
+        """Hapus item; ValueError jika tidak ada (sama seperti list.remove)"""
+        kunci = self._kunci(item)
+        if kunci not in self._items:
+            raise ValueError(f"{item!r} tidak ada di koleksi")
+        del self._items[kunci]
+
+    def ganti_kunci(self, kunci_lama, item):
+        """
+        Index ulang item yang kuncinya berubah (mis. MK yang baru mendapat
+        id_mk dari database), posisi dalam urutan tetap.
+
+        Returns:
+            True jika kunci_lama ada di koleksi
+        """
+        if kunci_lama not in self._items:
+            return False
+        kunci_baru = self._kunci(item)
+        self._items = {
+            (kunci_baru if k is kunci_lama else k): (item if k is kunci_lama else v)
+            for k, v in self._items.items()
+        }
+        return True
+
+    def discard(self, item):
+        self._items.pop(self._kunci(item), None)
+
+    def clear(self):
+        self._items.clear()
+
+    def index(self, item):
+        kunci = self._kunci(item)
+        for i, k in enumerate(self._items):
+            if k == kunci:
+                return i
+        raise ValueError(f"{item!r} tidak ada di koleksi")
+
+    def __contains__(self, item):
+        try:
+            return self._kunci(item) in self._items
+        except TypeError:
+            return False
+
+    def __iter__(self):
+        return iter(tuple(self._items.values()))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return list(self._items.values())[idx]
+        n = len(self._items)
+        if idx < 0:
+            idx += n
+        if idx < 0 or idx >= n:
+            raise IndexError("index koleksi di luar jangkauan")
+        return next(islice(self._items.values(), idx, None))
+
+    def __eq__(self, other):
+        if isinstance(other, KoleksiTerurut):
+            other = list(other)
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"KoleksiTerurut({list(self._items.values())!r})"
@@ -1,10 +1,27 @@
+from domain.entities.koleksi import KoleksiTerurut
+
+
 class KRS:
     def __init__(self, mahasiswa, semester, tahun_ajaran, id_krs=None):
         self.id_krs = id_krs
         self.mahasiswa = mahasiswa    # objek Mahasiswa
         self.semester = semester
         self.tahun_ajaran = tahun_ajaran
-        self.daftar_mk = []           # list MataKuliah
+        self.daftar_mk = KoleksiTerurut('id_mk')  # MataKuliah unik, urut sesuai waktu ambil
+        self._observers = []          # callback(krs, mk, aksi) saat daftar_mk berubah
+
+    def tambah_observer(self, callback):
+        """Daftarkan callback(krs, mk, aksi) yang dipanggil saat MK ditambah/dihapus"""
+        if callback not in self._observers:
+            self._observers.append(callback)
+
+    def hapus_observer(self, callback):
+        if callback in self._observers:
+            self._observers.remove(callback)
+
+    def _notify(self, mk, aksi):
+        for callback in self._observers:
+            callback(self, mk, aksi)
 
     def tambah_mk(self, mk):
         # CEK: jangan sampai 1 MK diambil 2 kali
@@ -12,6 +29,14 @@ class KRS:
             print(f"Mata kuliah {mk.kode_mk} sudah ada di KRS, tidak dapat diambil dua kali.")
             return False
         self.daftar_mk.append(mk)
+        self._notify(mk, 'tambah')
+        return True
+
+    def hapus_mk(self, mk):
+        if mk not in self.daftar_mk:
+            return False
+        self.daftar_mk.remove(mk)
+        self._notify(mk, 'hapus')
         return True
 
     def hitung_total_sks(self):
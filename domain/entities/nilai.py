@@ -1,9 +1,43 @@
+from domain.entities.grading_strategy import DefaultGradingStrategy
+
+# Bobot angka per nilai huruf (dipakai untuk perhitungan IPK)
+BOBOT_HURUF = {
+    'A': 4.0, 'A-': 3.7,
+    'B+': 3.3, 'B': 3.0, 'B-': 2.7,
+    'C+': 2.3, 'C': 2.0, 'C-': 1.7,
+    'D+': 1.3, 'D': 1.0,
+    'E': 0.0
+}
+
+_SKALA_DEFAULT = DefaultGradingStrategy()
+
+
+def bobot_huruf(nilai_huruf, bobot=None):
+    """
+    Bobot IPK satu nilai.
+
+    Args:
+        nilai_huruf: Nilai huruf
+        bobot: Bobot tersimpan dari skala grading yang menghasilkan huruf
+            (None untuk nilai lama, dipakai BOBOT_HURUF)
+
+    Returns:
+        Bobot angka (0.0 jika huruf tidak dikenal dan bobot tidak tersimpan)
+    """
+    if bobot is not None:
+        return float(bobot)
+    return BOBOT_HURUF.get(nilai_huruf, 0.0)
+
+
 class Nilai:
     def __init__(self, *args, **kwargs):
         """
         Bentuk yang didukung:
         - Nilai(dosen, mata_kuliah, mahasiswa, nilai_angka)
         - Nilai(mahasiswa, mata_kuliah, nilai_angka)  (legacy)
+
+        Keyword nilai_huruf dan nilai_bobot diisi dari GradingStrategy yang
+        dipakai; tanpa keduanya dipakai skala bawaan (DefaultGradingStrategy).
         """
 
         dosen = kwargs.pop("dosen", None)
@@ -11,6 +45,7 @@ class Nilai:
         mahasiswa = kwargs.pop("mahasiswa", None)
         nilai_angka = kwargs.pop("nilai_angka", None)
         nilai_huruf = kwargs.pop("nilai_huruf", None)
+        nilai_bobot = kwargs.pop("nilai_bobot", None)
 
         if args:
             if len(args) == 4:
@@ -30,20 +65,22 @@ class Nilai:
         self.mahasiswa = mahasiswa      # objek Mahasiswa
         self.mata_kuliah = mata_kuliah  # objek MataKuliah
         self.nilai_angka = float(nilai_angka)
-        self.nilai_huruf = nilai_huruf or self.konversi_huruf()
+        if nilai_huruf:
+            self.nilai_huruf = nilai_huruf
+            self.nilai_bobot = None if nilai_bobot is None else float(nilai_bobot)
+        else:
+            self.nilai_huruf, self.nilai_bobot = self.konversi()
+
+    def konversi(self):
+        """(nilai huruf, bobot) dari skala bawaan"""
+        return _SKALA_DEFAULT.konversi_nilai(self.nilai_angka)
 
     def konversi_huruf(self):
-        n = self.nilai_angka
-        if n >= 85:
-            return "A"
-        elif n >= 75:
-            return "B"
-        elif n >= 65:
-            return "C"
-        elif n >= 55:
-            return "D"
-        else:
-            return "E"
+        return self.konversi()[0]
+
+    def bobot(self):
+        """Bobot angka: bobot dari skala grading, atau BOBOT_HURUF untuk nilai lama"""
+        return bobot_huruf(self.nilai_huruf, self.nilai_bobot)
 
     def info(self):
         return f"{self.mata_kuliah.kode_mk} - {self.mata_kuliah.nama_mk}: {self.nilai_angka} ({self.nilai_huruf})"
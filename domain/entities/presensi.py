@@ -1,4 +1,11 @@
+from datetime import date, datetime
+
+from domain.entities.koleksi import KoleksiTerurut
+
+
 class Presensi:
+    FORMAT_TANGGAL = "%d-%m-%Y"      # format tanggal yang dipakai menu (dd-mm-yyyy)
+
     def __init__(
         self,
         id=None,
@@ -12,11 +19,55 @@ class Presensi:
         self.mata_kuliah = mata_kuliah   # objek MataKuliah
         self.dosen = dosen               # objek Dosen
         self.tanggal = tanggal
-        self.daftar_hadir = []           # list Mahasiswa
+        self.daftar_hadir = KoleksiTerurut('id')  # Mahasiswa unik, urut sesuai waktu hadir
+        self._observers = []          # callback(presensi, mahasiswa, aksi) saat daftar_hadir berubah
+
+    def tambah_observer(self, callback):
+        """Daftarkan callback(presensi, mahasiswa, aksi) yang dipanggil saat kehadiran berubah"""
+        if callback not in self._observers:
+            self._observers.append(callback)
+
+    def hapus_observer(self, callback):
+        if callback in self._observers:
+            self._observers.remove(callback)
+
+    def _notify(self, mahasiswa, aksi):
+        for callback in self._observers:
+            callback(self, mahasiswa, aksi)
 
     def isi_hadir(self, mahasiswa):
+        if mahasiswa in self.daftar_hadir:
+            return False
+        self.daftar_hadir.append(mahasiswa)
+        self._notify(mahasiswa, 'tambah')
+        return True
+
+    def hapus_hadir(self, mahasiswa):
         if mahasiswa not in self.daftar_hadir:
-            self.daftar_hadir.append(mahasiswa)
+            return False
+        self.daftar_hadir.remove(mahasiswa)
+        self._notify(mahasiswa, 'hapus')
+        return True
+
+    @classmethod
+    def parse_tanggal(cls, tanggal):
+        """Tanggal (date atau string dd-mm-yyyy) -> date, None jika format tidak dikenali"""
+        if isinstance(tanggal, date):
+            return tanggal
+        try:
+            # Jalur cepat untuk dd-mm-yyyy (strptime relatif mahal di index/query)
+            hari, bulan, tahun = tanggal.split("-")
+            return date(int(tahun), int(bulan), int(hari))
+        except (AttributeError, TypeError, ValueError):
+            pass
+        try:
+            return datetime.strptime(tanggal, cls.FORMAT_TANGGAL).date()
+        except (TypeError, ValueError):
+            return None
+
+    def tanggal_date(self):
+        """Tanggal sebagai objek date (None jika format tidak dikenali)"""
+        return self.parse_tanggal(self.tanggal)
 
     def info(self):
         mk_nama = getattr(self.mata_kuliah, "nama_mk", getattr(self.mata_kuliah, "nama", ""))
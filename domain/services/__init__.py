@@ -2,9 +2,11 @@
 from .mahasiswa_service import MahasiswaService, MahasiswaServiceError
 from .dosen_service import DosenService, DosenServiceError
 from .admin_service import AdminService, AdminServiceError
+from .statistik import StatistikAkademik
 
 __all__ = [
     'MahasiswaService', 'MahasiswaServiceError',
     'DosenService', 'DosenServiceError',
-    'AdminService', 'AdminServiceError'
+    'AdminService', 'AdminServiceError',
+    'StatistikAkademik'
 ]
@@ -41,12 +41,22 @@ class AdminService:
         Returns:
             Mata Kuliah object atau None
         """
-        for mk in self.state.daftar_mk:
-            if mk.kode_mk == kode_mk:
-                return mk
-        return None
+        return self.state.mk_by_kode.get(kode_mk)
     
-    def tambah_mata_kuliah(self, kode_mk, nama, sks, deskripsi=""):
+    def cari_mata_kuliah_prefix(self, prefix, batas=None):
+        """
+        Cari mata kuliah yang kodenya diawali prefix (urut kode).
+        
+        Args:
+            prefix: Awalan kode mata kuliah
+            batas: Jumlah hasil maksimum (optional)
+        
+        Returns:
+            List of Mata Kuliah objects
+        """
+        return self.state.cari_mk_prefix(prefix, batas)
+    
+    def tambah_mata_kuliah(self, kode_mk, nama, sks, deskripsi="", dosen=None):
         """
         Tambah mata kuliah baru.
         
@@ -55,6 +65,7 @@ class AdminService:
             nama: Nama mata kuliah
             sks: Jumlah SKS (1-4)
             deskripsi: Deskripsi (optional)
+            dosen: Dosen pengampu (optional)
         
         Returns:
             Mata Kuliah object yang baru dibuat
@@ -76,19 +87,21 @@ class AdminService:
             raise AdminServiceError("SKS harus antara 1-4")
         
         # Buat mata kuliah baru
-        mk = MataKuliah(kode_mk, nama, sks, deskripsi)
-        self.state.daftar_mk.append(mk)
+        mk = MataKuliah(kode_mk, nama, sks, dosen, deskripsi=deskripsi)
+        self.state.tambah_mk(mk)
         return mk
     
-    def edit_mata_kuliah(self, kode_mk, nama=None, sks=None, deskripsi=None):
+    def edit_mata_kuliah(self, kode_mk, nama=None, sks=None, deskripsi=None, kode_baru=None):
         """
         Edit mata kuliah yang sudah ada.
+        Semua input divalidasi dulu sebelum ada field yang diubah.
         
         Args:
             kode_mk: Kode mata kuliah
             nama: Nama baru (optional)
             sks: SKS baru (optional)
             deskripsi: Deskripsi baru (optional)
+            kode_baru: Kode baru (optional); index kode ikut di-re-key
         
         Returns:
             Mata Kuliah object yang sudah diedit
@@ -100,14 +113,22 @@ class AdminService:
         if not mk:
             raise AdminServiceError(f"Mata kuliah {kode_mk} tidak ditemukan")
         
+        if sks is not None and (not isinstance(sks, int) or sks < 1 or sks > 4):
+            raise AdminServiceError("SKS harus antara 1-4")
+        
+        if kode_baru and kode_baru != kode_mk:
+            try:
+                self.state.ganti_kode_mk(mk, kode_baru)
+            except ValueError as e:
+                raise AdminServiceError(str(e))
+        
         # Update field yang diberikan
         if nama:
-            mk.nama = nama
+            mk.nama_mk = nama
         
-        if sks is not None:
-            if not isinstance(sks, int) or sks < 1 or sks > 4:
-                raise AdminServiceError("SKS harus antara 1-4")
+        if sks is not None and sks != mk.sks:
             mk.sks = sks
+            self.state.sinkron_sks_mk(mk)
         
         if deskripsi is not None:
             mk.deskripsi = deskripsi
@@ -129,12 +150,13 @@ class AdminService:
             raise AdminServiceError(f"Mata kuliah {kode_mk} tidak ditemukan")
         
         # Cek apakah mata kuliah sudah digunakan di KRS
-        if any(mk in krs.daftar_mk for krs in self.state.daftar_krs):
+        self.state.pastikan_roster_termuat(mk)
+        if self.state.mk_dipakai(mk):
             raise AdminServiceError(
                 f"Mata kuliah {kode_mk} tidak bisa dihapus karena sudah digunakan di KRS"
             )
         
-        self.state.daftar_mk.remove(mk)
+        self.state.hapus_mk(mk)
 
     # ============ Statistic Operations ============
     
@@ -151,15 +173,47 @@ class AdminService:
         return len(self.state.daftar_mk)
     
     def lihat_statistik_sistem(self):
-        """Lihat ringkasan statistik sistem"""
+        """
+        Lihat ringkasan statistik sistem.
+        Agregat dibaca dari counter inkremental (state.statistik), tanpa scan data.
+        Di mode lazy agregat dihitung database agar mencakup semua mahasiswa,
+        bukan hanya yang sedang di-cache.
+        
+        Returns:
+            Dict total + mahasiswa_per_prodi, rata_rata_kelas,
+            distribusi_nilai, tingkat_kehadiran (per kode MK) dan
+            sumber ('memori' atau 'database')
+        """
+        stat, total, sumber = self.state.ringkasan_statistik()
         return {
             'total_mahasiswa': self.hitung_total_mahasiswa(),
             'total_dosen': self.hitung_total_dosen(),
             'total_mata_kuliah': self.hitung_total_mata_kuliah(),
-            'total_krs': len(self.state.daftar_krs),
-            'total_presensi': len(self.state.daftar_presensi),
-            'total_nilai': len(self.state.daftar_nilai)
+            **total,
+            'sumber': sumber,
+            'mahasiswa_per_prodi': stat.mahasiswa_per_prodi(),
+            'rata_rata_kelas': stat.rata_rata_kelas(),
+            'distribusi_nilai': self._per_kode_mk(stat.distribusi_nilai()),
+            'tingkat_kehadiran': self._per_kode_mk(stat.tingkat_kehadiran())
         }
+    
+    def hitung_ulang_statistik(self):
+        """
+        Paksa hitung ulang statistik dengan scan penuh (untuk verifikasi).
+        Di mode lazy yang diverifikasi counter mahasiswa yang sedang di-cache.
+        
+        Returns:
+            List selisih counter inkremental terhadap hasil hitung ulang
+        """
+        return self.state.hitung_ulang_statistik()
+    
+    def _per_kode_mk(self, data):
+        """Ganti kunci_mk (id_mk) dengan kode_mk agar mudah dibaca"""
+        hasil = {}
+        for kunci, nilai in data.items():
+            mk = self.state.mk_by_id.get(kunci, kunci)
+            hasil[getattr(mk, 'kode_mk', kunci)] = nilai
+        return hasil
 
     # ============ Validation Methods ============
     
@@ -4,36 +4,35 @@ class AkademikService:
         self.state = state
 
     def cari_mahasiswa_by_nim(self, nim):
-        for m in self.state.daftar_mahasiswa:
-            if m.nim == nim:
-                return m
-        return None
+        return self.state.mahasiswa_by_nim.get(nim)
 
     def cari_dosen_by_nidn(self, nidn):
-        for d in self.state.daftar_dosen:
-            if d.nidn == nidn:
-                return d
-        return None
+        return self.state.dosen_by_nidn.get(nidn)
 
-    def cari_krs_by_mahasiswa(self, mahasiswa):
-        for k in self.state.daftar_krs:
-            if k.mahasiswa == mahasiswa:
-                return k
+    def cari_krs_by_mahasiswa(self, mahasiswa, semester=None, tahun_ajaran=None):
+        if not mahasiswa:
+            return None
+        for k in reversed(self.state.krs_by_mahasiswa_id.get(mahasiswa.id, ())):
+            if semester is not None and k.semester != semester:
+                continue
+            if tahun_ajaran is not None and k.tahun_ajaran != tahun_ajaran:
+                continue
+            return k
         return None
 
+    def cari_semua_krs_by_mahasiswa(self, mahasiswa):
+        if not mahasiswa:
+            return []
+        return list(self.state.krs_by_mahasiswa_id.get(mahasiswa.id, ()))
+
     def presensi_by_dosen(self, dosen):
-        return [p for p in self.state.daftar_presensi if p.dosen == dosen]
+        return self.state.presensi_dosen(dosen)
 
-    def presensi_tersedia_untuk_mahasiswa(self, mahasiswa):
+    def presensi_tersedia_untuk_mahasiswa(self, mahasiswa, dari=None, sampai=None):
         krs = self.cari_krs_by_mahasiswa(mahasiswa)
         if not krs:
             return []
-        mk_di_krs = set(krs.daftar_mk)
-        hasil = []
-        for p in self.state.daftar_presensi:
-            if p.mata_kuliah in mk_di_krs and mahasiswa not in p.daftar_hadir:
-                hasil.append(p)
-        return hasil
+        return self.state.presensi_terbuka(mahasiswa, krs.daftar_mk, dari, sampai)
 
     def nilai_mahasiswa(self, mahasiswa):
-        return [n for n in self.state.daftar_nilai if n.mahasiswa == mahasiswa]
+        return self.state.nilai_mahasiswa(mahasiswa)
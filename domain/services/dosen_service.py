@@ -6,6 +6,7 @@ Menangani Presensi dan Nilai.
 
 from domain.entities.presensi import Presensi
 from domain.entities.nilai import Nilai
+from utils.konkurensi import KunciAgregat
 
 
 class DosenServiceError(Exception):
@@ -40,7 +41,7 @@ class DosenService:
         Returns:
             List of Presensi objects
         """
-        return [p for p in self.state.daftar_presensi if p.dosen == dosen]
+        return self.state.presensi_dosen(dosen)
     
     def buat_presensi(self, dosen, mata_kuliah, tanggal):
         """
@@ -64,24 +65,22 @@ class DosenService:
         if not tanggal:
             raise DosenServiceError("Tanggal tidak boleh kosong")
         
-        # Cek apakah sudah ada presensi untuk tanggal yang sama
-        existing = any(
-            p.dosen == dosen and p.mata_kuliah == mata_kuliah and p.tanggal == tanggal
-            for p in self.state.daftar_presensi
-        )
-        if existing:
-            raise DosenServiceError(
-                f"Presensi untuk {mata_kuliah.nama} pada {tanggal} sudah dibuat"
+        # Cek duplikat + tambah atomik per jadwal (dosen, mk, tanggal)
+        jadwal = self.state.kunci_jadwal(dosen, mata_kuliah, tanggal)
+        with self.state.kunci.tulis(KunciAgregat.PRESENSI, jadwal):
+            existing = self.state.cari_presensi_jadwal(dosen, mata_kuliah, tanggal)
+            if existing:
+                raise DosenServiceError(
+                    f"Presensi untuk {mata_kuliah.nama} pada {tanggal} sudah dibuat"
+                )
+
+            presensi = Presensi(
+                id=self.state.id_presensi.ambil(),
+                dosen=dosen,
+                mata_kuliah=mata_kuliah,
+                tanggal=tanggal
             )
-        
-        presensi = Presensi(
-            id=self.state.next_id_presensi,
-            dosen=dosen,
-            mata_kuliah=mata_kuliah,
-            tanggal=tanggal
-        )
-        self.state.next_id_presensi += 1
-        self.state.daftar_presensi.append(presensi)
+            self.state.tambah_presensi(presensi)
         return presensi
     
     def lihat_mahasiswa_hadir(self, presensi_obj):
@@ -111,7 +110,7 @@ class DosenService:
 
     # ============ Nilai Operations ============
     
-    def input_nilai(self, dosen, mahasiswa, mata_kuliah, nilai_angka):
+    def input_nilai(self, dosen, mahasiswa, mata_kuliah, nilai_angka, nilai_huruf=None, nilai_bobot=None):
         """
         Input nilai untuk mahasiswa.
         
@@ -120,6 +119,9 @@ class DosenService:
             mahasiswa: Objek Mahasiswa
             mata_kuliah: Objek MataKuliah
             nilai_angka: Nilai angka (0-100)
+            nilai_huruf: Nilai huruf hasil GradingStrategy (optional,
+                default skala bawaan Nilai.konversi_huruf)
+            nilai_bobot: Bobot huruf dari GradingStrategy yang sama (optional)
         
         Returns:
             Nilai object
@@ -137,28 +139,33 @@ class DosenService:
         # Validasi nilai
         if not isinstance(nilai_angka, (int, float)):
             raise DosenServiceError("Nilai harus berupa angka")
-        if nilai_angka < 0 or nilai_angka > 100:
+        if not 0 <= nilai_angka <= 100:
             raise DosenServiceError("Nilai harus antara 0-100")
         
-        # Cek apakah nilai sudah ada
-        existing = next(
-            (n for n in self.state.daftar_nilai
-             if n.mahasiswa == mahasiswa and n.mata_kuliah == mata_kuliah),
-            None
-        )
-        if existing:
-            # Update nilai yang ada
-            existing.nilai_angka = nilai_angka
-            return existing
-        
-        # Buat nilai baru
-        nilai = Nilai(dosen, mata_kuliah, mahasiswa, nilai_angka)
-        self.state.daftar_nilai.append(nilai)
-        return nilai
+        # Cek-lalu-tulis atomik per mata kuliah (nilai satu kelas). Kuncinya objek
+        # MK, bukan kunci_mk, agar tidak berpindah stripe saat id_mk dipasang.
+        with self.state.kunci.tulis(KunciAgregat.NILAI, mata_kuliah):
+            existing = self.state.cari_nilai(mahasiswa, mata_kuliah)
+            if existing:
+                # Update nilai yang ada (kontribusi IPK lama diganti yang baru)
+                existing.nilai_angka = float(nilai_angka)
+                if nilai_huruf:
+                    existing.nilai_huruf = nilai_huruf
+                    existing.nilai_bobot = None if nilai_bobot is None else float(nilai_bobot)
+                else:
+                    existing.nilai_huruf, existing.nilai_bobot = existing.konversi()
+                self.state.catat_nilai(existing)
+                return existing
+
+            # Buat nilai baru
+            nilai = Nilai(dosen, mata_kuliah, mahasiswa, nilai_angka,
+                          nilai_huruf=nilai_huruf, nilai_bobot=nilai_bobot)
+            self.state.tambah_nilai(nilai)
+            return nilai
     
     def lihat_nilai_by_dosen(self, dosen):
         """Lihat semua nilai yang diinput oleh dosen"""
-        return [n for n in self.state.daftar_nilai if n.dosen == dosen]
+        return self.state.nilai_dosen(dosen)
     
     def lihat_nilai_mata_kuliah(self, dosen, mata_kuliah):
         """
@@ -167,10 +174,7 @@ class DosenService:
         Returns:
             List of dict dengan info nilai
         """
-        nilai_list = [
-            n for n in self.lihat_nilai_by_dosen(dosen)
-            if n.mata_kuliah == mata_kuliah
-        ]
+        nilai_list = [n for n in self.state.nilai_mk(mata_kuliah) if n.dosen == dosen]
         
         summary = []
         for n in nilai_list:
@@ -219,7 +223,7 @@ class DosenService:
         
         try:
             nilai = float(nilai_angka)
-            if nilai < 0 or nilai > 100:
+            if not 0 <= nilai <= 100:
                 errors.append("Nilai harus antara 0-100")
         except (ValueError, TypeError):
             errors.append("Nilai harus berupa angka")
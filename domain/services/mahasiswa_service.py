@@ -7,6 +7,7 @@ Menangani KRS, Presensi, dan Nilai.
 from domain.entities.krs import KRS
 from domain.entities.presensi import Presensi
 from domain.entities.nilai import Nilai
+from utils.konkurensi import KunciAgregat
 
 
 class MahasiswaServiceError(Exception):
@@ -57,24 +58,50 @@ class MahasiswaService:
         if total_sks > 24:
             raise MahasiswaServiceError("Maksimal mata kuliah 24 SKS")
         
-        # Cek apakah sudah punya KRS
-        krs_existing = self.cari_krs_by_mahasiswa(mahasiswa)
-        if krs_existing:
-            raise MahasiswaServiceError(f"Mahasiswa {mahasiswa.nama} sudah punya KRS")
-        
-        krs = KRS(mahasiswa, semester, tahun_ajaran)
-        for mk in daftar_mk:
-            krs.tambah_mk(mk)
-        self.state.daftar_krs.append(krs)
+        # Cek apakah sudah punya KRS semester ini (atomik per mahasiswa)
+        with self.state.kunci.tulis(KunciAgregat.KRS, mahasiswa.id):
+            krs_existing = self.cari_krs_by_mahasiswa(
+                mahasiswa, semester=semester, tahun_ajaran=tahun_ajaran
+            )
+            if krs_existing:
+                raise MahasiswaServiceError(
+                    f"Mahasiswa {mahasiswa.nama} sudah punya KRS semester {semester} {tahun_ajaran}"
+                )
+
+            krs = KRS(mahasiswa, semester, tahun_ajaran)
+            for mk in daftar_mk:
+                krs.tambah_mk(mk)
+            self.state.tambah_krs(krs)
         return krs
     
-    def cari_krs_by_mahasiswa(self, mahasiswa):
-        """Cari KRS berdasarkan mahasiswa"""
-        for k in self.state.daftar_krs:
-            if k.mahasiswa == mahasiswa:
-                return k
+    def cari_krs_by_mahasiswa(self, mahasiswa, semester=None, tahun_ajaran=None):
+        """
+        Cari KRS berdasarkan mahasiswa (lookup index, bukan scan daftar_krs).
+        
+        Args:
+            mahasiswa: Objek Mahasiswa
+            semester: Filter semester (optional)
+            tahun_ajaran: Filter tahun ajaran (optional)
+        
+        Returns:
+            KRS terbaru yang cocok (tanpa filter: KRS semester terakhir) atau None
+        """
+        if not mahasiswa:
+            return None
+        for k in reversed(self.state.krs_by_mahasiswa_id.get(mahasiswa.id, ())):
+            if semester is not None and k.semester != semester:
+                continue
+            if tahun_ajaran is not None and k.tahun_ajaran != tahun_ajaran:
+                continue
+            return k
         return None
     
+    def cari_semua_krs_by_mahasiswa(self, mahasiswa):
+        """Semua KRS mahasiswa (satu per semester), urut sesuai waktu dimuat/dibuat"""
+        if not mahasiswa:
+            return []
+        return list(self.state.krs_by_mahasiswa_id.get(mahasiswa.id, ()))
+    
     def lihat_krs(self, mahasiswa):
         """Lihat KRS dan detail mata kuliah"""
         krs = self.cari_krs_by_mahasiswa(mahasiswa)
@@ -88,35 +115,37 @@ class MahasiswaService:
     
     def hapus_krs(self, mahasiswa, mata_kuliah):
         """Hapus mata kuliah dari KRS"""
-        krs = self.cari_krs_by_mahasiswa(mahasiswa)
-        if not krs:
-            raise MahasiswaServiceError("Mahasiswa tidak punya KRS")
-        if mata_kuliah not in krs.daftar_mk:
-            raise MahasiswaServiceError("Mata kuliah tidak ada di KRS")
-        if len(krs.daftar_mk) <= 1:
-            raise MahasiswaServiceError("Minimal harus ada 1 mata kuliah")
-        
-        krs.daftar_mk.remove(mata_kuliah)
+        with self.state.kunci.tulis(KunciAgregat.KRS, mahasiswa.id):
+            krs = self.cari_krs_by_mahasiswa(mahasiswa)
+            if not krs:
+                raise MahasiswaServiceError("Mahasiswa tidak punya KRS")
+            if mata_kuliah not in krs.daftar_mk:
+                raise MahasiswaServiceError("Mata kuliah tidak ada di KRS")
+            if len(krs.daftar_mk) <= 1:
+                raise MahasiswaServiceError("Minimal harus ada 1 mata kuliah")
+
+            krs.hapus_mk(mata_kuliah)
         return krs
 
     # ============ Presensi Operations ============
     
-    def lihat_presensi_tersedia(self, mahasiswa):
+    def lihat_presensi_tersedia(self, mahasiswa, dari=None, sampai=None):
         """
         Lihat daftar presensi yang tersedia untuk mahasiswa.
-        Hanya presensi dari mata kuliah yang diambil di KRS.
+        Hanya presensi dari mata kuliah yang diambil di KRS dan belum diisi.
+        
+        Args:
+            mahasiswa: Objek Mahasiswa
+            dari: date awal (optional), mis. date.today()
+            sampai: date akhir (optional)
+        
+        Returns:
+            List Presensi, dikelompokkan per mata kuliah dan urut tanggal
         """
         krs = self.cari_krs_by_mahasiswa(mahasiswa)
         if not krs:
             return []
-        
-        mk_di_krs = set(krs.daftar_mk)
-        hasil = []
-        for p in self.state.daftar_presensi:
-            # Hanya jika mata kuliah ada di KRS dan belum hadir
-            if p.mata_kuliah in mk_di_krs and mahasiswa not in p.daftar_hadir:
-                hasil.append(p)
-        return hasil
+        return self.state.presensi_terbuka(mahasiswa, krs.daftar_mk, dari, sampai)
     
     def ambil_presensi(self, mahasiswa, presensi_obj):
         """
@@ -135,11 +164,13 @@ class MahasiswaService:
                 f"Mahasiswa tidak terdaftar di {presensi_obj.mata_kuliah.nama}"
             )
         
-        # Cek apakah sudah pernah hadir
-        if mahasiswa in presensi_obj.daftar_hadir:
-            raise MahasiswaServiceError("Anda sudah absen untuk perkuliahan ini")
-        
-        presensi_obj.daftar_hadir.append(mahasiswa)
+        # Cek apakah sudah pernah hadir (atomik per sesi presensi)
+        jadwal = self.state.kunci_jadwal(presensi_obj.dosen, presensi_obj.mata_kuliah, presensi_obj.tanggal)
+        with self.state.kunci.tulis(KunciAgregat.PRESENSI, jadwal):
+            if mahasiswa in presensi_obj.daftar_hadir:
+                raise MahasiswaServiceError("Anda sudah absen untuk perkuliahan ini")
+
+            presensi_obj.isi_hadir(mahasiswa)
         return presensi_obj
     
     def lihat_presensi_history(self, mahasiswa):
@@ -157,63 +188,27 @@ class MahasiswaService:
     # ============ Nilai Operations ============
     
     def lihat_nilai(self, mahasiswa):
-        """Lihat daftar nilai mahasiswa"""
-        nilai_list = []
-        for n in self.state.daftar_nilai:
-            if n.mahasiswa == mahasiswa:
-                nilai_list.append({
-                    'mata_kuliah': n.mata_kuliah.nama,
-                    'nilai_angka': n.nilai_angka,
-                    'nilai_huruf': n.nilai_huruf,
-                    'dosen': n.dosen.nama
-                })
-        return nilai_list
+        """Lihat daftar nilai mahasiswa (lookup index per mahasiswa, bukan scan daftar_nilai)"""
+        return [
+            {
+                'mata_kuliah': n.mata_kuliah.nama,
+                'nilai_angka': n.nilai_angka,
+                'nilai_huruf': n.nilai_huruf,
+                'dosen': n.dosen.nama
+            }
+            for n in self.state.nilai_mahasiswa(mahasiswa)
+        ]
     
     def hitung_ipk(self, mahasiswa):
-        """Hitung IPK mahasiswa"""
-        nilai_list = self.lihat_nilai(mahasiswa)
-        if not nilai_list:
-            return 0.0
-        
-        total_bobot = 0
-        total_sks = 0
-        
-        for n_info in nilai_list:
-            # Cari mata kuliah untuk dapat SKS
-            mk = self._cari_mata_kuliah(n_info['mata_kuliah'])
-            if mk:
-                bobot = self._huruf_to_bobot(n_info['nilai_huruf'])
-                total_bobot += bobot * mk.sks
-                total_sks += mk.sks
-        
-        if total_sks == 0:
+        """Hitung IPK mahasiswa (dibaca dari akumulator IPK di state)"""
+        if not mahasiswa:
             return 0.0
-        return round(total_bobot / total_sks, 2)
-
-    # ============ Helper Methods ============
-    
-    def _cari_mata_kuliah(self, nama_mk):
-        """Cari mata kuliah berdasarkan nama"""
-        for mk in self.state.daftar_mk:
-            if mk.nama == nama_mk:
-                return mk
-        return None
-    
-    def _huruf_to_bobot(self, huruf):
-        """Konversi nilai huruf ke bobot angka"""
-        mapping = {
-            'A': 4.0, 'A-': 3.7,
-            'B+': 3.3, 'B': 3.0, 'B-': 2.7,
-            'C+': 2.3, 'C': 2.0, 'C-': 1.7,
-            'D+': 1.3, 'D': 1.0,
-            'E': 0.0
-        }
-        return mapping.get(huruf, 0.0)
+        return self.state.hitung_ipk(mahasiswa)
 
     # ============ Validation Methods ============
     
-    def validasi_ambil_krs(self, mahasiswa, daftar_mk):
-        """Validasi sebelum ambil KRS"""
+    def validasi_ambil_krs(self, mahasiswa, daftar_mk, semester=1, tahun_ajaran="2024/2025"):
+        """Validasi sebelum ambil KRS (semester dan tahun ajaran sama dengan ambil_krs)"""
         errors = []
         
         if not mahasiswa:
@@ -223,7 +218,7 @@ class MahasiswaService:
         elif len(daftar_mk) > 24:
             errors.append("Maksimal 24 SKS")
         
-        if self.cari_krs_by_mahasiswa(mahasiswa):
-            errors.append("Mahasiswa sudah punya KRS")
+        if self.cari_krs_by_mahasiswa(mahasiswa, semester=semester, tahun_ajaran=tahun_ajaran):
+            errors.append(f"Mahasiswa sudah punya KRS semester {semester} {tahun_ajaran}")
         
         return errors
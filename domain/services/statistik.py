@@ -0,0 +1,208 @@
+"""
+domain/services/statistik.py
+Statistik akademik yang dijaga secara inkremental.
+Counter diperbarui oleh AppState setiap ada mutasi mahasiswa, KRS, nilai
+dan presensi, sehingga dashboard admin tidak perlu scan data.
+"""
+
+from collections import Counter
+
+
+class StatistikAkademik:
+    """
+    Counter agregat sistem akademik.
+
+    - mahasiswa per prodi
+    - jumlah peserta per mata kuliah (untuk rata-rata besar kelas)
+    - distribusi nilai huruf per mata kuliah
+    - jumlah sesi dan check-in presensi per mata kuliah (tingkat kehadiran)
+
+    Mata kuliah di-index dengan AppState.kunci_mk(mk). Di mode lazy counter
+    KRS, nilai dan presensi hanya mencakup mahasiswa yang sedang dimuat;
+    dashboard memakai dari_agregat() (hasil COUNT/GROUP BY database).
+    """
+
+    def __init__(self):
+        self.prodi = Counter()           # prodi -> jumlah mahasiswa
+        self.peserta = Counter()         # kunci_mk -> jumlah mahasiswa di roster
+        self.distribusi = {}             # kunci_mk -> Counter(nilai_huruf)
+        self.sesi = Counter()            # kunci_mk -> jumlah sesi presensi
+        self.hadir = Counter()           # kunci_mk -> jumlah check-in
+        self._huruf = {}                 # (id_mhs, kunci_mk) -> nilai_huruf yang tercatat
+
+    # ============ Mutasi (dipanggil AppState) ============
+
+    def mahasiswa_ditambah(self, mhs):
+        self.prodi[mhs.prodi] += 1
+
+    def mahasiswa_dihapus(self, mhs):
+        self._kurangi(self.prodi, mhs.prodi)
+
+    def hitung_prodi(self, daftar_mahasiswa):
+        """Isi ulang counter prodi (dipakai loader yang mengisi daftar secara langsung)"""
+        self.prodi = Counter(m.prodi for m in daftar_mahasiswa)
+
+    def peserta_ditambah(self, kunci_mk):
+        self.peserta[kunci_mk] += 1
+
+    def peserta_dihapus(self, kunci_mk):
+        self._kurangi(self.peserta, kunci_mk)
+
+    def nilai_dicatat(self, pasangan, kunci_mk, huruf):
+        """Catat nilai huruf untuk pasangan (id_mhs, kunci_mk); nilai lama diganti"""
+        self.nilai_dihapus(pasangan)
+        self.distribusi.setdefault(kunci_mk, Counter())[huruf] += 1
+        self._huruf[pasangan] = (kunci_mk, huruf)
+
+    def nilai_dihapus(self, pasangan):
+        lama = self._huruf.pop(pasangan, None)
+        if lama is None:
+            return
+        kunci_mk, huruf = lama
+        distribusi = self.distribusi.get(kunci_mk)
+        if distribusi is not None:
+            self._kurangi(distribusi, huruf)
+            if not distribusi:
+                del self.distribusi[kunci_mk]
+
+    def sesi_ditambah(self, kunci_mk, jumlah_hadir=0):
+        self.sesi[kunci_mk] += 1
+        if jumlah_hadir:
+            self.hadir[kunci_mk] += jumlah_hadir
+
+    def sesi_dihapus(self, kunci_mk, jumlah_hadir=0):
+        self._kurangi(self.sesi, kunci_mk)
+        self._kurangi(self.hadir, kunci_mk, jumlah_hadir)
+
+    def hadir_ditambah(self, kunci_mk):
+        self.hadir[kunci_mk] += 1
+
+    def hadir_dihapus(self, kunci_mk):
+        self._kurangi(self.hadir, kunci_mk)
+
+    def ganti_kunci_mk(self, lama, baru, pasangan=()):
+        """
+        Pindahkan counter mata kuliah dari kunci `lama` ke `baru`
+        (mis. MK baru mendapat id_mk dari database).
+
+        Args:
+            lama: Kunci MK lama
+            baru: Kunci MK baru
+            pasangan: Iterable (pasangan_lama, pasangan_baru) nilai yang tercatat
+        """
+        for counter in (self.peserta, self.distribusi, self.sesi, self.hadir):
+            if lama in counter:
+                counter[baru] = counter.pop(lama)
+        for p_lama, p_baru in pasangan:
+            tercatat = self._huruf.pop(p_lama, None)
+            if tercatat is not None:
+                self._huruf[p_baru] = (baru, tercatat[1])
+
+    def reset_peserta(self):
+        self.peserta = Counter()
+
+    def reset_nilai(self):
+        self.distribusi = {}
+        self._huruf = {}
+
+    def reset_presensi(self):
+        self.sesi = Counter()
+        self.hadir = Counter()
+
+    @staticmethod
+    def _kurangi(counter, kunci, jumlah=1):
+        if not jumlah:
+            return
+        counter[kunci] -= jumlah
+        if counter[kunci] <= 0:
+            del counter[kunci]
+
+    # ============ Query ============
+
+    def mahasiswa_per_prodi(self):
+        return dict(self.prodi)
+
+    def rata_rata_kelas(self):
+        """Rata-rata jumlah peserta untuk mata kuliah yang punya peserta"""
+        if not self.peserta:
+            return 0.0
+        return round(sum(self.peserta.values()) / len(self.peserta), 2)
+
+    # Query dipanggil tanpa lock dari sesi lain: dict disalin dulu (list(...))
+    # agar iterasi tidak bentrok dengan mutasi yang sedang berjalan.
+
+    def distribusi_nilai(self):
+        """kunci_mk -> {nilai_huruf: jumlah}"""
+        return {kunci: dict(distribusi) for kunci, distribusi in list(self.distribusi.items())}
+
+    def tingkat_kehadiran(self):
+        """
+        kunci_mk -> persentase check-in terhadap (jumlah sesi x peserta saat ini).
+        Mata kuliah tanpa sesi atau tanpa peserta tidak dimasukkan.
+        """
+        hasil = {}
+        for kunci, jumlah_sesi in list(self.sesi.items()):
+            kapasitas = jumlah_sesi * self.peserta.get(kunci, 0)
+            if kapasitas:
+                hasil[kunci] = round(self.hadir.get(kunci, 0) * 100 / kapasitas, 2)
+        return hasil
+
+    # ============ Hitung ulang (verifikasi) ============
+
+    @classmethod
+    def dari_state(cls, state):
+        """
+        Bangun statistik dari nol dengan scan penuh daftar di state.
+        Peserta dihitung dari KRS (bukan roster mahasiswa_by_mk_id) agar
+        selisih antara KRS dan roster ikut terdeteksi.
+        """
+        stat = cls()
+        stat.hitung_prodi(state.daftar_mahasiswa)
+        peserta = {}
+        for krs in state.daftar_krs:
+            for mk in krs.daftar_mk:
+                peserta.setdefault(state.kunci_mk(mk), set()).add(krs.mahasiswa.id)
+        stat.peserta = Counter({kunci: len(ids) for kunci, ids in peserta.items()})
+        for nilai in state.daftar_nilai:
+            kunci_mk = state.kunci_mk(nilai.mata_kuliah)
+            stat.nilai_dicatat((nilai.mahasiswa.id, kunci_mk), kunci_mk, nilai.nilai_huruf)
+        for presensi in state.daftar_presensi:
+            stat.sesi_ditambah(state.kunci_mk(presensi.mata_kuliah), len(presensi.daftar_hadir))
+        return stat
+
+    @classmethod
+    def dari_agregat(cls, daftar_mahasiswa, peserta, distribusi, sesi, hadir):
+        """
+        Bangun statistik dari agregat database (mode lazy, state hanya
+        memuat sebagian mahasiswa).
+
+        Args:
+            daftar_mahasiswa: Semua mahasiswa (identitas selalu dimuat penuh)
+            peserta: Baris (id_mk, jumlah mahasiswa)
+            distribusi: Baris (id_mk, nilai_huruf, jumlah)
+            sesi: Baris (id_mk, jumlah sesi)
+            hadir: Baris (id_mk, jumlah check-in)
+        """
+        stat = cls()
+        stat.hitung_prodi(daftar_mahasiswa)
+        stat.peserta = Counter({id_mk: int(jumlah) for id_mk, jumlah in peserta if jumlah})
+        for id_mk, huruf, jumlah in distribusi:
+            stat.distribusi.setdefault(id_mk, Counter())[huruf] += int(jumlah)
+        stat.sesi = Counter({id_mk: int(jumlah) for id_mk, jumlah in sesi if jumlah})
+        stat.hadir = Counter({id_mk: int(jumlah) for id_mk, jumlah in hadir if jumlah})
+        return stat
+
+    def bandingkan(self, lain):
+        """
+        Bandingkan dengan statistik lain (mis. hasil dari_state).
+
+        Returns:
+            List pesan selisih (kosong jika sama)
+        """
+        selisih = []
+        for nama in ('prodi', 'peserta', 'sesi', 'hadir'):
+            if getattr(self, nama) != getattr(lain, nama):
+                selisih.append(f"{nama}: counter inkremental berbeda dengan hitung ulang")
+        if self.distribusi_nilai() != lain.distribusi_nilai():
+            selisih.append("distribusi: counter inkremental berbeda dengan hitung ulang")
+        return selisih
@@ -1,4 +1,10 @@
-from .connection import get_connection
 
-__all__ = ["get_connection"]
+from .connection import (
+    get_connection, get_db_config, get_pool, borrow_connection,
+    ConnectionPool, PoolError
+)
 
+__all__ = [
+    "get_connection", "get_db_config", "get_pool", "borrow_connection",
+    "ConnectionPool", "PoolError"
+]
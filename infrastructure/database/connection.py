@@ -1,17 +1,229 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
 import mysql.connector
 from mysql.connector import Error
 
+
+def get_db_config():
+    """
+    Konfigurasi koneksi database dari environment variable.
+
+    SIAK_DB_HOST (localhost), SIAK_DB_PORT (3306), SIAK_DB_USER (root),
+    SIAK_DB_PASSWORD (kosong), SIAK_DB_NAME (siak)
+    """
+    return {
+        "host": os.environ.get("SIAK_DB_HOST", "localhost"),
+        "port": int(os.environ.get("SIAK_DB_PORT", "3306")),
+        "user": os.environ.get("SIAK_DB_USER", "root"),
+        "password": os.environ.get("SIAK_DB_PASSWORD", ""),
+        "database": os.environ.get("SIAK_DB_NAME", "siak"),
+    }
+
+
 def get_connection():
+    """Buka satu koneksi langsung (tanpa pool). Mengembalikan None jika gagal."""
     try:
-        conn = mysql.connector.connect(
-            host="localhost",
-            port=3306,
-            user="root",
-            password="",
-            database="siak"
-        )
+        conn = mysql.connector.connect(**get_db_config())
         if conn.is_connected():
             return conn
     except Error as e:
         print("Gagal koneksi ke database:", e)
         return None
+
+
+class PoolError(Exception):
+    """Custom exception untuk connection pool"""
+    pass
+
+
+class ConnectionPool:
+    """
+    Pool koneksi MySQL dengan ukuran terbatas.
+
+    - Koneksi dibuat saat dibutuhkan sampai `size`, lalu dipakai ulang.
+    - Setiap checkout di-health-check; koneksi mati di-reconnect otomatis.
+    - Jika semua koneksi sedang dipakai, acquire() menunggu sampai `timeout`.
+    - stats() memberi metrik: waktu tunggu, koneksi dipakai, jumlah reconnect.
+    """
+
+    def __init__(self, size=None, timeout=None, config=None, connect=None):
+        """
+        Args:
+            size: Jumlah koneksi maksimum (default env SIAK_DB_POOL_SIZE atau 5)
+            timeout: Detik menunggu koneksi bebas (default env SIAK_DB_POOL_TIMEOUT atau 30)
+            config: Dict parameter mysql.connector.connect (default get_db_config())
+            connect: Factory koneksi (optional, menggantikan mysql.connector.connect)
+        """
+        # `is None` (bukan `or`): size=0 harus ditolak, timeout=0 berarti tidak menunggu
+        self.size = int(size if size is not None else os.environ.get("SIAK_DB_POOL_SIZE", "5"))
+        self.timeout = float(
+            timeout if timeout is not None else os.environ.get("SIAK_DB_POOL_TIMEOUT", "30")
+        )
+        if self.size < 1:
+            raise PoolError("Ukuran pool minimal 1")
+        if self.timeout < 0:
+            raise PoolError("Timeout pool tidak boleh negatif")
+
+        config = config or get_db_config()
+        self._connect = connect or (lambda: mysql.connector.connect(**config))
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._dibuat = 0
+
+        # Metrik
+        self._dipakai = 0
+        self._checkout = 0
+        self._reconnect = 0
+        self._total_tunggu = 0.0
+        self._maks_tunggu = 0.0
+
+    def acquire(self):
+        """
+        Pinjam satu koneksi yang sehat dari pool.
+
+        Raises:
+            PoolError: Jika koneksi tidak bisa dibuat atau timeout menunggu
+        """
+        mulai = time.perf_counter()
+        conn = self._ambil_atau_buat()
+        tunggu = time.perf_counter() - mulai
+
+        try:
+            conn = self._health_check(conn)
+        except Exception:
+            with self._lock:
+                self._dibuat -= 1
+            raise
+
+        with self._lock:
+            self._dipakai += 1
+            self._checkout += 1
+            self._total_tunggu += tunggu
+            self._maks_tunggu = max(self._maks_tunggu, tunggu)
+        return conn
+
+    def release(self, conn):
+        """Kembalikan koneksi ke pool (transaksi yang masih terbuka di-rollback)"""
+        try:
+            if getattr(conn, "in_transaction", False):
+                conn.rollback()
+        except Error:
+            pass
+        with self._lock:
+            self._dipakai -= 1
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Context manager: pinjam koneksi lalu kembalikan otomatis"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self):
+        """Metrik pool saat ini"""
+        with self._lock:
+            rata_tunggu = self._total_tunggu / self._checkout if self._checkout else 0.0
+            return {
+                "size": self.size,
+                "dibuat": self._dibuat,
+                "dipakai": self._dipakai,
+                "idle": self._idle.qsize(),
+                "checkout": self._checkout,
+                "reconnect": self._reconnect,
+                "total_tunggu_ms": round(self._total_tunggu * 1000, 3),
+                "rata_tunggu_ms": round(rata_tunggu * 1000, 3),
+                "maks_tunggu_ms": round(self._maks_tunggu * 1000, 3),
+            }
+
+    def close_all(self):
+        """Tutup semua koneksi idle"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._dibuat -= 1
+            try:
+                conn.close()
+            except Error:
+                pass
+
+    def _ambil_atau_buat(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            boleh_buat = self._dibuat < self.size
+            if boleh_buat:
+                self._dibuat += 1
+        if boleh_buat:
+            try:
+                return self._connect()
+            except Exception as e:
+                with self._lock:
+                    self._dibuat -= 1
+                raise PoolError(f"Gagal membuat koneksi: {e}")
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolError(
+                f"Timeout {self.timeout}s menunggu koneksi (semua {self.size} koneksi dipakai)"
+            )
+
+    def _health_check(self, conn):
+        """Pastikan koneksi hidup; reconnect (atau buat baru) jika mati"""
+        try:
+            if conn.is_connected():
+                return conn
+        except Error:
+            pass
+
+        with self._lock:
+            self._reconnect += 1
+        try:
+            conn.reconnect(attempts=2, delay=0)
+            return conn
+        except Exception:
+            try:
+                return self._connect()
+            except Exception as e:
+                raise PoolError(f"Gagal reconnect ke database: {e}")
+
+
+def get_pool(size=None):
+    """
+    Buat ConnectionPool dan uji satu koneksi.
+    Mengembalikan None jika database tidak bisa diakses.
+    """
+    pool = ConnectionPool(size=size)
+    try:
+        with pool.connection():
+            pass
+    except PoolError as e:
+        print("Gagal koneksi ke database:", e)
+        return None
+    return pool
+
+
+@contextmanager
+def borrow_connection(source):
+    """
+    Yield koneksi dari `source`: dipinjam dari pool jika source ConnectionPool,
+    atau source itu sendiri jika berupa koneksi tunggal.
+    """
+    if isinstance(source, ConnectionPool):
+        with source.connection() as conn:
+            yield conn
+    else:
+        yield source
@@ -1,8 +1,10 @@
 # Infrastructure - Repositories (data access)
-from .base_repository import BaseRepository
+from .base_repository import BaseRepository, RepositoryError
 from .krs_repository import KRSRepository
 from .nilai_repository import NilaiRepository
 from .presensi_repository import PresensiRepository
 from .mata_kuliah_repository import MataKuliahRepository
+from .antrean_tulis import AntreanTulis, AntreanTulisError, JurnalTulis
 
-__all__ = ['BaseRepository', 'KRSRepository', 'NilaiRepository', 'PresensiRepository', 'MataKuliahRepository']
+__all__ = ['BaseRepository', 'RepositoryError', 'KRSRepository', 'NilaiRepository', 'PresensiRepository', 'MataKuliahRepository',
+           'AntreanTulis', 'AntreanTulisError', 'JurnalTulis']
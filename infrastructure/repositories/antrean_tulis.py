@@ -0,0 +1,574 @@
+"""
+infrastructure/repositories/antrean_tulis.py
+Mode write-behind (opsional) untuk operasi tulis dari menu.
+
+Mutasi dicatat ke jurnal lokal (JSONL, fsync per entri) lalu langsung dianggap
+berhasil; user tidak menunggu round trip database. Thread flusher mengirim
+entri ke MySQL per batch dalam satu transaksi, urut seq (jadi urutan per
+entitas terjaga), dan mengulang dengan backoff jika database tidak bisa
+dihubungi. Seq terakhir yang sudah di-commit disimpan di tabel jurnal_flush
+dalam transaksi yang sama, sehingga replay saat startup tidak menerapkan
+entri dua kali.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from itertools import groupby
+
+from mysql.connector import errors as mysql_errors
+
+from infrastructure.database.connection import borrow_connection
+from infrastructure.repositories.krs_repository import KRSRepository
+from infrastructure.repositories.nilai_repository import NilaiRepository
+from infrastructure.repositories.presensi_repository import PresensiRepository
+from utils.logger import SystemLogger
+
+
+class AntreanTulisError(Exception):
+    """Custom exception untuk jurnal / flush write-behind"""
+    pass
+
+
+# Error data: diulang pun tetap gagal, entri dipindah ke file .gagal.
+# Error lain (koneksi putus, pool habis) diulang dengan backoff.
+ERROR_PERMANEN = (
+    mysql_errors.IntegrityError,
+    mysql_errors.DataError,
+    mysql_errors.ProgrammingError,
+    mysql_errors.NotSupportedError,
+    AntreanTulisError,
+)
+
+
+class JurnalTulis:
+    """
+    File jurnal append-only: satu entri JSON per baris.
+    Entri baru di-fsync sebelum tambah() kembali, jadi sudah aman dari crash.
+    """
+
+    CHECKPOINT = "checkpoint"      # baris penanda seq (hasil kompaksi)
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Lokasi file jurnal (folder dibuat jika belum ada)
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self.logger = SystemLogger()
+        self.entri, self.seq_terakhir = self._baca()
+        self._file = None
+        # Tulis ulang sekali di awal: buang baris terpotong dari crash sebelumnya
+        self.kompak(self.entri)
+
+    def _baca(self):
+        entri = []
+        seq = 0
+        try:
+            f = open(self.path, encoding="utf-8")
+        except FileNotFoundError:
+            return entri, seq
+        with f:
+            for nomor, baris in enumerate(f, 1):
+                try:
+                    isi = json.loads(baris)
+                    seq = max(seq, int(isi["seq"]))
+                except (ValueError, KeyError, TypeError):
+                    self.logger.warning(f"Jurnal {self.path}: baris {nomor} rusak, diabaikan")
+                    continue
+                if isi.get("jenis") != self.CHECKPOINT:
+                    entri.append(isi)
+        return entri, seq
+
+    def tambah(self, jenis, kunci, data):
+        """
+        Tambah satu entri dan tunggu sampai tersimpan di disk.
+
+        Returns:
+            Dict entri (dengan seq)
+
+        Raises:
+            AntreanTulisError: Jika file jurnal tidak bisa ditulis
+        """
+        with self._lock:
+            entri = {"seq": self.seq_terakhir + 1, "jenis": jenis, "kunci": kunci, "data": data}
+            try:
+                self._file.write(json.dumps(entri, separators=(",", ":")) + "\n")
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except (OSError, ValueError) as e:
+                raise AntreanTulisError(f"Gagal menulis jurnal: {e}")
+            self.seq_terakhir += 1
+            return entri
+
+    def naikkan_seq(self, minimal):
+        """Pastikan seq entri berikutnya > minimal (mis. seq yang sudah tercatat di database)"""
+        with self._lock:
+            self.seq_terakhir = max(self.seq_terakhir, minimal)
+
+    def ukuran(self):
+        with self._lock:
+            return self._file.tell() if self._file else 0
+
+    def kompak(self, tertunda):
+        """
+        Tulis ulang jurnal hanya berisi entri `tertunda` (ganti file secara atomik).
+        Baris checkpoint menyimpan seq terakhir agar seq tetap naik setelah restart.
+        """
+        with self._lock:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"seq": self.seq_terakhir, "jenis": self.CHECKPOINT}) + "\n")
+                for entri in tertunda:
+                    f.write(json.dumps(entri, separators=(",", ":")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            if self._file is not None:
+                self._file.close()
+            os.replace(tmp, self.path)
+            self._fsync_folder()
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    def tutup(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _fsync_folder(self):
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        except OSError:
+            return      # mis. Windows: folder tidak bisa dibuka untuk fsync
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+class AntreanTulis:
+    """
+    Antrean write-behind di atas JurnalTulis.
+
+    Repository memanggil catat() (lewat parameter `antrean`) alih-alih menulis
+    ke database. Jenis entri:
+    - "mk":    insert mata kuliah -> setelah_flush(id_mk)
+    - "nilai": upsert nilai (batch executemany)
+    - "krs":   buat header KRS jika belum ada + detail yang belum ada -> setelah_flush(id_krs)
+    - "hadir": check-in presensi (satu executemany untuk semua sesi dalam batch)
+
+    Konfigurasi default dari environment:
+    SIAK_JURNAL_PATH (data/jurnal_tulis.jsonl), SIAK_JURNAL_BATCH (500),
+    SIAK_JURNAL_INTERVAL (0.2 detik), SIAK_JURNAL_ID (utama).
+    """
+
+    SEQ_QUERY = """
+        INSERT INTO jurnal_flush (id_jurnal, seq_terakhir)
+        VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE seq_terakhir = GREATEST(seq_terakhir, VALUES(seq_terakhir))
+    """
+
+    MK_QUERY = """
+        INSERT INTO mata_kuliah (kode_mk, nama_mk, sks, id_dosen)
+        VALUES (%s, %s, %s, %s)
+    """
+
+    BATAS_KOMPAK = 1024 * 1024     # byte; jurnal ditulis ulang setelah melewati ini
+
+    def __init__(self, pool, path=None, ukuran_batch=None, interval=None,
+                 id_jurnal=None, maks_tunda=30.0):
+        """
+        Args:
+            pool: ConnectionPool (atau koneksi tunggal) tujuan flush
+            path: Lokasi file jurnal
+            ukuran_batch: Entri maksimum per transaksi
+            interval: Detik menunggu entri lain terkumpul sebelum flush
+            id_jurnal: Nama baris di tabel jurnal_flush (unik per instance aplikasi)
+            maks_tunda: Jeda retry maksimum (detik) saat database tidak bisa dihubungi
+        """
+        self.pool = pool
+        self.path = path or os.environ.get(
+            "SIAK_JURNAL_PATH", os.path.join("data", "jurnal_tulis.jsonl")
+        )
+        self.ukuran_batch = int(ukuran_batch or os.environ.get("SIAK_JURNAL_BATCH", "500"))
+        self.interval = float(interval or os.environ.get("SIAK_JURNAL_INTERVAL", "0.2"))
+        self.id_jurnal = id_jurnal or os.environ.get("SIAK_JURNAL_ID", "utama")
+        self.maks_tunda = maks_tunda
+        if self.ukuran_batch < 1:
+            raise AntreanTulisError("Ukuran batch minimal 1")
+
+        self.logger = SystemLogger()
+        self.jurnal = JurnalTulis(self.path)
+        self._tertunda = list(self.jurnal.entri)     # entri belum di-commit, urut seq
+        self._callback = {}                          # seq -> (setelah_flush, saat_gagal)
+        self._kondisi = threading.Condition()
+        self._sedang_flush = False
+        self._berhenti = False
+        self._thread = None
+        self._statistik = Counter()
+
+    # ============ Dipanggil repository ============
+
+    def catat(self, jenis, kunci, data, setelah_flush=None, saat_gagal=None):
+        """
+        Catat satu mutasi ke jurnal (durable) dan antrekan untuk flush.
+
+        Args:
+            jenis: "mk", "nilai", "krs" atau "hadir"
+            kunci: Kunci entitas (entri berkunci sama diterapkan berurutan)
+            data: Dict JSON-serializable untuk handler jenis tsb.
+            setelah_flush: callback(hasil) setelah entri ter-commit (optional)
+            saat_gagal: callback() jika entri ditolak database permanen (optional)
+
+        Returns:
+            seq entri
+
+        Raises:
+            AntreanTulisError: Jika jurnal tidak bisa ditulis
+        """
+        if jenis not in self.HANDLER:
+            raise AntreanTulisError(f"Jenis entri tidak dikenal: {jenis}")
+        with self._kondisi:
+            entri = self.jurnal.tambah(jenis, kunci, data)
+            self._tertunda.append(entri)
+            if setelah_flush or saat_gagal:
+                self._callback[entri["seq"]] = (setelah_flush, saat_gagal)
+            self._statistik["dicatat"] += 1
+            self._kondisi.notify_all()
+        return entri["seq"]
+
+    def sinkronkan(self, batas_waktu=None):
+        """
+        Tunggu sampai semua entri tertunda ter-commit (barrier sebelum
+        operasi database sinkron agar urutan tulis tetap terjaga).
+
+        Returns:
+            True jika antrean kosong, False jika batas waktu habis
+        """
+        if threading.current_thread() is self._thread:
+            return True
+        with self._kondisi:
+            return self._kondisi.wait_for(
+                lambda: not self._tertunda and not self._sedang_flush, batas_waktu
+            )
+
+    @property
+    def jumlah_tertunda(self):
+        return len(self._tertunda)
+
+    def stats(self):
+        """Metrik antrean: tertunda, dicatat, diflush, batch, retry, gagal"""
+        with self._kondisi:
+            hasil = dict(self._statistik)
+            hasil["tertunda"] = len(self._tertunda)
+        batch = hasil.get("batch", 0)
+        hasil["rata_batch"] = round(hasil.get("diflush", 0) / batch, 1) if batch else 0.0
+        return hasil
+
+    # ============ Siklus hidup ============
+
+    def replay(self):
+        """
+        Terapkan entri jurnal yang belum tercatat di database (dipanggil saat
+        startup sebelum data dimuat dan sebelum flusher berjalan).
+
+        Returns:
+            Jumlah entri yang diterapkan
+
+        Raises:
+            AntreanTulisError: Jika database tidak bisa dihubungi (entri tetap di jurnal)
+        """
+        try:
+            seq_db = self._seq_database()
+        except Exception as e:
+            raise AntreanTulisError(f"Gagal membaca posisi jurnal di database: {e}")
+        self.jurnal.naikkan_seq(seq_db)
+        with self._kondisi:
+            self._tertunda = [e for e in self._tertunda if e["seq"] > seq_db]
+            jumlah = len(self._tertunda)
+        while self._tertunda:
+            if not self._proses_batch():
+                raise AntreanTulisError(
+                    f"Replay jurnal terhenti: {len(self._tertunda)} entri belum terkirim"
+                )
+        return jumlah
+
+    def mulai(self):
+        """Jalankan thread flusher di background"""
+        if self._thread is None:
+            self._berhenti = False
+            self._thread = threading.Thread(target=self._jalankan, name="flusher-jurnal", daemon=True)
+            self._thread.start()
+
+    def berhenti(self, batas_waktu=10.0):
+        """
+        Hentikan flusher setelah mencoba mengirim sisa antrean.
+        Entri yang belum terkirim tetap di jurnal dan di-replay saat startup berikutnya.
+
+        Returns:
+            Jumlah entri yang masih tertunda
+        """
+        with self._kondisi:
+            self._berhenti = True
+            self._kondisi.notify_all()
+        if self._thread is not None:
+            self._thread.join(batas_waktu)
+            self._thread = None
+        if not self._tertunda:
+            self.jurnal.kompak([])
+        return len(self._tertunda)
+
+    # ============ Thread flusher ============
+
+    def _jalankan(self):
+        gagal = 0
+        while True:
+            with self._kondisi:
+                while not self._tertunda and not self._berhenti:
+                    self._kondisi.wait()
+                if not self._tertunda:
+                    return
+                # Group commit: beri waktu entri lain terkumpul sebelum flush
+                batas = time.monotonic() + self.interval
+                while (len(self._tertunda) < self.ukuran_batch and not self._berhenti
+                       and time.monotonic() < batas):
+                    self._kondisi.wait(batas - time.monotonic())
+
+            if self._proses_batch():
+                gagal = 0
+                continue
+            gagal += 1
+            if self._berhenti and gagal >= 3:
+                self.logger.warning(
+                    f"Flusher berhenti, {len(self._tertunda)} entri tetap di jurnal untuk replay"
+                )
+                return
+            tunda = min(self.maks_tunda, self.interval * 2 ** gagal)
+            with self._kondisi:
+                self._kondisi.wait_for(lambda: self._berhenti, tunda)
+
+    def _proses_batch(self):
+        """
+        Kirim satu batch dari depan antrean.
+
+        Returns:
+            True jika antrean maju (batch ter-commit atau entri rusak dipindah),
+            False jika database tidak bisa dihubungi (perlu retry)
+        """
+        with self._kondisi:
+            batch = self._tertunda[:self.ukuran_batch]
+            self._sedang_flush = True
+        try:
+            try:
+                hasil = self._terapkan(batch)
+            except ERROR_PERMANEN as e:
+                if len(batch) == 1:
+                    self._pindah_ke_gagal(batch[0], e)
+                    return True
+                # Cari entri penyebab: ulangi satu per satu (urutan tetap)
+                for entri in batch:
+                    if entri in self._tertunda and not self._proses_satu(entri):
+                        return False
+                return True
+            except Exception as e:
+                self._statistik["retry"] += 1
+                self.logger.warning(f"Flush jurnal gagal, akan diulang: {e}")
+                return False
+            self._selesai(batch, hasil)
+            return True
+        finally:
+            with self._kondisi:
+                self._sedang_flush = False
+                self._kondisi.notify_all()
+
+    def _proses_satu(self, entri):
+        try:
+            hasil = self._terapkan([entri])
+        except ERROR_PERMANEN as e:
+            self._pindah_ke_gagal(entri, e)
+            return True
+        except Exception as e:
+            self._statistik["retry"] += 1
+            self.logger.warning(f"Flush jurnal gagal, akan diulang: {e}")
+            return False
+        self._selesai([entri], hasil)
+        return True
+
+    def _selesai(self, batch, hasil):
+        selesai = {e["seq"] for e in batch}
+        with self._kondisi:
+            self._tertunda = [e for e in self._tertunda if e["seq"] not in selesai]
+            callback = [(self._callback.pop(e["seq"], (None, None))[0], h) for e, h in zip(batch, hasil)]
+            self._statistik["diflush"] += len(batch)
+            self._statistik["batch"] += 1
+            if self.jurnal.ukuran() > self.BATAS_KOMPAK:
+                self.jurnal.kompak(self._tertunda)
+        for setelah_flush, h in callback:
+            if setelah_flush is not None:
+                try:
+                    setelah_flush(h)
+                except Exception as e:
+                    self.logger.error("Callback setelah flush gagal", e)
+
+    def _pindah_ke_gagal(self, entri, error):
+        """
+        Entri ditolak database: pindahkan entri itu dan entri berikutnya dengan
+        kunci yang sama (atau yang merujuk MK yang gagal dibuat) ke file .gagal
+        agar tidak diterapkan di luar urutan.
+        """
+        with self._kondisi:
+            terkait = [
+                e for e in self._tertunda
+                if e["seq"] >= entri["seq"] and (e["kunci"] == entri["kunci"] or self._merujuk_mk(e, entri))
+            ]
+            seq_terkait = {e["seq"] for e in terkait}
+            self._tertunda = [e for e in self._tertunda if e["seq"] not in seq_terkait]
+            callback = [self._callback.pop(seq, (None, None))[1] for seq in sorted(seq_terkait)]
+            self._statistik["gagal"] += len(terkait)
+        try:
+            with open(self.path + ".gagal", "a", encoding="utf-8") as f:
+                for e in terkait:
+                    f.write(json.dumps(dict(e, error=str(error)), separators=(",", ":")) + "\n")
+        except OSError as e:
+            self.logger.error("Gagal menulis file jurnal .gagal", e)
+        # Buang dari jurnal agar tidak di-replay lagi saat startup
+        with self._kondisi:
+            self.jurnal.kompak(self._tertunda)
+        self.logger.error(f"Entri jurnal {entri['kunci']} ditolak database ({len(terkait)} entri)", error)
+        for saat_gagal in callback:
+            if saat_gagal is not None:
+                try:
+                    saat_gagal()
+                except Exception as e:
+                    self.logger.error("Callback gagal flush error", e)
+
+    @staticmethod
+    def _merujuk_mk(entri, entri_mk):
+        """True jika entri memakai MK (lewat kode_mk, belum punya id) yang dibuat entri_mk"""
+        if entri_mk["jenis"] != "mk":
+            return False
+        kode = entri_mk["data"]["kode_mk"]
+        data = entri["data"]
+        if data.get("id_mk") is None and data.get("kode_mk") == kode:
+            return True
+        return any(id_mk is None and kode_mk == kode for id_mk, kode_mk in data.get("mk", ()))
+
+    # ============ Penerapan ke database ============
+
+    def _terapkan(self, batch):
+        """Terapkan batch dalam satu transaksi (urut seq); kembalikan hasil per entri"""
+        with borrow_connection(self.pool) as conn:
+            cursor = conn.cursor()
+            try:
+                hasil = []
+                cache_mk = {}
+                # Entri berurutan dengan jenis sama diproses sekaligus (mis. executemany nilai)
+                for jenis, grup in groupby(batch, key=lambda e: e["jenis"]):
+                    handler = getattr(self, self.HANDLER[jenis])
+                    hasil.extend(handler(cursor, [e["data"] for e in grup], cache_mk))
+                cursor.execute(self.SEQ_QUERY, (self.id_jurnal, batch[-1]["seq"]))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        return hasil
+
+    def _terapkan_mk(self, cursor, daftar, cache_mk):
+        hasil = []
+        for data in daftar:
+            cursor.execute(self.MK_QUERY, (data["kode_mk"], data["nama_mk"], data["sks"], data["id_dosen"]))
+            cache_mk[data["kode_mk"]] = cursor.lastrowid
+            hasil.append(cursor.lastrowid)
+        return hasil
+
+    def _terapkan_nilai(self, cursor, daftar, cache_mk):
+        rows = [
+            (data["id_mahasiswa"], self._id_mk(cursor, data["id_mk"], data["kode_mk"], cache_mk),
+             data["nilai_angka"], data["nilai_huruf"], data.get("nilai_bobot"))
+            for data in daftar
+        ]
+        cursor.executemany(NilaiRepository.UPSERT_QUERY, rows)
+        return [None] * len(daftar)
+
+    def _terapkan_krs(self, cursor, daftar, cache_mk):
+        hasil = []
+        for data in daftar:
+            id_krs = data.get("id_krs") or self._cari_krs(cursor, data)
+            if id_krs is None:
+                cursor.execute(
+                    "INSERT INTO krs (id_mahasiswa, semester, tahun_ajaran) VALUES (%s, %s, %s)",
+                    (data["id_mahasiswa"], data["semester"], data["tahun_ajaran"])
+                )
+                id_krs = cursor.lastrowid
+                sudah = set()
+            else:
+                cursor.execute("SELECT id_mk FROM krs_detail WHERE id_krs = %s", (id_krs,))
+                sudah = {row[0] for row in cursor.fetchall()}
+            baru = []
+            for id_mk, kode_mk in data["mk"]:
+                id_mk = self._id_mk(cursor, id_mk, kode_mk, cache_mk)
+                if id_mk not in sudah:
+                    sudah.add(id_mk)
+                    baru.append((id_krs, id_mk))
+            if baru:
+                cursor.executemany(KRSRepository.DETAIL_QUERY, baru)
+            hasil.append(id_krs)
+        return hasil
+
+    def _terapkan_hadir(self, cursor, daftar, cache_mk):
+        # Urut per sesi agar baris satu presensi berdekatan di index presensi_detail
+        rows = sorted(
+            (data["id_presensi"], id_mhs) for data in daftar for id_mhs in data["mahasiswa"]
+        )
+        cursor.executemany(PresensiRepository.HADIR_QUERY, rows)
+        return [None] * len(daftar)
+
+    HANDLER = {
+        "mk": "_terapkan_mk", "nilai": "_terapkan_nilai",
+        "krs": "_terapkan_krs", "hadir": "_terapkan_hadir",
+    }
+
+    def _cari_krs(self, cursor, data):
+        """Header KRS (mahasiswa, semester, tahun ajaran) yang sudah ada, atau None"""
+        cursor.execute(
+            """
+            SELECT id_krs FROM krs
+            WHERE id_mahasiswa = %s AND semester = %s AND tahun_ajaran = %s
+            ORDER BY id_krs LIMIT 1
+            """,
+            (data["id_mahasiswa"], data["semester"], data["tahun_ajaran"])
+        )
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def _id_mk(self, cursor, id_mk, kode_mk, cache_mk):
+        """id_mk dari entri, atau dicari lewat kode_mk (MK yang dibuat sebelum sempat di-flush)"""
+        if id_mk is not None:
+            return id_mk
+        if kode_mk not in cache_mk:
+            cursor.execute("SELECT id_mk FROM mata_kuliah WHERE kode_mk = %s", (kode_mk,))
+            row = cursor.fetchone()
+            if row is None:
+                raise AntreanTulisError(f"Mata kuliah {kode_mk} tidak ada di database")
+            cache_mk[kode_mk] = row[0]
+        return cache_mk[kode_mk]
+
+    def _seq_database(self):
+        with borrow_connection(self.pool) as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(
+                    "SELECT seq_terakhir FROM jurnal_flush WHERE id_jurnal = %s", (self.id_jurnal,)
+                )
+                row = cursor.fetchone()
+            finally:
+                cursor.close()
+        return int(row[0]) if row else 0
@@ -4,21 +4,52 @@ Base class untuk semua repository.
 Implementasi Repository Pattern untuk abstraksi database.
 """
 
+import os
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+from infrastructure.database.connection import borrow_connection
 
 
 class BaseRepository(ABC):
     """
     Abstract base class untuk semua repository.
     Memastikan interface konsisten untuk semua operasi database.
+
+    Query daftar (tampilkan_semua, cari_by_* yang mengembalikan banyak baris)
+    berupa generator yang men-stream baris dari database. Jika iterasi
+    dihentikan sebelum habis, tutup generatornya (mis. dengan
+    contextlib.closing) agar cursor dan koneksi langsung dilepas.
+
+    Dengan `antrean` (AntreanTulis), repository yang mendukung write-behind
+    mencatat simpan() ke jurnal alih-alih menulis langsung; operasi database
+    sinkron lain menunggu antrean kosong dulu agar urutan tulis tetap terjaga.
     """
     
-    def __init__(self, conn):
+    # Jumlah baris per fetch untuk query streaming (env SIAK_DB_FETCH_SIZE)
+    UKURAN_FETCH = int(os.environ.get("SIAK_DB_FETCH_SIZE", "1000"))
+    # Tabel dan primary key untuk keyset pagination (diisi subclass)
+    TABEL = None
+    KOLOM_ID = None
+    
+    # Batas waktu (detik) menunggu antrean write-behind sebelum operasi sinkron
+    BATAS_TUNGGU_ANTREAN = 30.0
+    
+    def __init__(self, conn, state=None, ukuran_fetch=None, antrean=None):
         """
         Args:
-            conn: Database connection object
+            conn: ConnectionPool (koneksi dipinjam per operasi) atau
+                satu database connection object
+            state: AppState (optional). Jika diberikan, index in-memory
+                ikut diperbarui setelah operasi tulis berhasil.
+            ukuran_fetch: Jumlah baris per fetch untuk query streaming
+                (default UKURAN_FETCH)
+            antrean: AntreanTulis untuk mode write-behind (optional)
         """
         self.conn = conn
+        self.state = state
+        self.ukuran_fetch = int(ukuran_fetch or self.UKURAN_FETCH)
+        self.antrean = antrean
     
     @abstractmethod
     def simpan(self, obj):
@@ -42,43 +73,173 @@ class BaseRepository(ABC):
     
     @abstractmethod
     def tampilkan_semua(self):
-        """Tampilkan semua data"""
+        """Stream semua data (generator baris)"""
         pass
     
+    @contextmanager
+    def transaksi(self):
+        """
+        Pinjam koneksi dan yield cursor dalam satu transaksi.
+        Commit jika blok selesai, rollback jika error; cursor selalu ditutup
+        dan koneksi dikembalikan ke pool.
+        """
+        self._tunggu_antrean()
+        with borrow_connection(self.conn) as conn:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def fetch_one(self, query, params=None):
+        """Jalankan query baca dan kembalikan satu baris (atau None)"""
+        return self._fetch(query, params, lambda cursor: cursor.fetchone())
+
+    def fetch_all(self, query, params=None):
+        """Jalankan query baca dan kembalikan semua baris"""
+        return self._fetch(query, params, lambda cursor: cursor.fetchall())
+
+    def fetch_iter(self, query, params=None, ukuran_batch=None):
+        """
+        Jalankan query baca dan yield baris satu per satu.
+
+        Baris diambil `ukuran_batch` (default self.ukuran_fetch) sekaligus
+        dengan fetchmany dari cursor unbuffered, jadi result set di-stream
+        dari server dan tidak pernah dimuat utuh di memori. Koneksi dipinjam
+        selama generator berjalan; jika iterasi berhenti lebih awal, sisa
+        baris dibuang sebelum cursor ditutup agar koneksi bisa dipakai lagi.
+
+        Raises:
+            RepositoryError: Jika query gagal
+        """
+        ukuran_batch = ukuran_batch or self.ukuran_fetch
+        self._tunggu_antrean()
+        try:
+            with borrow_connection(self.conn) as conn:
+                cursor = conn.cursor(buffered=False)
+                habis = False
+                try:
+                    cursor.execute(query, params or ())
+                    while True:
+                        batch = cursor.fetchmany(ukuran_batch)
+                        if not batch:
+                            habis = True
+                            break
+                        yield from batch
+                finally:
+                    if not habis:
+                        try:
+                            while cursor.fetchmany(ukuran_batch):
+                                pass
+                        except Exception:
+                            pass
+                    cursor.close()
+        except Exception as e:
+            raise RepositoryError(f"Database error: {str(e)}")
+
+    def halaman(self, setelah=None, sebelum=None, batas=50, **filter):
+        """
+        Satu halaman baris tabel dengan keyset pagination pada KOLOM_ID.
+        Tidak memakai OFFSET, jadi biaya tiap halaman sama di awal maupun
+        di akhir tabel (memanfaatkan index primary key).
+
+        Args:
+            setelah: KOLOM_ID terakhir halaman saat ini -> halaman berikutnya
+            sebelum: KOLOM_ID pertama halaman saat ini -> halaman sebelumnya
+            batas: Jumlah baris per halaman
+            **filter: Filter kesamaan kolom, mis. id_mk=5
+
+        Returns:
+            List baris (SELECT *) urut naik KOLOM_ID, maksimal `batas` baris.
+            Kolom pertama setiap tabel siak adalah primary key, jadi
+            baris[0] bisa dipakai sebagai `setelah` / `sebelum` berikutnya.
+
+        Raises:
+            RepositoryError: Jika query gagal atau repository tidak mendukung paging
+        """
+        if not self.TABEL or not self.KOLOM_ID:
+            raise RepositoryError(f"{type(self).__name__} tidak mendukung pagination")
+
+        kondisi = []
+        params = []
+        for kolom, nilai in filter.items():
+            if not kolom.isidentifier():
+                raise RepositoryError(f"Nama kolom tidak valid: {kolom}")
+            kondisi.append(f"{kolom} = %s")
+            params.append(nilai)
+
+        mundur = sebelum is not None
+        if mundur:
+            kondisi.append(f"{self.KOLOM_ID} < %s")
+            params.append(sebelum)
+        elif setelah is not None:
+            kondisi.append(f"{self.KOLOM_ID} > %s")
+            params.append(setelah)
+
+        where = "WHERE " + " AND ".join(kondisi) if kondisi else ""
+        query = (
+            f"SELECT * FROM {self.TABEL} {where} "
+            f"ORDER BY {self.KOLOM_ID} {'DESC' if mundur else 'ASC'} LIMIT %s"
+        )
+        params.append(int(batas))
+        rows = self.fetch_all(query, tuple(params))
+        return rows[::-1] if mundur else rows
+
+    def _tunggu_antrean(self):
+        """
+        Barrier write-behind: tunggu entri jurnal tertunda ter-commit sebelum
+        operasi sinkron (read-your-writes dan tidak mendahului tulis lama).
+
+        Raises:
+            RepositoryError: Jika antrean tidak kosong dalam BATAS_TUNGGU_ANTREAN
+        """
+        if self.antrean is not None and not self.antrean.sinkronkan(self.BATAS_TUNGGU_ANTREAN):
+            raise RepositoryError(
+                f"Database belum bisa dihubungi: {self.antrean.jumlah_tertunda} perubahan "
+                "masih menunggu di jurnal"
+            )
+
+    def _fetch(self, query, params, ambil):
+        self._tunggu_antrean()
+        try:
+            with borrow_connection(self.conn) as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(query, params or ())
+                    return ambil(cursor)
+                finally:
+                    cursor.close()
+        except Exception as e:
+            raise RepositoryError(f"Database error: {str(e)}")
+
     def execute_query(self, query, params=None):
         """
-        Execute raw SQL query.
+        Execute raw SQL query dalam satu transaksi (lihat transaksi()):
+        di-commit jika berhasil, rollback jika gagal.
         
         Args:
             query: SQL query string
             params: Query parameters (tuple or dict)
         
         Returns:
-            Query result
+            List baris untuk query yang menghasilkan result set,
+            selain itu jumlah baris yang terpengaruh
+        
+        Raises:
+            RepositoryError: Jika query gagal
         """
         try:
-            cursor = self.conn.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            return cursor
+            with self.transaksi() as cursor:
+                cursor.execute(query, params or ())
+                if cursor.description is not None:
+                    return cursor.fetchall()
+                return cursor.rowcount
         except Exception as e:
             raise RepositoryError(f"Database error: {str(e)}")
-    
-    def commit(self):
-        """Commit transaction"""
-        try:
-            self.conn.commit()
-        except Exception as e:
-            raise RepositoryError(f"Commit error: {str(e)}")
-    
-    def rollback(self):
-        """Rollback transaction"""
-        try:
-            self.conn.rollback()
-        except Exception as e:
-            raise RepositoryError(f"Rollback error: {str(e)}")
 
 
 class RepositoryError(Exception):
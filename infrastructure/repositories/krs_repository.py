@@ -10,73 +10,157 @@ from domain.entities.krs import KRS
 class KRSRepository(BaseRepository):
     """Repository untuk entity KRS"""
     
+    TABEL = "krs"
+    KOLOM_ID = "id_krs"
+    
+    DETAIL_QUERY = """
+        INSERT INTO krs_detail (id_krs, id_mk)
+        VALUES (%s, %s)
+    """
+
     def simpan(self, krs_obj):
         """
         Simpan KRS ke database.
+        Header dan seluruh detail ditulis dalam satu transaksi;
+        detail dikirim sebagai satu batch executemany.
         
         Args:
             krs_obj: Objek KRS
         
+        Mode write-behind: KRS langsung masuk state, header + detail dicatat
+        ke jurnal dan id_krs dipasang setelah flush (fungsi mengembalikan None).
+        
         Raises:
             RepositoryError: Jika query gagal
         """
+        if self.antrean is not None:
+            self._catat(krs_obj, krs_obj.daftar_mk)
+            if self.state is not None:
+                self.state.tambah_krs(krs_obj)
+            return None
+
         try:
-            cursor = self.conn.cursor()
-            
-            # Insert KRS header
-            query = """
-                INSERT INTO krs (id_mahasiswa, semester, tahun_ajaran)
-                VALUES (%s, %s, %s)
-            """
-            cursor.execute(query, (
-                krs_obj.mahasiswa.id,
-                krs_obj.semester,
-                krs_obj.tahun_ajaran,
-            ))
-            
-            krs_id = cursor.lastrowid
-            
-            # Insert KRS detail
-            for mk in krs_obj.daftar_mk:
-                detail_query = """
-                    INSERT INTO krs_detail (id_krs, id_mk)
-                    VALUES (%s, %s)
-                """
-                cursor.execute(detail_query, (krs_id, mk.id_mk))
-            
-            self.commit()
-            krs_obj.id_krs = krs_id
-            return krs_id
+            with self.transaksi() as cursor:
+                krs_id = self._insert_header(cursor, krs_obj)
+                self._insert_detail(cursor, [(krs_id, mk.id_mk) for mk in krs_obj.daftar_mk])
         except Exception as e:
-            self.rollback()
             raise RepositoryError(f"Gagal simpan KRS: {str(e)}")
 
+        krs_obj.id_krs = krs_id
+        if self.state is not None:
+            self.state.tambah_krs(krs_obj)
+        return krs_id
+
+    def simpan_banyak(self, daftar_krs, ukuran_batch=1000):
+        """
+        Simpan banyak KRS sekaligus (mis. import mahasiswa angkatan baru).
+        Semua header dan detail masuk dalam satu transaksi; detail dikirim
+        per batch `ukuran_batch` baris. Jika gagal, tidak ada yang tersimpan.
+        
+        Args:
+            daftar_krs: List objek KRS (belum punya id_krs)
+            ukuran_batch: Jumlah baris krs_detail per executemany
+        
+        Returns:
+            List id_krs sesuai urutan daftar_krs
+        
+        Raises:
+            RepositoryError: Jika query gagal
+        """
+        try:
+            with self.transaksi() as cursor:
+                ids = []
+                detail = []
+                for krs_obj in daftar_krs:
+                    # id_krs per header dibutuhkan untuk detail, jadi header tetap
+                    # di-insert satu per satu (AUTO_INCREMENT multi-row tidak dijamin berurutan)
+                    krs_id = self._insert_header(cursor, krs_obj)
+                    ids.append(krs_id)
+                    detail.extend((krs_id, mk.id_mk) for mk in krs_obj.daftar_mk)
+                    if len(detail) >= ukuran_batch:
+                        self._insert_detail(cursor, detail)
+                        detail = []
+                self._insert_detail(cursor, detail)
+        except Exception as e:
+            raise RepositoryError(f"Gagal simpan banyak KRS: {str(e)}")
+
+        for krs_obj, krs_id in zip(daftar_krs, ids):
+            krs_obj.id_krs = krs_id
+            if self.state is not None:
+                self.state.tambah_krs(krs_obj)
+        return ids
+
     def tambah_detail(self, krs_obj, daftar_mk):
-        """Tambah mata kuliah ke KRS yang sudah ada (insert ke krs_detail)."""
+        """
+        Tambah mata kuliah ke KRS yang sudah ada (batch insert ke krs_detail).
+        Mode write-behind: dicatat ke jurnal; KRS yang header-nya belum
+        ter-flush juga boleh (header dicari/dibuat saat flush).
+        """
+        if self.antrean is not None:
+            self._catat(krs_obj, daftar_mk)
+            return
+
         if not getattr(krs_obj, "id_krs", None):
             raise RepositoryError("KRS belum punya id_krs; gunakan simpan() untuk membuat header")
 
         try:
-            cursor = self.conn.cursor()
-            for mk in daftar_mk:
-                detail_query = """
-                    INSERT INTO krs_detail (id_krs, id_mk)
-                    VALUES (%s, %s)
-                """
-                cursor.execute(detail_query, (krs_obj.id_krs, mk.id_mk))
-            self.commit()
+            with self.transaksi() as cursor:
+                self._insert_detail(cursor, [(krs_obj.id_krs, mk.id_mk) for mk in daftar_mk])
         except Exception as e:
-            self.rollback()
             raise RepositoryError(f"Gagal tambah detail KRS: {str(e)}")
+
+    def _catat(self, krs_obj, daftar_mk):
+        """Catat header (jika belum ada) + detail KRS ke jurnal write-behind"""
+        daftar_mk = list(daftar_mk)
+
+        def setelah_flush(id_krs):
+            krs_obj.id_krs = id_krs
+            if self.state is not None:
+                self.state.tambah_krs(krs_obj)
+
+        def saat_gagal():
+            # Database menolak: mata kuliah yang tidak tersimpan dikeluarkan lagi
+            for mk in daftar_mk:
+                krs_obj.hapus_mk(mk)
+
+        try:
+            self.antrean.catat(
+                "krs", f"krs:{krs_obj.mahasiswa.id}",
+                {"id_krs": getattr(krs_obj, "id_krs", None),
+                 "id_mahasiswa": krs_obj.mahasiswa.id,
+                 "semester": krs_obj.semester,
+                 "tahun_ajaran": krs_obj.tahun_ajaran,
+                 "mk": [[mk.id_mk, mk.kode_mk] for mk in daftar_mk]},
+                setelah_flush=setelah_flush,
+                saat_gagal=saat_gagal,
+            )
+        except Exception as e:
+            raise RepositoryError(f"Gagal simpan KRS: {str(e)}")
+
+    def _insert_header(self, cursor, krs_obj):
+        query = """
+            INSERT INTO krs (id_mahasiswa, semester, tahun_ajaran)
+            VALUES (%s, %s, %s)
+        """
+        cursor.execute(query, (
+            krs_obj.mahasiswa.id,
+            krs_obj.semester,
+            krs_obj.tahun_ajaran,
+        ))
+        return cursor.lastrowid
+
+    def _insert_detail(self, cursor, rows):
+        """Insert baris (id_krs, id_mk) dalam satu executemany (multi-row INSERT)"""
+        if rows:
+            cursor.executemany(self.DETAIL_QUERY, rows)
     
     def cari_by_id(self, krs_id):
         """Cari KRS berdasarkan ID"""
         try:
-            cursor = self.execute_query(
+            result = self.fetch_one(
                 "SELECT * FROM krs WHERE id_krs = %s",
                 (krs_id,)
             )
-            result = cursor.fetchone()
             return result if result else None
         except RepositoryError:
             return None
@@ -84,37 +168,32 @@ class KRSRepository(BaseRepository):
     def update(self, krs_obj):
         """Update KRS di database"""
         try:
-            cursor = self.conn.cursor()
-            query = """
-                UPDATE krs SET semester = %s, tahun_ajaran = %s
-                WHERE id_mahasiswa = %s
-            """
-            cursor.execute(query, (1, '2025/2026', krs_obj.mahasiswa.id))
-            self.commit()
+            with self.transaksi() as cursor:
+                query = """
+                    UPDATE krs SET semester = %s, tahun_ajaran = %s
+                    WHERE id_mahasiswa = %s
+                """
+                cursor.execute(query, (1, '2025/2026', krs_obj.mahasiswa.id))
         except Exception as e:
-            self.rollback()
             raise RepositoryError(f"Gagal update KRS: {str(e)}")
     
     def hapus(self, krs_id):
         """Hapus KRS dari database"""
         try:
-            cursor = self.conn.cursor()
-            
-            # Delete KRS detail terlebih dahulu
-            cursor.execute("DELETE FROM krs_detail WHERE id_krs = %s", (krs_id,))
-            
-            # Delete KRS
-            cursor.execute("DELETE FROM krs WHERE id_krs = %s", (krs_id,))
-            
-            self.commit()
+            with self.transaksi() as cursor:
+                # Delete KRS detail terlebih dahulu
+                cursor.execute("DELETE FROM krs_detail WHERE id_krs = %s", (krs_id,))
+                
+                # Delete KRS
+                cursor.execute("DELETE FROM krs WHERE id_krs = %s", (krs_id,))
         except Exception as e:
-            self.rollback()
             raise RepositoryError(f"Gagal hapus KRS: {str(e)}")
     
     def tampilkan_semua(self):
-        """Tampilkan semua KRS"""
-        try:
-            cursor = self.execute_query("SELECT * FROM krs")
-            return cursor.fetchall()
-        except RepositoryError:
-            return []
+        """
+        Stream semua KRS (generator baris, urut id_krs).
+        
+        Raises:
+            RepositoryError: Jika query gagal (saat diiterasi)
+        """
+        return self.fetch_iter("SELECT * FROM krs ORDER BY id_krs")
@@ -9,76 +9,110 @@ from infrastructure.repositories.base_repository import BaseRepository, Reposito
 class MataKuliahRepository(BaseRepository):
     """Repository untuk entity MataKuliah"""
 
+    TABEL = "mata_kuliah"
+    KOLOM_ID = "id_mk"
+
     def simpan(self, mk_obj):
-        """Simpan mata kuliah ke database."""
-        try:
-            cursor = self.conn.cursor()
-            query = """
-                INSERT INTO mata_kuliah (kode_mk, nama_mk, sks, id_dosen)
-                VALUES (%s, %s, %s, %s)
-            """
+        """
+        Simpan mata kuliah ke database (mk_by_id di state ikut di-index).
+
+        Mode write-behind: insert dicatat ke jurnal dan fungsi kembali tanpa
+        id_mk (None); id dipasang ke objek dan state setelah flush. Jika
+        database menolaknya (mis. kode sudah ada), MK dikeluarkan dari state.
+        """
+        if self.antrean is not None:
             id_dosen = getattr(getattr(mk_obj, "dosen", None), "id", None)
-            cursor.execute(query, (mk_obj.kode_mk, mk_obj.nama_mk, mk_obj.sks, id_dosen))
-            self.commit()
-            mk_obj.id_mk = cursor.lastrowid
+            try:
+                self.antrean.catat(
+                    "mk", f"mk:{mk_obj.kode_mk}",
+                    {"kode_mk": mk_obj.kode_mk, "nama_mk": mk_obj.nama_mk,
+                     "sks": mk_obj.sks, "id_dosen": id_dosen},
+                    setelah_flush=lambda id_baru: self._pasang_id(mk_obj, id_baru),
+                    saat_gagal=(lambda: self.state.hapus_mk(mk_obj)) if self.state is not None else None,
+                )
+            except Exception as e:
+                raise RepositoryError(f"Gagal simpan MataKuliah: {str(e)}")
+            return mk_obj.id_mk
+
+        try:
+            with self.transaksi() as cursor:
+                query = """
+                    INSERT INTO mata_kuliah (kode_mk, nama_mk, sks, id_dosen)
+                    VALUES (%s, %s, %s, %s)
+                """
+                id_dosen = getattr(getattr(mk_obj, "dosen", None), "id", None)
+                cursor.execute(query, (mk_obj.kode_mk, mk_obj.nama_mk, mk_obj.sks, id_dosen))
+                id_baru = cursor.lastrowid
+            mk_obj.id_mk = id_baru
+            if self.state is not None:
+                self.state.mk_by_id[id_baru] = mk_obj
             return mk_obj.id_mk
         except Exception as e:
-            self.rollback()
             raise RepositoryError(f"Gagal simpan MataKuliah: {str(e)}")
 
+    def _pasang_id(self, mk_obj, id_baru):
+        if self.state is not None:
+            self.state.ganti_id_mk(mk_obj, id_baru)
+        else:
+            mk_obj.id_mk = id_baru
+
     def cari_by_id(self, id_mk):
         try:
-            cursor = self.execute_query("SELECT * FROM mata_kuliah WHERE id_mk = %s", (id_mk,))
-            return cursor.fetchone()
+            return self.fetch_one("SELECT * FROM mata_kuliah WHERE id_mk = %s", (id_mk,))
         except RepositoryError:
             return None
 
     def update(self, mk_obj, kode_lama=None):
-        """Update mata kuliah (pakai id_mk jika ada; fallback ke kode_lama/kode_mk)."""
+        """
+        Update mata kuliah (pakai id_mk jika ada; fallback ke kode_lama/kode_mk).
+        Jika kode diganti, index mk_by_kode di state di-re-key setelah commit.
+        """
         try:
-            cursor = self.conn.cursor()
-            id_dosen = getattr(getattr(mk_obj, "dosen", None), "id", None)
+            with self.transaksi() as cursor:
+                id_dosen = getattr(getattr(mk_obj, "dosen", None), "id", None)
 
-            if getattr(mk_obj, "id_mk", None) is not None:
-                query = """
-                    UPDATE mata_kuliah
-                    SET kode_mk = %s, nama_mk = %s, sks = %s, id_dosen = %s
-                    WHERE id_mk = %s
-                """
-                params = (mk_obj.kode_mk, mk_obj.nama_mk, mk_obj.sks, id_dosen, mk_obj.id_mk)
-            else:
-                where_kode = kode_lama or mk_obj.kode_mk
-                query = """
-                    UPDATE mata_kuliah
-                    SET kode_mk = %s, nama_mk = %s, sks = %s, id_dosen = %s
-                    WHERE kode_mk = %s
-                """
-                params = (mk_obj.kode_mk, mk_obj.nama_mk, mk_obj.sks, id_dosen, where_kode)
+                if getattr(mk_obj, "id_mk", None) is not None:
+                    query = """
+                        UPDATE mata_kuliah
+                        SET kode_mk = %s, nama_mk = %s, sks = %s, id_dosen = %s
+                        WHERE id_mk = %s
+                    """
+                    params = (mk_obj.kode_mk, mk_obj.nama_mk, mk_obj.sks, id_dosen, mk_obj.id_mk)
+                else:
+                    where_kode = kode_lama or mk_obj.kode_mk
+                    query = """
+                        UPDATE mata_kuliah
+                        SET kode_mk = %s, nama_mk = %s, sks = %s, id_dosen = %s
+                        WHERE kode_mk = %s
+                    """
+                    params = (mk_obj.kode_mk, mk_obj.nama_mk, mk_obj.sks, id_dosen, where_kode)
 
-            cursor.execute(query, params)
-            self.commit()
-            return cursor.rowcount
+                cursor.execute(query, params)
+                jumlah = cursor.rowcount
         except Exception as e:
-            self.rollback()
             raise RepositoryError(f"Gagal update MataKuliah: {str(e)}")
 
+        if self.state is not None and kode_lama:
+            self.state.sinkron_kode_mk(mk_obj, kode_lama)
+        return jumlah
+
     def hapus(self, id_or_kode):
         """Hapus mata kuliah berdasarkan id_mk atau kode_mk."""
         try:
-            cursor = self.conn.cursor()
-            if isinstance(id_or_kode, int):
-                cursor.execute("DELETE FROM mata_kuliah WHERE id_mk = %s", (id_or_kode,))
-            else:
-                cursor.execute("DELETE FROM mata_kuliah WHERE kode_mk = %s", (id_or_kode,))
-            self.commit()
-            return cursor.rowcount
+            with self.transaksi() as cursor:
+                if isinstance(id_or_kode, int):
+                    cursor.execute("DELETE FROM mata_kuliah WHERE id_mk = %s", (id_or_kode,))
+                else:
+                    cursor.execute("DELETE FROM mata_kuliah WHERE kode_mk = %s", (id_or_kode,))
+                return cursor.rowcount
         except Exception as e:
-            self.rollback()
             raise RepositoryError(f"Gagal hapus MataKuliah: {str(e)}")
 
     def tampilkan_semua(self):
-        try:
-            cursor = self.execute_query("SELECT * FROM mata_kuliah")
-            return cursor.fetchall()
-        except RepositoryError:
-            return []
+        """
+        Stream semua mata kuliah (generator baris, urut id_mk).
+
+        Raises:
+            RepositoryError: Jika query gagal (saat diiterasi)
+        """
+        return self.fetch_iter("SELECT * FROM mata_kuliah ORDER BY id_mk")
@@ -9,120 +9,269 @@ from infrastructure.repositories.base_repository import BaseRepository, Reposito
 class NilaiRepository(BaseRepository):
     """Repository untuk entity Nilai"""
     
+    TABEL = "nilai"
+    KOLOM_ID = "id_nilai"
+    
+    UPSERT_QUERY = """
+        INSERT INTO nilai (id_mahasiswa, id_mk, nilai_angka, nilai_huruf, bobot)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            nilai_angka = VALUES(nilai_angka),
+            nilai_huruf = VALUES(nilai_huruf),
+            bobot = VALUES(bobot)
+    """
+
     def simpan(self, nilai_obj):
         """
-        Simpan Nilai ke database.
+        Simpan Nilai ke database (insert atau update dalam satu statement).
+        Mengandalkan UNIQUE KEY (id_mahasiswa, id_mk) di tabel nilai.
         
         Args:
             nilai_obj: Objek Nilai
         
+        Mode write-behind: upsert dicatat ke jurnal (dikirim per batch
+        executemany oleh flusher) dan fungsi selalu mengembalikan None.
+        
+        Returns:
+            id_nilai jika baris baru dibuat, None jika baris lama diperbarui
+        
         Raises:
             RepositoryError: Jika query gagal
         """
+        if self.antrean is not None:
+            try:
+                self.antrean.catat(
+                    "nilai",
+                    f"nilai:{nilai_obj.mahasiswa.id}:{nilai_obj.mata_kuliah.kode_mk}",
+                    {"id_mahasiswa": nilai_obj.mahasiswa.id,
+                     "id_mk": nilai_obj.mata_kuliah.id_mk,
+                     "kode_mk": nilai_obj.mata_kuliah.kode_mk,
+                     "nilai_angka": nilai_obj.nilai_angka,
+                     "nilai_huruf": nilai_obj.nilai_huruf,
+                     "nilai_bobot": nilai_obj.nilai_bobot},
+                )
+            except Exception as e:
+                raise RepositoryError(f"Gagal simpan/update Nilai: {str(e)}")
+            self._sinkron_state(nilai_obj)
+            return None
+
         try:
-            cursor = self.conn.cursor()
+            with self.transaksi() as cursor:
+                cursor.execute(self.UPSERT_QUERY, self._params(nilai_obj))
+                # rowcount MySQL untuk upsert: 1 = insert, 2 = update, 0 = tidak berubah
+                id_baru = cursor.lastrowid if cursor.rowcount == 1 else None
+        except Exception as e:
+            raise RepositoryError(f"Gagal simpan/update Nilai: {str(e)}")
 
-            # Coba update dulu (jika sudah ada record mahasiswa+mk)
-            update_query = """
-                UPDATE nilai
-                SET nilai_angka = %s, nilai_huruf = %s
-                WHERE id_mahasiswa = %s AND id_mk = %s
-            """
-            cursor.execute(update_query, (
-                nilai_obj.nilai_angka,
-                nilai_obj.nilai_huruf,
-                nilai_obj.mahasiswa.id,
-                nilai_obj.mata_kuliah.id_mk,
-            ))
-
-            if cursor.rowcount == 0:
-                insert_query = """
-                    INSERT INTO nilai (id_mahasiswa, id_mk, nilai_angka, nilai_huruf)
-                    VALUES (%s, %s, %s, %s)
-                """
-                cursor.execute(insert_query, (
-                    nilai_obj.mahasiswa.id,
-                    nilai_obj.mata_kuliah.id_mk,
-                    nilai_obj.nilai_angka,
-                    nilai_obj.nilai_huruf,
-                ))
-                self.commit()
-                return cursor.lastrowid
+        self._sinkron_state(nilai_obj)
+        return id_baru
 
-            self.commit()
-            return None
+    def simpan_banyak(self, daftar_nilai, ukuran_batch=1000):
+        """
+        Simpan nilai satu kelas sekaligus dengan upsert multi-row.
+        Satu statement per `ukuran_batch` baris, semua dalam satu transaksi.
+        
+        Args:
+            daftar_nilai: List objek Nilai
+            ukuran_batch: Jumlah baris per statement
+        
+        Returns:
+            Jumlah nilai yang dikirim
+        
+        Raises:
+            RepositoryError: Jika query gagal
+        """
+        daftar_nilai = list(daftar_nilai)
+        try:
+            with self.transaksi() as cursor:
+                for i in range(0, len(daftar_nilai), ukuran_batch):
+                    batch = daftar_nilai[i:i + ukuran_batch]
+                    cursor.executemany(self.UPSERT_QUERY, [self._params(n) for n in batch])
         except Exception as e:
-            self.rollback()
-            raise RepositoryError(f"Gagal simpan/update Nilai: {str(e)}")
-    
+            raise RepositoryError(f"Gagal simpan banyak Nilai: {str(e)}")
+
+        for nilai_obj in daftar_nilai:
+            self._sinkron_state(nilai_obj)
+        return len(daftar_nilai)
+
+    def _params(self, nilai_obj):
+        return (
+            nilai_obj.mahasiswa.id,
+            nilai_obj.mata_kuliah.id_mk,
+            nilai_obj.nilai_angka,
+            nilai_obj.nilai_huruf,
+            nilai_obj.nilai_bobot,
+        )
+
+    def _sinkron_state(self, nilai_obj):
+        """Perbarui akumulator IPK in-memory setelah nilai tersimpan"""
+        if self.state is not None:
+            self.state.catat_nilai(nilai_obj)
+
     def cari_by_id(self, nilai_id):
         """Cari Nilai berdasarkan ID"""
         try:
-            cursor = self.execute_query(
+            result = self.fetch_one(
                 "SELECT * FROM nilai WHERE id_nilai = %s",
                 (nilai_id,)
             )
-            result = cursor.fetchone()
             return result if result else None
         except RepositoryError:
             return None
     
     def cari_by_mahasiswa(self, mahasiswa_id):
-        """Cari nilai berdasarkan mahasiswa ID"""
-        try:
-            cursor = self.execute_query(
-                "SELECT * FROM nilai WHERE id_mahasiswa = %s",
-                (mahasiswa_id,)
-            )
-            return cursor.fetchall()
-        except RepositoryError:
-            return []
+        """
+        Stream nilai berdasarkan mahasiswa ID (generator baris).
+        
+        Raises:
+            RepositoryError: Jika query gagal (saat diiterasi)
+        """
+        return self.fetch_iter(
+            "SELECT * FROM nilai WHERE id_mahasiswa = %s ORDER BY id_nilai",
+            (mahasiswa_id,)
+        )
     
     def cari_by_dosen(self, dosen_id):
-        """Cari nilai berdasarkan dosen ID"""
-        try:
-            cursor = self.execute_query(
-                "SELECT * FROM nilai WHERE id_dosen = %s",
-                (dosen_id,)
-            )
-            return cursor.fetchall()
-        except RepositoryError:
-            return []
+        """
+        Stream nilai mata kuliah yang diampu dosen (generator baris).
+        Tabel nilai tidak punya id_dosen, jadi dosen diambil dari mata_kuliah.
+        
+        Raises:
+            RepositoryError: Jika query gagal (saat diiterasi)
+        """
+        return self.fetch_iter(
+            """
+            SELECT n.* FROM nilai n
+            JOIN mata_kuliah mk ON mk.id_mk = n.id_mk
+            WHERE mk.id_dosen = %s
+            ORDER BY n.id_nilai
+            """,
+            (dosen_id,)
+        )
     
+    # ============ Query export (streaming) ============
+
+    TRANSKRIP_QUERY = """
+        SELECT n.id_mahasiswa, m.nim, u.nama, m.prodi, m.angkatan,
+               mk.kode_mk, mk.nama_mk, mk.sks, n.nilai_angka, n.nilai_huruf, n.bobot
+        FROM nilai n
+        JOIN mahasiswa m ON m.id_mahasiswa = n.id_mahasiswa
+        JOIN users u ON u.id_user = m.id_user
+        JOIN mata_kuliah mk ON mk.id_mk = n.id_mk
+        {where}
+        ORDER BY n.id_mahasiswa, n.id_mk
+    """
+
+    LEMBAR_NILAI_QUERY = """
+        SELECT n.id_mk, mk.kode_mk, mk.nama_mk, mk.sks, ud.nama,
+               m.nim, u.nama, n.nilai_angka, n.nilai_huruf
+        FROM nilai n
+        JOIN mata_kuliah mk ON mk.id_mk = n.id_mk
+        JOIN mahasiswa m ON m.id_mahasiswa = n.id_mahasiswa
+        JOIN users u ON u.id_user = m.id_user
+        LEFT JOIN dosen d ON d.id_dosen = mk.id_dosen
+        LEFT JOIN users ud ON ud.id_user = d.id_user
+        {where}
+        ORDER BY n.id_mk, m.nim
+    """
+
+    def iterasi_transkrip(self, prodi=None, angkatan=None, tahun_ajaran=None, ukuran_batch=None):
+        """
+        Stream baris transkrip, urut per mahasiswa (satu grup per id_mahasiswa).
+
+        Args:
+            prodi: Filter prodi (optional)
+            angkatan: Filter angkatan (optional)
+            tahun_ajaran: Hanya nilai MK yang diambil di KRS tahun ajaran ini (optional)
+            ukuran_batch: Jumlah baris per fetch (default ukuran_fetch repository)
+
+        Yields:
+            (id_mahasiswa, nim, nama, prodi, angkatan, kode_mk, nama_mk, sks,
+             nilai_angka, nilai_huruf, bobot)
+
+        Raises:
+            RepositoryError: Jika query gagal
+        """
+        where, params = self._filter_export(prodi, angkatan, tahun_ajaran)
+        return self.fetch_iter(self.TRANSKRIP_QUERY.format(where=where), params, ukuran_batch)
+
+    def iterasi_lembar_nilai(self, id_dosen=None, prodi=None, angkatan=None,
+                             tahun_ajaran=None, ukuran_batch=None):
+        """
+        Stream baris lembar nilai, urut per mata kuliah (satu grup per id_mk).
+
+        Args:
+            id_dosen: Hanya mata kuliah yang diampu dosen ini (optional)
+            prodi, angkatan, tahun_ajaran: Filter mahasiswa (lihat iterasi_transkrip)
+            ukuran_batch: Jumlah baris per fetch (default ukuran_fetch repository)
+
+        Yields:
+            (id_mk, kode_mk, nama_mk, sks, nama_dosen, nim, nama_mahasiswa,
+             nilai_angka, nilai_huruf)
+
+        Raises:
+            RepositoryError: Jika query gagal
+        """
+        where, params = self._filter_export(prodi, angkatan, tahun_ajaran, id_dosen)
+        return self.fetch_iter(self.LEMBAR_NILAI_QUERY.format(where=where), params, ukuran_batch)
+
+    def _filter_export(self, prodi=None, angkatan=None, tahun_ajaran=None, id_dosen=None):
+        """Bangun klausa WHERE dan parameter untuk query export"""
+        kondisi = []
+        params = []
+        if prodi:
+            kondisi.append("m.prodi = %s")
+            params.append(prodi)
+        if angkatan:
+            kondisi.append("m.angkatan = %s")
+            params.append(angkatan)
+        if id_dosen is not None:
+            kondisi.append("mk.id_dosen = %s")
+            params.append(id_dosen)
+        if tahun_ajaran:
+            kondisi.append("""EXISTS (
+                SELECT 1 FROM krs k
+                JOIN krs_detail kd ON kd.id_krs = k.id_krs
+                WHERE k.id_mahasiswa = n.id_mahasiswa
+                  AND kd.id_mk = n.id_mk
+                  AND k.tahun_ajaran = %s
+            )""")
+            params.append(tahun_ajaran)
+        where = "WHERE " + " AND ".join(kondisi) if kondisi else ""
+        return where, tuple(params)
+
     def update(self, nilai_obj):
         """Update Nilai di database"""
         try:
-            cursor = self.conn.cursor()
-            query = """
-                UPDATE nilai 
-                SET nilai_angka = %s, nilai_huruf = %s
-                WHERE id_mahasiswa = %s AND id_mk = %s
-            """
-            cursor.execute(query, (
-                nilai_obj.nilai_angka,
-                nilai_obj.nilai_huruf,
-                nilai_obj.mahasiswa.id,
-                nilai_obj.mata_kuliah.id_mk
-            ))
-            self.commit()
+            with self.transaksi() as cursor:
+                query = """
+                    UPDATE nilai 
+                    SET nilai_angka = %s, nilai_huruf = %s, bobot = %s
+                    WHERE id_mahasiswa = %s AND id_mk = %s
+                """
+                cursor.execute(query, (
+                    nilai_obj.nilai_angka,
+                    nilai_obj.nilai_huruf,
+                    nilai_obj.nilai_bobot,
+                    nilai_obj.mahasiswa.id,
+                    nilai_obj.mata_kuliah.id_mk
+                ))
         except Exception as e:
-            self.rollback()
             raise RepositoryError(f"Gagal update Nilai: {str(e)}")
     
     def hapus(self, nilai_id):
         """Hapus Nilai dari database"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("DELETE FROM nilai WHERE id_nilai = %s", (nilai_id,))
-            self.commit()
+            with self.transaksi() as cursor:
+                cursor.execute("DELETE FROM nilai WHERE id_nilai = %s", (nilai_id,))
         except Exception as e:
-            self.rollback()
             raise RepositoryError(f"Gagal hapus Nilai: {str(e)}")
     
     def tampilkan_semua(self):
-        """Tampilkan semua Nilai"""
-        try:
-            cursor = self.execute_query("SELECT * FROM nilai")
-            return cursor.fetchall()
-        except RepositoryError:
-            return []
+        """
+        Stream semua Nilai (generator baris, urut id_nilai).
+        
+        Raises:
+            RepositoryError: Jika query gagal (saat diiterasi)
+        """
+        return self.fetch_iter("SELECT * FROM nilai ORDER BY id_nilai")
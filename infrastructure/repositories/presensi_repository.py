@@ -3,121 +3,181 @@ infrastructure/repositories/presensi_repository.py
 Concrete implementation dari BaseRepository untuk Presensi.
 """
 
+from datetime import datetime
+
+from domain.entities.presensi import Presensi
 from infrastructure.repositories.base_repository import BaseRepository, RepositoryError
 
 
 class PresensiRepository(BaseRepository):
     """Repository untuk entity Presensi"""
     
+    TABEL = "presensi"
+    KOLOM_ID = "id_presensi"
+    
+    HADIR_QUERY = """
+        INSERT IGNORE INTO presensi_detail (id_presensi, id_mahasiswa)
+        VALUES (%s, %s)
+    """
+
     def simpan(self, presensi_obj):
         """
         Simpan Presensi ke database.
+        Id dari database dipakai sebagai id presensi (menggantikan id sementara
+        dari state.next_id_presensi) dan index state ikut diperbarui.
         
         Args:
             presensi_obj: Objek Presensi
         
+        Returns:
+            id_presensi yang dibuat database
+        
         Raises:
             RepositoryError: Jika query gagal
         """
         try:
-            cursor = self.conn.cursor()
-            
-            query = """
-                INSERT INTO presensi (id_dosen, id_mk, tanggal)
-                VALUES (%s, %s, %s)
-            """
-            cursor.execute(query, (
-                presensi_obj.dosen.id,
-                presensi_obj.mata_kuliah.id_mk,
-                presensi_obj.tanggal
-            ))
-            
-            self.commit()
-            return cursor.lastrowid
+            with self.transaksi() as cursor:
+                query = """
+                    INSERT INTO presensi (id_dosen, id_mk, tanggal)
+                    VALUES (%s, %s, %s)
+                """
+                cursor.execute(query, (
+                    presensi_obj.dosen.id,
+                    presensi_obj.mata_kuliah.id_mk,
+                    self._ke_date(presensi_obj.tanggal)
+                ))
+                id_baru = cursor.lastrowid
         except Exception as e:
-            self.rollback()
             raise RepositoryError(f"Gagal simpan Presensi: {str(e)}")
+
+        if self.state is not None:
+            self.state.ganti_id_presensi(presensi_obj, id_baru)
+        else:
+            presensi_obj.id = presensi_obj.id_presensi = id_baru
+        return id_baru
     
     def cari_by_id(self, presensi_id):
         """Cari Presensi berdasarkan ID"""
         try:
-            cursor = self.execute_query(
+            result = self.fetch_one(
                 "SELECT * FROM presensi WHERE id_presensi = %s",
                 (presensi_id,)
             )
-            result = cursor.fetchone()
             return result if result else None
         except RepositoryError:
             return None
     
     def cari_by_dosen(self, dosen_id):
-        """Cari presensi berdasarkan dosen ID"""
-        try:
-            cursor = self.execute_query(
-                "SELECT * FROM presensi WHERE id_dosen = %s",
-                (dosen_id,)
-            )
-            return cursor.fetchall()
-        except RepositoryError:
-            return []
+        """
+        Stream presensi berdasarkan dosen ID (generator baris).
+        Untuk paging gunakan halaman(setelah=..., id_dosen=dosen_id).
+        
+        Raises:
+            RepositoryError: Jika query gagal (saat diiterasi)
+        """
+        return self.fetch_iter(
+            "SELECT * FROM presensi WHERE id_dosen = %s ORDER BY id_presensi",
+            (dosen_id,)
+        )
     
     def cari_by_mata_kuliah(self, mata_kuliah_id):
-        """Cari presensi berdasarkan mata kuliah ID"""
-        try:
-            cursor = self.execute_query(
-                "SELECT * FROM presensi WHERE id_mk = %s",
-                (mata_kuliah_id,)
-            )
-            return cursor.fetchall()
-        except RepositoryError:
-            return []
+        """
+        Stream presensi berdasarkan mata kuliah ID (generator baris).
+        Untuk paging gunakan halaman(setelah=..., id_mk=mata_kuliah_id).
+        
+        Raises:
+            RepositoryError: Jika query gagal (saat diiterasi)
+        """
+        return self.fetch_iter(
+            "SELECT * FROM presensi WHERE id_mk = %s ORDER BY id_presensi",
+            (mata_kuliah_id,)
+        )
     
     def update(self, presensi_obj):
         """Update Presensi di database"""
         try:
-            cursor = self.conn.cursor()
-            query = """
-                UPDATE presensi 
-                SET tanggal = %s
-                WHERE id_presensi = %s
-            """
-            cursor.execute(query, (
-                presensi_obj.tanggal,
-                presensi_obj.id
-            ))
-            self.commit()
+            with self.transaksi() as cursor:
+                query = """
+                    UPDATE presensi 
+                    SET tanggal = %s
+                    WHERE id_presensi = %s
+                """
+                cursor.execute(query, (
+                    self._ke_date(presensi_obj.tanggal),
+                    presensi_obj.id
+                ))
         except Exception as e:
-            self.rollback()
             raise RepositoryError(f"Gagal update Presensi: {str(e)}")
     
     def hapus(self, presensi_id):
         """Hapus Presensi dari database"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("DELETE FROM presensi WHERE id_presensi = %s", (presensi_id,))
-            self.commit()
+            with self.transaksi() as cursor:
+                cursor.execute("DELETE FROM presensi_detail WHERE id_presensi = %s", (presensi_id,))
+                cursor.execute("DELETE FROM presensi WHERE id_presensi = %s", (presensi_id,))
         except Exception as e:
-            self.rollback()
             raise RepositoryError(f"Gagal hapus Presensi: {str(e)}")
     
     def tambah_hadir(self, presensi_id, mahasiswa_id):
-        """Tambahkan mahasiswa ke daftar hadir"""
+        """
+        Tambahkan mahasiswa ke daftar hadir.
+        Mode write-behind: dicatat ke jurnal; flusher menggabungkan check-in
+        yang terkumpul menjadi satu executemany per batch.
+        """
+        return self.tambah_hadir_banyak(presensi_id, [mahasiswa_id])
+
+    def tambah_hadir_banyak(self, presensi_id, daftar_mahasiswa_id, ukuran_batch=1000):
+        """
+        Catat kehadiran banyak mahasiswa untuk satu sesi sekaligus.
+        Satu statement multi-row per `ukuran_batch` baris, semua dalam satu
+        transaksi. Baris yang sudah ada diabaikan (UNIQUE id_presensi, id_mahasiswa).
+        
+        Args:
+            presensi_id: ID presensi
+            daftar_mahasiswa_id: List ID mahasiswa yang hadir
+            ukuran_batch: Jumlah baris per statement
+        
+        Mode write-behind: satu entri jurnal per panggilan (tanpa menunggu
+        antrean kosong); flusher yang mengirimnya ke database.
+        
+        Returns:
+            Jumlah baris yang dikirim
+        
+        Raises:
+            RepositoryError: Jika query gagal
+        """
+        params = [(presensi_id, id_mhs) for id_mhs in daftar_mahasiswa_id]
+        if not params:
+            return 0
+        if self.antrean is not None:
+            try:
+                self.antrean.catat(
+                    "hadir", f"hadir:{presensi_id}",
+                    {"id_presensi": presensi_id,
+                     "mahasiswa": [id_mhs for _, id_mhs in params]},
+                )
+            except Exception as e:
+                raise RepositoryError(f"Gagal tambah hadir: {str(e)}")
+            return len(params)
         try:
-            cursor = self.conn.cursor()
-            query = """
-                INSERT INTO presensi_detail (id_presensi, id_mahasiswa)
-                VALUES (%s, %s)
-            """
-            cursor.execute(query, (presensi_id, mahasiswa_id))
-            self.commit()
+            with self.transaksi() as cursor:
+                for i in range(0, len(params), ukuran_batch):
+                    cursor.executemany(self.HADIR_QUERY, params[i:i + ukuran_batch])
         except Exception as e:
-            self.rollback()
             raise RepositoryError(f"Gagal tambah hadir: {str(e)}")
+        return len(params)
     
     def tampilkan_semua(self):
-        """Tampilkan semua Presensi"""
-        try:
-            cursor = self.execute_query("SELECT * FROM presensi")
-            return cursor.fetchall()
-        except RepositoryError:
-            return []
+        """
+        Stream semua Presensi (generator baris, urut id_presensi).
+        
+        Raises:
+            RepositoryError: Jika query gagal (saat diiterasi)
+        """
+        return self.fetch_iter("SELECT * FROM presensi ORDER BY id_presensi")
+
+    def _ke_date(self, tanggal):
+        """Tanggal menu (dd-mm-yyyy) -> date untuk kolom DATE"""
+        if isinstance(tanggal, str):
+            return datetime.strptime(tanggal, Presensi.FORMAT_TANGGAL).date()
+        return tanggal
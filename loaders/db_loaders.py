@@ -1,106 +1,895 @@
 # loaders/db_loader.py
+import gc
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mysql.connector import Error
+
 from application.dto.admin import Admin
 from application.dto.mahasiswa import Mahasiswa
 from application.dto.dosen import Dosen
 from domain.entities.matakuliah import MataKuliah
 from domain.entities.krs import KRS
 from domain.entities.nilai import Nilai
+from domain.entities.presensi import Presensi
+from domain.services.statistik import StatistikAkademik
+from infrastructure.database.connection import ConnectionPool, borrow_connection
+from loaders.snapshot import SnapshotError
 
 class DBLoader:
+    # Tabel yang dicatat watermark-nya untuk warm start dari snapshot:
+    # nama -> (kolom SELECT dengan primary key di depan, FROM, kolom primary key).
+    # Urutan = urutan penerapan baris baru (induk sebelum anak).
+    TABEL = {
+        "admin": ("a.id_admin, u.id_user, u.nama, u.email, u.password, a.username",
+                  "admin a JOIN users u ON a.id_user = u.id_user", "a.id_admin"),
+        "dosen": ("d.id_dosen, u.id_user, u.nama, u.email, u.password, d.nidn, d.departemen",
+                  "dosen d JOIN users u ON d.id_user = u.id_user", "d.id_dosen"),
+        "mahasiswa": ("m.id_mahasiswa, u.id_user, u.nama, u.email, u.password, m.nim, m.prodi, m.angkatan",
+                      "mahasiswa m JOIN users u ON m.id_user = u.id_user", "m.id_mahasiswa"),
+        "mata_kuliah": ("id_mk, kode_mk, nama_mk, sks, id_dosen", "mata_kuliah", "id_mk"),
+        "krs": ("id_krs, id_mahasiswa, semester, tahun_ajaran", "krs", "id_krs"),
+        "krs_detail": ("id_krs_detail, id_krs, id_mk", "krs_detail", "id_krs_detail"),
+        "nilai": ("id_nilai, id_mahasiswa, id_mk, nilai_angka, nilai_huruf, bobot", "nilai", "id_nilai"),
+        "presensi": ("id_presensi, id_dosen, id_mk, tanggal", "presensi", "id_presensi"),
+        "presensi_detail": ("id_presensi_detail, id_presensi, id_mahasiswa",
+                            "presensi_detail", "id_presensi_detail"),
+    }
+    # Tabel identitas/katalog dirujuk objek lain; jika baris lamanya berubah -> load penuh
+    TABEL_IDENTITAS = ("admin", "dosen", "mahasiswa", "mata_kuliah")
+    # Grup yang bisa dimuat ulang sendiri jika baris lamanya berubah/dihapus
+    GRUP_MUAT_ULANG = (
+        (("krs", "krs_detail"), "load_krs"),
+        (("nilai",), "load_nilai"),
+        (("presensi", "presensi_detail"), "load_presensi"),
+    )
+
+    # Refresh delta: id_log per putaran, dan umur minimum (detik) entri
+    # change_log sebelum posisi dimajukan melewatinya. Entri yang lebih muda
+    # tetap diterapkan tapi dibaca lagi putaran berikutnya, karena id
+    # AUTO_INCREMENT bisa di-commit tidak berurutan oleh transaksi paralel.
+    BATAS_REFRESH = 5000
+    MASA_TENANG_LOG = 5
+
+    # Query fase fetch load_all. Baris tiap tabel tidak saling bergantung,
+    # jadi bisa diambil bersamaan di koneksi berbeda.
+    QUERY_MUAT = {
+        "admin": "SELECT a.id_admin, u.id_user, u.nama, u.email, u.password, a.username "
+                 "FROM admin a JOIN users u ON a.id_user = u.id_user",
+        "dosen": "SELECT d.id_dosen, u.id_user, u.nama, u.email, u.password, d.nidn, d.departemen "
+                 "FROM dosen d JOIN users u ON d.id_user = u.id_user",
+        "mahasiswa": "SELECT m.id_mahasiswa, u.id_user, u.nama, u.email, u.password, m.nim, m.prodi, m.angkatan "
+                     "FROM mahasiswa m JOIN users u ON m.id_user = u.id_user",
+        "mata_kuliah": "SELECT id_mk, kode_mk, nama_mk, sks, id_dosen FROM mata_kuliah",
+        # Urut id_krs: krs_by_mahasiswa_id[id][-1] adalah KRS terbaru
+        "krs": "SELECT id_krs, id_mahasiswa, semester, tahun_ajaran FROM krs ORDER BY id_krs",
+        "krs_detail": "SELECT id_krs, id_mk FROM krs_detail",
+        "nilai": "SELECT id_mahasiswa, id_mk, nilai_angka, nilai_huruf, bobot FROM nilai",
+        "presensi": "SELECT id_presensi, id_dosen, id_mk, tanggal FROM presensi",
+        "presensi_detail": "SELECT id_presensi, id_mahasiswa FROM presensi_detail",
+    }
+    # Fase link load_all: (langkah, tabel yang dibutuhkan, method penyusun),
+    # berurutan karena mata kuliah butuh dosen_by_id dan KRS/nilai/presensi
+    # butuh mahasiswa_by_id serta mk_by_id
+    LANGKAH_MUAT = (
+        ("admin", ("admin",), "_bangun_admin"),
+        ("dosen", ("dosen",), "_bangun_dosen"),
+        ("mahasiswa", ("mahasiswa",), "_bangun_mahasiswa"),
+        ("mata_kuliah", ("mata_kuliah",), "_bangun_mata_kuliah"),
+        ("krs", ("krs", "krs_detail"), "_susun_krs"),
+        ("nilai", ("nilai",), "_susun_nilai"),
+        ("presensi", ("presensi", "presensi_detail"), "_susun_presensi"),
+    )
+
     def __init__(self, conn):
+        # conn: ConnectionPool (koneksi dipinjam per query) atau satu koneksi
         self.conn = conn
+        self.waktu_muat = None      # durasi per tabel dari load_all terakhir
+
+    def _fetch_all(self, query, params=None):
+        with borrow_connection(self.conn) as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params or ())
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def load_all(self, state, paralel=None):
+        """
+        Muat semua data ke state dalam dua fase.
+
+        Fase fetch: query tiap tabel (QUERY_MUAT) berjalan bersamaan di thread
+        pool, masing-masing dengan koneksi pinjaman sendiri dari ConnectionPool.
+        Fase link: satu thread (pemanggil) menyusun objek dan index sesuai
+        urutan ketergantungan (LANGKAH_MUAT), tiap langkah begitu baris yang
+        dibutuhkannya tersedia; baris mentah dilepas setelah dipakai.
+        Durasi per tabel disimpan di self.waktu_muat (lihat format_waktu_muat).
+
+        Args:
+            state: AppState yang diisi
+            paralel: Jumlah thread fetch (default env SIAK_LOAD_PARALEL atau
+                ukuran pool). Dengan 1, atau conn berupa satu koneksi, fetch berurutan.
+        """
+        mulai = time.perf_counter()
+        # Posisi change_log diambil sebelum data dibaca: perubahan selama load
+        # diterapkan lagi oleh refresh() (idempoten)
+        state.posisi_perubahan = self.posisi_perubahan()
+        paralel = self._jumlah_paralel(paralel)
+        waktu = {"paralel": paralel, "fetch": {}, "link": {}}
+
+        def ambil(nama):
+            awal = time.perf_counter()
+            rows = self._fetch_all(self.QUERY_MUAT[nama])
+            waktu["fetch"][nama] = time.perf_counter() - awal
+            return rows
+
+        if paralel > 1:
+            executor = ThreadPoolExecutor(max_workers=paralel, thread_name_prefix="muat")
+            futures = {nama: executor.submit(ambil, nama) for nama in self.QUERY_MUAT}
+            hasil = lambda nama: futures.pop(nama).result()
+        else:
+            executor = None
+            hasil = ambil
+        try:
+            for langkah, tabel, fungsi in self.LANGKAH_MUAT:
+                daftar_rows = [hasil(nama) for nama in tabel]
+                awal = time.perf_counter()
+                getattr(self, fungsi)(state, *daftar_rows)
+                waktu["link"][langkah] = time.perf_counter() - awal
+                del daftar_rows
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+        waktu["total"] = time.perf_counter() - mulai
+        self.waktu_muat = waktu
+
+    def _jumlah_paralel(self, paralel):
+        # Satu koneksi tunggal tidak boleh dipakai beberapa thread sekaligus
+        if not isinstance(self.conn, ConnectionPool):
+            return 1
+        paralel = paralel or int(os.environ.get("SIAK_LOAD_PARALEL", "0")) or self.conn.size
+        return max(1, min(paralel, self.conn.size, len(self.QUERY_MUAT)))
+
+    def format_waktu_muat(self):
+        """
+        Ringkasan durasi load_all terakhir, satu baris per tabel/langkah.
+
+        Returns:
+            List string (kosong jika load_all belum pernah dijalankan)
+        """
+        waktu = self.waktu_muat
+        if not waktu:
+            return []
+        baris = [f"total {waktu['total']:.2f} s ({waktu['paralel']} koneksi fetch)"]
+        for nama, durasi in sorted(waktu["fetch"].items(), key=lambda x: -x[1]):
+            baris.append(f"fetch {nama:<16} {durasi * 1000:9.1f} ms")
+        for nama, durasi in sorted(waktu["link"].items(), key=lambda x: -x[1]):
+            baris.append(f"link  {nama:<16} {durasi * 1000:9.1f} ms")
+        return baris
+
+    def load_admin(self, state):
+        self._bangun_admin(state, self._fetch_all(self.QUERY_MUAT["admin"]))
+
+    def load_dosen(self, state):
+        self._bangun_dosen(state, self._fetch_all(self.QUERY_MUAT["dosen"]))
+
+    def load_mahasiswa(self, state):
+        self._bangun_mahasiswa(state, self._fetch_all(self.QUERY_MUAT["mahasiswa"]))
+
+    def load_mata_kuliah(self, state):
+        self._bangun_mata_kuliah(state, self._fetch_all(self.QUERY_MUAT["mata_kuliah"]))
+
+    def load_krs(self, state):
+        rows_krs = self._fetch_all(self.QUERY_MUAT["krs"])
+        rows_detail = self._fetch_all(self.QUERY_MUAT["krs_detail"])
+        self._susun_krs(state, rows_krs, rows_detail)
+
+    def load_nilai(self, state):
+        self._susun_nilai(state, self._fetch_all(self.QUERY_MUAT["nilai"]))
+
+    def load_presensi(self, state):
+        rows = self._fetch_all(self.QUERY_MUAT["presensi"])
+        rows_detail = self._fetch_all(self.QUERY_MUAT["presensi_detail"])
+        self._susun_presensi(state, rows, rows_detail)
+
+    # ============ Warm start dari snapshot ============
+
+    def watermark(self):
+        """
+        Watermark semua tabel saat ini (diambil SEBELUM data dibaca, jadi baris
+        yang berubah sesudahnya terdeteksi pada warm start berikutnya).
+
+        Returns:
+            Dict nama tabel -> {"jumlah", "maks_id", "checksum"}
+        """
+        return {nama: self._statistik_tabel(nama) for nama in self.TABEL}
+
+    def _crc(self, nama):
+        """Ekspresi checksum satu baris: CRC32 dari semua kolom yang dimuat"""
+        return f"CRC32(CONCAT_WS('|', {self.TABEL[nama][0]}))"
+
+    def _statistik_tabel(self, nama, batas_id=None):
+        """
+        Jumlah baris, primary key maksimum dan checksum tabel (hanya baris
+        dengan primary key <= batas_id jika diberikan, memakai range index PK).
+        Checksum = BIT_XOR dari CRC32 tiap baris, jadi tidak bergantung urutan.
+        """
+        _, dari, kolom_id = self.TABEL[nama]
+        where, params = (f"WHERE {kolom_id} <= %s", (batas_id,)) if batas_id is not None else ("", ())
+        (jumlah, maks_id, checksum), = self._fetch_all(
+            f"SELECT COUNT(*), COALESCE(MAX({kolom_id}), 0), COALESCE(BIT_XOR({self._crc(nama)}), 0) "
+            f"FROM {dari} {where}",
+            params,
+        )
+        return {"jumlah": int(jumlah), "maks_id": int(maks_id), "checksum": int(checksum)}
+
+    def load_snapshot(self, state, snapshot):
+        """
+        Warm start: pulihkan AppState dari snapshot lalu ambil hanya baris yang
+        berubah sejak snapshot dibuat.
+
+        Per tabel, baris lama (primary key <= maks_id snapshot) dicek lewat
+        jumlah dan checksum. Jika sama, hanya baris dengan primary key baru
+        yang diambil dan diterapkan. Jika berbeda (update/hapus), grup tabelnya
+        dimuat ulang; untuk tabel identitas/katalog seluruh state dimuat
+        dingin. Snapshot ditulis ulang jika ada perubahan.
+
+        Args:
+            state: AppState kosong (dipakai jika harus load dingin)
+            snapshot: SnapshotState
+
+        Returns:
+            (AppState yang siap dipakai, ringkasan dict: mode, baris_baru, dimuat_ulang)
+        """
+        posisi = self.posisi_perubahan()
+        dimuat = snapshot.muat()
+        if dimuat is None:
+            return self._load_dingin(state, snapshot)
+
+        state_snap, watermark = dimuat
+        state_snap.posisi_perubahan = posisi
+        berubah = {
+            nama for nama in self.TABEL
+            if nama not in watermark
+            or self._statistik_tabel(nama, watermark[nama]["maks_id"]) != watermark[nama]
+        }
+        if berubah.intersection(self.TABEL_IDENTITAS):
+            return self._load_dingin(state, snapshot)
+
+        dimuat_ulang = []
+        baris_baru = 0
+        for nama in self.TABEL_IDENTITAS:
+            baris_baru += self._terapkan_baris_baru(state_snap, nama, watermark)
+        for tabel, fungsi in self.GRUP_MUAT_ULANG:
+            if berubah.intersection(tabel):
+                for nama in tabel:
+                    watermark[nama] = self._statistik_tabel(nama)
+                getattr(self, fungsi)(state_snap)
+                dimuat_ulang.extend(tabel)
+                continue
+            for nama in tabel:
+                baris_baru += self._terapkan_baris_baru(state_snap, nama, watermark)
+
+        ringkasan = {"mode": "hangat", "baris_baru": baris_baru, "dimuat_ulang": dimuat_ulang}
+        if berubah or baris_baru:
+            self._simpan_snapshot(snapshot, state_snap, watermark, ringkasan)
+        # State hidup sepanjang aplikasi: bekukan agar koleksi generasi tua
+        # berikutnya tidak menelusuri ulang jutaan objeknya. Hanya di jalur
+        # hangat; snapshot yang dibuang (load dingin) harus bisa dikoleksi GC.
+        gc.freeze()
+        return state_snap, ringkasan
+
+    def _load_dingin(self, state, snapshot):
+        watermark = self.watermark()
+        self.load_all(state)
+        ringkasan = {"mode": "dingin", "baris_baru": 0, "dimuat_ulang": list(self.TABEL)}
+        self._simpan_snapshot(snapshot, state, watermark, ringkasan)
+        return state, ringkasan
+
+    def _simpan_snapshot(self, snapshot, state, watermark, ringkasan):
+        # State sudah termuat; gagal menulis snapshot cukup dilaporkan
+        try:
+            snapshot.simpan(state, watermark)
+        except SnapshotError as e:
+            ringkasan["peringatan"] = str(e)
+
+    def _terapkan_baris_baru(self, state, nama, watermark):
+        """
+        Ambil baris dengan primary key > maks_id watermark, terapkan ke state
+        dan majukan watermark[nama] (checksum baris baru ikut di-XOR-kan).
+        Idempoten: baris yang sudah ada di state dilewati (atau ditimpa untuk nilai).
+
+        Returns:
+            Jumlah baris yang diambil
+        """
+        kolom, dari, kolom_id = self.TABEL[nama]
+        rows = self._fetch_all(
+            f"SELECT {kolom}, {self._crc(nama)} FROM {dari} "
+            f"WHERE {kolom_id} > %s ORDER BY {kolom_id}",
+            (watermark[nama]["maks_id"],),
+        )
+        if not rows:
+            return 0
+        checksum = watermark[nama]["checksum"]
+        for row in rows:
+            checksum ^= int(row[-1])
+        watermark[nama] = {
+            "jumlah": watermark[nama]["jumlah"] + len(rows),
+            "maks_id": int(rows[-1][0]),
+            "checksum": checksum,
+        }
+        rows = [row[:-1] for row in rows]
+
+        if nama == "admin":
+            for id_admin, id_user, nama_admin, email, password, username in rows:
+                if username not in state.admin_by_username:
+                    state.tambah_admin(Admin(id_user, nama_admin, email, password, username))
+        elif nama == "dosen":
+            for id_dosen, id_user, nama_dosen, email, password, nidn, departemen in rows:
+                if id_dosen not in state.dosen_by_id:
+                    state.tambah_dosen(Dosen(id_dosen, nama_dosen, email, password, nidn, departemen))
+        elif nama == "mahasiswa":
+            for id_mhs, id_user, nama_mhs, email, password, nim, prodi, angkatan in rows:
+                if id_mhs not in state.mahasiswa_by_id:
+                    state.tambah_mahasiswa(Mahasiswa(id_mhs, nama_mhs, email, password, nim, prodi))
+        elif nama == "mata_kuliah":
+            for id_mk, kode_mk, nama_mk, sks, id_dosen in rows:
+                if id_mk not in state.mk_by_id:
+                    dosen_obj = state.dosen_by_id.get(id_dosen)
+                    state.tambah_mk(MataKuliah(kode_mk, nama_mk, sks, dosen_obj, id_mk=id_mk))
+        elif nama == "krs":
+            self._bangun_krs(state, [r for r in rows if r[0] not in state.krs_by_id], [])
+        elif nama == "krs_detail":
+            self._bangun_krs(state, [], [r[1:] for r in rows])
+        elif nama == "nilai":
+            self._terapkan_nilai(state, [r[1:] for r in rows])
+        elif nama == "presensi":
+            self._bangun_presensi(state, [r for r in rows if r[0] not in state.presensi_by_id])
+        elif nama == "presensi_detail":
+            self._bangun_presensi_detail(state, [r[1:] for r in rows])
+        return len(rows)
+
+    def _terapkan_nilai(self, state, rows):
+        """Seperti _bangun_nilai, tapi nilai yang pasangannya sudah ada ditimpa"""
+        baru = []
+        for row in rows:
+            id_mhs, id_mk, nilai_angka, nilai_huruf, bobot = row
+            mhs_obj = state.mahasiswa_by_id.get(id_mhs)
+            mk_obj = state.mk_by_id.get(id_mk)
+            existing = state.cari_nilai(mhs_obj, mk_obj) if mhs_obj and mk_obj else None
+            if existing is None:
+                baru.append(row)
+                continue
+            existing.nilai_angka = float(nilai_angka)
+            if nilai_huruf:
+                existing.nilai_huruf = nilai_huruf
+                existing.nilai_bobot = None if bobot is None else float(bobot)
+            else:
+                existing.nilai_huruf, existing.nilai_bobot = existing.konversi()
+            state.catat_nilai(existing)
+        self._bangun_nilai(state, baru)
+
+    # ============ Refresh delta (change_log) ============
+
+    def posisi_perubahan(self):
+        """
+        id_log terakhir di change_log (0 jika kosong).
+
+        Returns:
+            int, atau None jika database belum punya tabel change_log
+        """
+        try:
+            (posisi,), = self._fetch_all("SELECT COALESCE(MAX(id_log), 0) FROM change_log")
+        except Error:
+            return None
+        return int(posisi)
+
+    def refresh(self, state):
+        """
+        Tarik perubahan database sejak state.posisi_perubahan (insert, update
+        dan delete dari node lain atau lewat SQL langsung) lalu terapkan di
+        tempat ke daftar_* dan semua index state.
+
+        Tiap entri change_log menunjuk satu agregat (lihat siak.sql). Agregat
+        itu dibaca ulang per id lalu disamakan dengan state; yang sudah tidak
+        ada di database dikeluarkan dari state. Penerapan idempoten, jadi entri
+        yang terbaca dua kali aman. State dimuat ulang penuh jika entri yang
+        belum diterapkan sudah dipangkas dari change_log, atau jika delta
+        bentrok dengan kunci unik di state (mis. dua kode MK ditukar).
+
+        Args:
+            state: AppState hasil load_all, load_awal atau load_snapshot
+
+        Returns:
+            Ringkasan dict: mode ('delta', 'penuh' atau 'nonaktif'), perubahan
+            (jumlah entri change_log yang dibaca), entitas (nama -> jumlah id)
+        """
+        ringkasan = {"mode": "delta", "perubahan": 0, "entitas": {}}
+        # _kunci_cache: jangan bersilangan dengan muat/buang cache mode lazy
+        with state._kunci_cache:
+            if state.posisi_perubahan is None:
+                state.posisi_perubahan = self.posisi_perubahan()
+                if state.posisi_perubahan is None:
+                    ringkasan["mode"] = "nonaktif"
+                return ringkasan
+
+            (terkecil, terbesar), = self._fetch_all("SELECT MIN(id_log), MAX(id_log) FROM change_log")
+            if terbesar is None or int(terbesar) <= state.posisi_perubahan:
+                return ringkasan
+            if int(terkecil) > state.posisi_perubahan + 1:
+                self._refresh_penuh(state)
+                ringkasan["mode"] = "penuh"
+                return ringkasan
+
+            while True:
+                posisi = state.posisi_perubahan
+                rows = self._fetch_all(
+                    "SELECT id_log, entitas, id_entitas, id_terkait, "
+                    "waktu <= NOW(6) - INTERVAL %s SECOND "
+                    "FROM change_log WHERE id_log > %s ORDER BY id_log LIMIT %s",
+                    (self.MASA_TENANG_LOG, posisi, self.BATAS_REFRESH),
+                )
+                if not rows:
+                    break
+                try:
+                    for nama, jumlah in self._terapkan_perubahan(state, rows).items():
+                        ringkasan["entitas"][nama] = ringkasan["entitas"].get(nama, 0) + jumlah
+                except ValueError:
+                    self._refresh_penuh(state)
+                    ringkasan["mode"] = "penuh"
+                    return ringkasan
+                ringkasan["perubahan"] += len(rows)
+
+                # Majukan posisi hanya sampai entri terakhir yang sudah "tenang"
+                for id_log, _, _, _, tenang in rows:
+                    if not tenang:
+                        break
+                    state.posisi_perubahan = int(id_log)
+                if len(rows) < self.BATAS_REFRESH or state.posisi_perubahan == posisi:
+                    break
+        return ringkasan
+
+    def _refresh_penuh(self, state):
+        """Muat ulang ke AppState baru lalu pindahkan isinya ke state (objek state tetap sama)"""
+        baru = type(state)()
+        baru.batas_cache_mahasiswa = state.batas_cache_mahasiswa
+        if state.loader is None:
+            self.load_all(baru)
+            state.ambil_alih(baru)
+            return
+        self.load_awal(baru)
+        state.ambil_alih(baru)
+        # Mode lazy: data mahasiswa yang sedang login dimuat lagi
+        aktif = [state.mahasiswa_by_id[i] for i in list(state.mahasiswa_aktif) if i in state.mahasiswa_by_id]
+        state.pastikan_mahasiswa_termuat(aktif)
+
+    def _fetch_per_id(self, query, ids, ukuran=1000):
+        """Jalankan query dengan `IN ({})` diisi daftar id, per potongan `ukuran` id"""
+        ids = list(ids)
+        rows = []
+        for awal in range(0, len(ids), ukuran):
+            potongan = ids[awal:awal + ukuran]
+            rows.extend(self._fetch_all(query.format(", ".join(["%s"] * len(potongan))), potongan))
+        return rows
+
+    def _baris_per_id(self, nama, ids):
+        """Baris terkini tabel TABEL[nama] untuk sekumpulan primary key"""
+        kolom, dari, kolom_id = self.TABEL[nama]
+        return self._fetch_per_id(f"SELECT {kolom} FROM {dari} WHERE {kolom_id} IN ({{}})", ids)
+
+    @staticmethod
+    def _termuat(state, id_mhs):
+        """Mode lazy: KRS, nilai dan kehadiran hanya disimpan untuk mahasiswa yang sudah dimuat"""
+        return state.loader is None or id_mhs in state.mahasiswa_termuat
 
-    def load_all(self, state):
-        # state adalah object yang nyimpen daftar_* dan mapping *_by_id
+    def _terapkan_perubahan(self, state, rows):
+        """
+        Baca ulang agregat yang disebut entri change_log (di luar lock index),
+        lalu terapkan ke state: identitas/katalog di-upsert, agregat KRS/nilai/
+        presensi disamakan, terakhir identitas/katalog yang dihapus dikeluarkan
+        (anak-anaknya sudah keluar lebih dulu).
+
+        Returns:
+            Dict nama entitas -> jumlah id yang dibaca ulang
+        """
+        ids = {nama: set() for nama in ("users", "admin", "dosen", "mahasiswa", "mata_kuliah", "krs", "presensi")}
+        pasangan_nilai = set()
+        for _, nama, id_entitas, id_terkait, _ in rows:
+            if nama == "nilai":
+                pasangan_nilai.add((int(id_entitas), int(id_terkait)))
+            elif nama in ids:
+                ids[nama].add(int(id_entitas))
+
+        # Perubahan akun (nama/email/password) -> baca ulang admin/dosen/mahasiswa pemiliknya
+        if ids["users"]:
+            for nama, kolom in (("admin", "id_admin"), ("dosen", "id_dosen"), ("mahasiswa", "id_mahasiswa")):
+                ids[nama].update(
+                    int(id_baris) for (id_baris,) in self._fetch_per_id(
+                        f"SELECT {kolom} FROM {nama} WHERE id_user IN ({{}})", ids["users"]
+                    )
+                )
+
+        baris = {nama: self._baris_per_id(nama, ids[nama])
+                 for nama in ("dosen", "mahasiswa", "mata_kuliah", "krs", "presensi") if ids[nama]}
+        rows_admin = self._fetch_all(
+            f"SELECT {self.TABEL['admin'][0]} FROM {self.TABEL['admin'][1]}"
+        ) if ids["admin"] else None
+        detail_krs = self._fetch_per_id(
+            "SELECT id_krs, id_mk FROM krs_detail WHERE id_krs IN ({})", ids["krs"]
+        )
+        detail_presensi = self._fetch_per_id(
+            "SELECT id_presensi, id_mahasiswa FROM presensi_detail WHERE id_presensi IN ({})", ids["presensi"]
+        )
+        rows_nilai = [
+            row for row in self._fetch_per_id(
+                "SELECT id_mahasiswa, id_mk, nilai_angka, nilai_huruf, bobot FROM nilai WHERE id_mahasiswa IN ({})",
+                {id_mhs for id_mhs, _ in pasangan_nilai},
+            )
+            if (row[0], row[1]) in pasangan_nilai
+        ]
+
+        with state._kunci_index:
+            if rows_admin is not None:
+                self._segarkan_admin(state, rows_admin)
+            hapus_dosen = self._segarkan_dosen(state, ids["dosen"], baris.get("dosen", ()))
+            hapus_mhs = self._segarkan_mahasiswa(state, ids["mahasiswa"], baris.get("mahasiswa", ()))
+            hapus_mk = self._segarkan_mk(state, ids["mata_kuliah"], baris.get("mata_kuliah", ()))
+            self._segarkan_krs(state, ids["krs"], baris.get("krs", ()), detail_krs)
+            self._segarkan_nilai(state, pasangan_nilai, rows_nilai)
+            self._segarkan_presensi(state, ids["presensi"], baris.get("presensi", ()), detail_presensi)
+
+            for id_mk in hapus_mk:
+                state.hapus_mk(state.mk_by_id[id_mk])
+            for id_mhs in hapus_mhs:
+                state.hapus_mahasiswa(state.mahasiswa_by_id[id_mhs])
+            for id_dosen in hapus_dosen:
+                state.hapus_dosen(state.dosen_by_id[id_dosen])
+
+        jumlah = {nama: len(isi) for nama, isi in ids.items() if isi}
+        if pasangan_nilai:
+            jumlah["nilai"] = len(pasangan_nilai)
+        return jumlah
+
+    def _segarkan_admin(self, state, rows):
+        daftar = []
+        for id_admin, id_user, nama, email, password, username in rows:
+            admin = state.admin_by_username.get(username)
+            if admin is None:
+                admin = Admin(id_user, nama, email, password, username)
+            else:
+                admin.perbarui_akun(nama, email, password)
+            daftar.append(admin)
+        state.ganti_daftar_admin(daftar)
+
+    def _segarkan_dosen(self, state, ids, rows):
+        """Upsert dosen; mengembalikan id dosen yang sudah dihapus dari database"""
+        for id_dosen, id_user, nama, email, password, nidn, departemen in rows:
+            dosen = state.dosen_by_id.get(id_dosen)
+            if dosen is None:
+                state.tambah_dosen(Dosen(id_dosen, nama, email, password, nidn, departemen))
+            else:
+                state.perbarui_dosen(dosen, nama, email, password, nidn, departemen)
+        ada = {row[0] for row in rows}
+        return [i for i in ids - ada if i in state.dosen_by_id]
+
+    def _segarkan_mahasiswa(self, state, ids, rows):
+        """Upsert mahasiswa; mengembalikan id mahasiswa yang sudah dihapus dari database"""
+        for id_mhs, id_user, nama, email, password, nim, prodi, angkatan in rows:
+            mhs = state.mahasiswa_by_id.get(id_mhs)
+            if mhs is None:
+                state.tambah_mahasiswa(Mahasiswa(id_mhs, nama, email, password, nim, prodi))
+            else:
+                state.perbarui_mahasiswa(mhs, nama, email, password, nim, prodi)
+        ada = {row[0] for row in rows}
+        return [i for i in ids - ada if i in state.mahasiswa_by_id]
+
+    def _segarkan_mk(self, state, ids, rows):
+        """Upsert mata kuliah; mengembalikan id MK yang sudah dihapus dari database"""
+        for id_mk, kode_mk, nama_mk, sks, id_dosen in rows:
+            mk = state.mk_by_id.get(id_mk)
+            if mk is None:
+                lokal = state.mk_by_kode.get(kode_mk)
+                if lokal is not None and lokal.id_mk is None:
+                    # MK write-behind yang baru saja di-flush node ini
+                    state.ganti_id_mk(lokal, id_mk)
+                    mk = lokal
+                else:
+                    state.tambah_mk(MataKuliah(kode_mk, nama_mk, sks, state.dosen_by_id.get(id_dosen), id_mk=id_mk))
+                    continue
+            if mk.kode_mk != kode_mk:
+                state.ganti_kode_mk(mk, kode_mk)
+            mk.nama_mk = nama_mk
+            mk.dosen = state.dosen_by_id.get(id_dosen)
+            if mk.sks != sks:
+                mk.sks = sks
+                state.sinkron_sks_mk(mk)
+        ada = {row[0] for row in rows}
+        return [i for i in ids - ada if i in state.mk_by_id]
+
+    def _segarkan_krs(self, state, ids, rows, rows_detail):
+        """Samakan header dan daftar MK tiap KRS; KRS yang sudah dihapus dikeluarkan"""
+        detail = {}
+        for id_krs, id_mk in rows_detail:
+            detail.setdefault(id_krs, []).append(id_mk)
+
+        for id_krs, id_mhs, semester, tahun_ajaran in rows:
+            mhs = state.mahasiswa_by_id.get(id_mhs)
+            krs = state.krs_by_id.get(id_krs)
+            if krs is not None and krs.mahasiswa is not mhs:
+                state.hapus_krs(krs)
+                krs = None
+            if mhs is None or not self._termuat(state, id_mhs):
+                continue
+            if krs is None:
+                # KRS yang disimpan node ini mungkin belum sempat menerima id_krs
+                krs = next((
+                    k for k in state.krs_by_mahasiswa_id.get(id_mhs, ())
+                    if k.id_krs is None and k.semester == semester and k.tahun_ajaran == tahun_ajaran
+                ), None) or KRS(mhs, semester, tahun_ajaran)
+                krs.id_krs = id_krs
+                state.tambah_krs(krs)
+            krs.semester = semester
+            krs.tahun_ajaran = tahun_ajaran
+
+            mk_db = [state.mk_by_id[i] for i in detail.get(id_krs, ()) if i in state.mk_by_id]
+            for mk in list(krs.daftar_mk):
+                if mk.id_mk is not None and mk not in mk_db:
+                    krs.hapus_mk(mk)
+            for mk in mk_db:
+                if mk not in krs.daftar_mk:
+                    krs.tambah_mk(mk)
+
+        ada = {row[0] for row in rows}
+        for id_krs in ids - ada:
+            krs = state.krs_by_id.get(id_krs)
+            if krs is not None:
+                state.hapus_krs(krs)
+
+    def _segarkan_nilai(self, state, pasangan, rows):
+        """Upsert nilai per (mahasiswa, MK); pasangan yang sudah tidak ada di database dihapus"""
+        ada = {(row[0], row[1]) for row in rows}
+        self._terapkan_nilai(state, [row for row in rows if self._termuat(state, row[0])])
+        for id_mhs, id_mk in pasangan - ada:
+            mhs_obj = state.mahasiswa_by_id.get(id_mhs)
+            mk_obj = state.mk_by_id.get(id_mk)
+            nilai = state.cari_nilai(mhs_obj, mk_obj) if mhs_obj and mk_obj else None
+            if nilai is not None:
+                state.hapus_nilai(nilai)
+
+    def _segarkan_presensi(self, state, ids, rows, rows_detail):
+        """Samakan header dan daftar hadir tiap sesi; sesi yang sudah dihapus dikeluarkan"""
+        hadir = {}
+        for id_presensi, id_mhs in rows_detail:
+            hadir.setdefault(id_presensi, set()).add(id_mhs)
+
+        for id_presensi, id_dosen, id_mk, tanggal in rows:
+            mk_obj = state.mk_by_id.get(id_mk)
+            dosen_obj = state.dosen_by_id.get(id_dosen)
+            if hasattr(tanggal, "strftime"):
+                tanggal = tanggal.strftime(Presensi.FORMAT_TANGGAL)
+            presensi = state.presensi_by_id.get(id_presensi)
+            if presensi is not None and (
+                mk_obj is None
+                or state.kunci_jadwal(presensi.dosen, presensi.mata_kuliah, presensi.tanggal)
+                != state.kunci_jadwal(dosen_obj, mk_obj, tanggal)
+            ):
+                # Jadwal sesi diubah: keluarkan lalu daftarkan ulang agar semua index ikut pindah
+                state.hapus_presensi(presensi)
+                presensi = None
+            if mk_obj is None:
+                continue
+            if presensi is None:
+                presensi = state.cari_presensi_jadwal(dosen_obj, mk_obj, tanggal)
+                if presensi is not None:
+                    state.ganti_id_presensi(presensi, id_presensi)
+                else:
+                    self._bangun_presensi(state, [(id_presensi, id_dosen, id_mk, tanggal)])
+                    presensi = state.presensi_by_id[id_presensi]
+
+            id_hadir = hadir.get(id_presensi, set())
+            for mhs in list(presensi.daftar_hadir):
+                if mhs.id not in id_hadir:
+                    presensi.hapus_hadir(mhs)
+            for id_mhs in id_hadir:
+                mhs = state.mahasiswa_by_id.get(id_mhs)
+                if mhs is not None and self._termuat(state, id_mhs):
+                    presensi.isi_hadir(mhs)
+
+        ada = {row[0] for row in rows}
+        for id_presensi in ids - ada:
+            presensi = state.presensi_by_id.get(id_presensi)
+            if presensi is not None:
+                state.hapus_presensi(presensi)
+
+    # ============ Mode lazy (on-demand per mahasiswa) ============
+
+    def load_awal(self, state):
+        """
+        Load minimal untuk mode lazy: identitas (login), katalog mata kuliah
+        dan header sesi presensi. KRS, nilai dan daftar hadir dimuat per
+        mahasiswa lewat load_data_mahasiswa().
+        """
+        state.posisi_perubahan = self.posisi_perubahan()
         self.load_admin(state)
         self.load_dosen(state)
         self.load_mahasiswa(state)
         self.load_mata_kuliah(state)
-        self.load_krs(state)
-        self.load_nilai(state)
+        self._reset_krs(state)
+        self._reset_nilai(state)
+        self._reset_presensi(state)
+        self._bangun_presensi(
+            state, self._fetch_all(self.QUERY_MUAT["presensi"])
+        )
 
-    def load_admin(self, state):
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT a.id_admin, u.id_user, u.nama, u.email, u.password, a.username
-            FROM admin a
-            JOIN users u ON a.id_user = u.id_user
-        """)
-        rows = cursor.fetchall()
-        cursor.close()
+    def load_data_mahasiswa(self, state, daftar_mahasiswa):
+        """
+        Muat KRS, nilai dan kehadiran untuk sekumpulan mahasiswa saja.
+        Query memakai index id_mahasiswa pada tabel krs, nilai dan presensi_detail.
+        """
+        ids = [m.id for m in daftar_mahasiswa]
+        if not ids:
+            return
+        placeholder = ", ".join(["%s"] * len(ids))
+
+        rows_krs = self._fetch_all(
+            f"SELECT id_krs, id_mahasiswa, semester, tahun_ajaran FROM krs "
+            f"WHERE id_mahasiswa IN ({placeholder}) ORDER BY id_krs",
+            ids,
+        )
+        rows_detail = self._fetch_all(
+            f"SELECT d.id_krs, d.id_mk FROM krs_detail d "
+            f"JOIN krs k ON d.id_krs = k.id_krs "
+            f"WHERE k.id_mahasiswa IN ({placeholder})",
+            ids,
+        )
+        rows_nilai = self._fetch_all(
+            f"SELECT id_mahasiswa, id_mk, nilai_angka, nilai_huruf, bobot FROM nilai "
+            f"WHERE id_mahasiswa IN ({placeholder})",
+            ids,
+        )
+
+        rows_hadir = self._fetch_all(
+            f"SELECT id_presensi, id_mahasiswa FROM presensi_detail "
+            f"WHERE id_mahasiswa IN ({placeholder})",
+            ids,
+        )
+
+        self._bangun_krs(state, rows_krs, rows_detail)
+        self._bangun_nilai(state, rows_nilai)
+        self._bangun_presensi_detail(state, rows_hadir)
+
+    def cari_id_mahasiswa_by_mk(self, id_mk):
+        """Id mahasiswa yang mengambil suatu mata kuliah (untuk roster di mode lazy)"""
+        rows = self._fetch_all(
+            "SELECT DISTINCT k.id_mahasiswa FROM krs_detail d "
+            "JOIN krs k ON d.id_krs = k.id_krs WHERE d.id_mk = %s",
+            (id_mk,),
+        )
+        return [id_mhs for (id_mhs,) in rows]
+
+    def hitung_statistik(self, state):
+        """
+        Statistik dashboard dari agregat database (COUNT/GROUP BY), untuk mode
+        lazy yang state-nya hanya memuat KRS/nilai sebagian mahasiswa.
+
+        Returns:
+            (StatistikAkademik, dict total_krs/total_nilai/total_presensi)
+        """
+        peserta = self._fetch_all(
+            "SELECT d.id_mk, COUNT(DISTINCT k.id_mahasiswa) FROM krs_detail d "
+            "JOIN krs k ON d.id_krs = k.id_krs GROUP BY d.id_mk"
+        )
+        distribusi = self._fetch_all(
+            "SELECT id_mk, nilai_huruf, COUNT(*) FROM nilai GROUP BY id_mk, nilai_huruf"
+        )
+        sesi = self._fetch_all("SELECT id_mk, COUNT(*) FROM presensi GROUP BY id_mk")
+        hadir = self._fetch_all(
+            "SELECT p.id_mk, COUNT(*) FROM presensi_detail d "
+            "JOIN presensi p ON d.id_presensi = p.id_presensi GROUP BY p.id_mk"
+        )
+        (total_krs,), = self._fetch_all("SELECT COUNT(*) FROM krs")
+        stat = StatistikAkademik.dari_agregat(state.daftar_mahasiswa, peserta, distribusi, sesi, hadir)
+        total = {
+            'total_krs': int(total_krs),
+            'total_nilai': sum(int(jumlah) for _, _, jumlah in distribusi),
+            'total_presensi': sum(int(jumlah) for _, jumlah in sesi),
+        }
+        return stat, total
 
+    # ============ Helper: rows -> objek ============
+
+    def _bangun_admin(self, state, rows):
         state.daftar_admin = []
+        state.admin_by_username = {}
         for id_admin, id_user, nama, email, password, username in rows:
-            state.daftar_admin.append(Admin(id_user, nama, email, password, username))
-
-    def load_dosen(self, state):
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT d.id_dosen, u.id_user, u.nama, u.email, u.password,
-                   d.nidn, d.departemen
-            FROM dosen d
-            JOIN users u ON d.id_user = u.id_user
-        """)
-        rows = cursor.fetchall()
-        cursor.close()
+            admin = Admin(id_user, nama, email, password, username)
+            state.daftar_admin.append(admin)
+            state.admin_by_username[username] = admin
 
+    def _bangun_dosen(self, state, rows):
         state.daftar_dosen = []
         state.dosen_by_id = {}
+        state.dosen_by_nidn = {}
         for id_dosen, id_user, nama, email, password, nidn, departemen in rows:
             dosen = Dosen(id_dosen, nama, email, password, nidn, departemen)
             state.daftar_dosen.append(dosen)
             state.dosen_by_id[id_dosen] = dosen
+            state.dosen_by_nidn[nidn] = dosen
 
-    def load_mahasiswa(self, state):
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT m.id_mahasiswa, u.id_user, u.nama, u.email, u.password,
-                   m.nim, m.prodi, m.angkatan
-            FROM mahasiswa m
-            JOIN users u ON m.id_user = u.id_user
-        """)
-        rows = cursor.fetchall()
-        cursor.close()
-
+    def _bangun_mahasiswa(self, state, rows):
         state.daftar_mahasiswa = []
         state.mahasiswa_by_id = {}
+        state.mahasiswa_by_nim = {}
         for id_mhs, id_user, nama, email, password, nim, prodi, angkatan in rows:
             mhs = Mahasiswa(id_mhs, nama, email, password, nim, prodi)
             state.daftar_mahasiswa.append(mhs)
             state.mahasiswa_by_id[id_mhs] = mhs
+            state.mahasiswa_by_nim[nim] = mhs
+        state.statistik.hitung_prodi(state.daftar_mahasiswa)
 
-    def load_mata_kuliah(self, state):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT id_mk, kode_mk, nama_mk, sks, id_dosen FROM mata_kuliah")
-        rows = cursor.fetchall()
-        cursor.close()
-
+    def _bangun_mata_kuliah(self, state, rows):
+        # Butuh dosen_by_id yang sudah terisi
         state.daftar_mk = []
         state.mk_by_id = {}
+        state.mk_by_kode = {}
         for id_mk, kode_mk, nama_mk, sks, id_dosen in rows:
             dosen_obj = state.dosen_by_id.get(id_dosen)
             mk = MataKuliah(kode_mk, nama_mk, sks, dosen_obj, id_mk=id_mk)
             state.daftar_mk.append(mk)
             state.mk_by_id[id_mk] = mk
+            state.mk_by_kode[kode_mk] = mk
+        state.kode_mk_terurut = sorted(state.mk_by_kode)
 
-    def load_krs(self, state):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT id_krs, id_mahasiswa, semester, tahun_ajaran FROM krs")
-        rows_krs = cursor.fetchall()
+    def _susun_krs(self, state, rows_krs, rows_detail):
+        self._reset_krs(state)
+        self._bangun_krs(state, rows_krs, rows_detail)
 
+    def _susun_nilai(self, state, rows):
+        self._reset_nilai(state)
+        self._bangun_nilai(state, rows)
+
+    def _susun_presensi(self, state, rows, rows_detail):
+        self._reset_presensi(state)
+        self._bangun_presensi(state, rows)
+        self._bangun_presensi_detail(state, rows_detail)
+
+    def _reset_krs(self, state):
         state.daftar_krs = []
         state.krs_by_id = {}
+        state.krs_by_mahasiswa_id = {}
+        state.mahasiswa_by_mk_id = {}
+        state.statistik.reset_peserta()
+
+    def _reset_nilai(self, state):
+        state.daftar_nilai = []
+        state.ipk_akumulator = {}
+        state.kontribusi_ipk = {}
+        state.nilai_by_pasangan = {}
+        state.nilai_by_dosen_id = {}
+        state.nilai_by_mk_id = {}
+        state.nilai_by_mahasiswa_id = {}
+        state.statistik.reset_nilai()
+
+    def _reset_presensi(self, state):
+        state.daftar_presensi = []
+        state.presensi_by_id = {}
+        state.presensi_by_mk_id = {}
+        state.presensi_by_dosen_id = {}
+        state.presensi_by_jadwal = {}
+        state.statistik.reset_presensi()
+        state.id_presensi.atur(1)
+
+    def _bangun_krs(self, state, rows_krs, rows_detail):
         for id_krs, id_mahasiswa, semester, tahun_ajaran in rows_krs:
             mhs_obj = state.mahasiswa_by_id.get(id_mahasiswa)
             if not mhs_obj:
                 continue
             krs_obj = KRS(mhs_obj, semester, tahun_ajaran, id_krs=id_krs)
-            state.daftar_krs.append(krs_obj)
-            state.krs_by_id[id_krs] = krs_obj
-
-        cursor.execute("SELECT id_krs, id_mk FROM krs_detail")
-        rows_detail = cursor.fetchall()
-        cursor.close()
+            # tambah_krs mengisi krs_by_id/krs_by_mahasiswa_id dan memasang observer
+            # sehingga tambah_mk di bawah ikut membangun roster mahasiswa_by_mk_id
+            state.tambah_krs(krs_obj)
 
         for id_krs, id_mk in rows_detail:
             krs_obj = state.krs_by_id.get(id_krs)
@@ -108,18 +897,37 @@ class DBLoader:
             if krs_obj and mk_obj:
                 krs_obj.tambah_mk(mk_obj)
 
-    def load_nilai(self, state):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT id_mahasiswa, id_mk, nilai_angka, nilai_huruf FROM nilai")
-        rows = cursor.fetchall()
-        cursor.close()
-
-        state.daftar_nilai = []
-        for id_mhs, id_mk, nilai_angka, nilai_huruf in rows:
+    def _bangun_nilai(self, state, rows):
+        for id_mhs, id_mk, nilai_angka, nilai_huruf, bobot in rows:
             mhs_obj = state.mahasiswa_by_id.get(id_mhs)
             mk_obj = state.mk_by_id.get(id_mk)
             if not mhs_obj or not mk_obj:
                 continue
             dosen_obj = getattr(mk_obj, "dosen", None)
-            nilai_obj = Nilai(dosen_obj, mk_obj, mhs_obj, float(nilai_angka), nilai_huruf=nilai_huruf)
-            state.daftar_nilai.append(nilai_obj)
+            nilai_obj = Nilai(dosen_obj, mk_obj, mhs_obj, float(nilai_angka),
+                              nilai_huruf=nilai_huruf, nilai_bobot=bobot)
+            state.tambah_nilai(nilai_obj)
+
+    def _bangun_presensi(self, state, rows):
+        for id_presensi, id_dosen, id_mk, tanggal in rows:
+            mk_obj = state.mk_by_id.get(id_mk)
+            if not mk_obj:
+                continue
+            if hasattr(tanggal, "strftime"):
+                # Kolom DATE -> format dd-mm-yyyy yang dipakai menu dan service
+                tanggal = tanggal.strftime(Presensi.FORMAT_TANGGAL)
+            presensi_obj = Presensi(
+                id=id_presensi,
+                mata_kuliah=mk_obj,
+                dosen=state.dosen_by_id.get(id_dosen),
+                tanggal=tanggal,
+            )
+            state.tambah_presensi(presensi_obj)
+            state.id_presensi.naikkan_ke(id_presensi + 1)
+
+    def _bangun_presensi_detail(self, state, rows):
+        for id_presensi, id_mahasiswa in rows:
+            presensi_obj = state.presensi_by_id.get(id_presensi)
+            mhs_obj = state.mahasiswa_by_id.get(id_mahasiswa)
+            if presensi_obj and mhs_obj:
+                presensi_obj.isi_hadir(mhs_obj)
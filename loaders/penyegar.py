@@ -0,0 +1,106 @@
+# loaders/penyegar.py
+"""
+Refresh delta AppState di background.
+
+Thread PenyegarState memanggil DBLoader.refresh(state) setiap `interval`
+detik sehingga beberapa node aplikasi yang memakai database yang sama
+melihat perubahan satu sama lain (dan perubahan lewat SQL langsung) tanpa
+restart. Tiap putaran yang tidak menemukan perubahan hanya butuh satu query
+MIN/MAX ke primary key change_log.
+"""
+
+import os
+import threading
+import time
+
+from utils.logger import SystemLogger
+
+
+class PenyegarState:
+    """Thread background yang menjalankan DBLoader.refresh(state) secara berkala"""
+
+    def __init__(self, loader, state, interval=None, antrean=None):
+        """
+        Args:
+            loader: DBLoader
+            state: AppState yang disegarkan
+            interval: Detik antar refresh (default env SIAK_REFRESH_INTERVAL atau 30)
+            antrean: AntreanTulis (optional); sisa antrean write-behind dikirim
+                dulu sebelum refresh agar tulisan node ini tidak tertimpa baris lama
+        """
+        self.loader = loader
+        self.state = state
+        self.interval = float(interval or os.environ.get("SIAK_REFRESH_INTERVAL", "30"))
+        self.antrean = antrean
+        self.logger = SystemLogger()
+        self._lock = threading.Lock()       # satu refresh pada satu waktu
+        self._berhenti = threading.Event()
+        self._thread = None
+
+        # Metrik
+        self._putaran = 0
+        self._perubahan = 0
+        self._muat_penuh = 0
+        self._gagal = 0
+        self._durasi_terakhir = 0.0
+
+    def segarkan(self):
+        """
+        Jalankan satu refresh sekarang (dipakai thread dan bisa dipanggil manual).
+
+        Returns:
+            Ringkasan dari DBLoader.refresh
+        """
+        with self._lock:
+            if self.antrean is not None:
+                self.antrean.sinkronkan(self.interval)
+            mulai = time.perf_counter()
+            ringkasan = self.loader.refresh(self.state)
+            self._durasi_terakhir = time.perf_counter() - mulai
+            self._putaran += 1
+            self._perubahan += ringkasan["perubahan"]
+            if ringkasan["mode"] == "penuh":
+                self._muat_penuh += 1
+            return ringkasan
+
+    def mulai(self):
+        """Jalankan thread refresh di background"""
+        if self._thread is None:
+            self._berhenti.clear()
+            self._thread = threading.Thread(target=self._jalankan, name="refresh-state", daemon=True)
+            self._thread.start()
+
+    def berhenti(self, batas_waktu=10.0):
+        """Hentikan thread refresh (refresh yang sedang berjalan diselesaikan dulu)"""
+        self._berhenti.set()
+        if self._thread is not None:
+            self._thread.join(batas_waktu)
+            self._thread = None
+
+    def stats(self):
+        """Metrik refresh: putaran, perubahan, muat_penuh, gagal, durasi_terakhir (detik)"""
+        return {
+            "interval": self.interval,
+            "putaran": self._putaran,
+            "perubahan": self._perubahan,
+            "muat_penuh": self._muat_penuh,
+            "gagal": self._gagal,
+            "durasi_terakhir": self._durasi_terakhir,
+            "posisi": self.state.posisi_perubahan,
+        }
+
+    def _jalankan(self):
+        while not self._berhenti.wait(self.interval):
+            try:
+                ringkasan = self.segarkan()
+            except Exception as e:
+                # Database sementara tidak bisa dihubungi: posisi tidak maju,
+                # putaran berikutnya mengambil perubahan yang sama
+                self._gagal += 1
+                self.logger.warning(f"Refresh state gagal, dicoba lagi {self.interval:g} detik lagi: {e}")
+                continue
+            if ringkasan["mode"] == "nonaktif":
+                self.logger.warning("Tabel change_log tidak ada, refresh state dihentikan")
+                return
+            if ringkasan["mode"] == "penuh":
+                self.logger.info("change_log sudah dipangkas melewati posisi state, state dimuat ulang penuh")
@@ -0,0 +1,175 @@
+# loaders/snapshot.py
+"""
+Snapshot biner AppState untuk warm start.
+
+Format file (versi 2; versi 1 belum menyimpan bobot pada objek Nilai):
+    MAGIC (8 byte) | versi (uint16) | panjang meta (uint32) | meta JSON | payload pickle
+
+Meta berisi watermark per tabel (jumlah baris, id maksimum, checksum) saat
+snapshot diambil, CRC32 dan panjang payload, serta sidik skema AppState.
+Snapshot dengan versi/sidik berbeda atau payload rusak diabaikan (load dingin).
+Payload dibaca lewat mmap sehingga tidak disalin dulu ke buffer terpisah.
+"""
+
+import gc
+import json
+import mmap
+import os
+import pickle
+import struct
+import zlib
+from datetime import datetime
+
+from utils.logger import SystemLogger
+
+
+class SnapshotError(Exception):
+    """Custom exception untuk snapshot AppState"""
+    pass
+
+
+class SnapshotState:
+    """File snapshot AppState (pickle object graph + watermark tabel)"""
+
+    MAGIC = b"SIAKSNAP"
+    VERSI = 3
+    HEADER = struct.Struct("<8sHI")
+    PROTOKOL = 5
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: Lokasi file snapshot (default env SIAK_SNAPSHOT_PATH
+                atau data/state.snap)
+        """
+        self.path = path or os.environ.get("SIAK_SNAPSHOT_PATH", os.path.join("data", "state.snap"))
+        self.logger = SystemLogger()
+
+    @staticmethod
+    def sidik_skema():
+        """
+        Sidik atribut AppState dan StatistikAkademik; berubah jika struktur
+        state berubah sehingga snapshot lama otomatis tidak dipakai.
+        """
+        from app import AppState
+        state = AppState()
+        nama = sorted(vars(state)) + sorted(vars(state.statistik))
+        return zlib.crc32(",".join(nama).encode())
+
+    def simpan(self, state, watermark):
+        """
+        Tulis snapshot secara atomik (file sementara lalu os.replace).
+        Dipanggil saat state tidak sedang diubah (setelah load, sebelum sesi dilayani).
+
+        Args:
+            state: AppState
+            watermark: Dict nama tabel -> {"jumlah", "maks_id", "checksum"}
+
+        Returns:
+            Ukuran file (byte)
+
+        Raises:
+            SnapshotError: Jika state tidak bisa diserialisasi atau file tidak bisa ditulis
+        """
+        gc_aktif = gc.isenabled()
+        gc.disable()
+        try:
+            with state._kunci_index:
+                payload = pickle.dumps(state, protocol=self.PROTOKOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            raise SnapshotError(f"Gagal serialisasi state: {e}")
+        finally:
+            if gc_aktif:
+                gc.enable()
+
+        meta = json.dumps({
+            "dibuat": datetime.now().isoformat(timespec="seconds"),
+            "sidik": self.sidik_skema(),
+            "pickle": self.PROTOKOL,
+            "panjang": len(payload),
+            "crc32": zlib.crc32(payload),
+            "watermark": watermark,
+        }).encode()
+
+        folder = os.path.dirname(os.path.abspath(self.path))
+        tmp = self.path + ".tmp"
+        try:
+            os.makedirs(folder, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(self.HEADER.pack(self.MAGIC, self.VERSI, len(meta)))
+                f.write(meta)
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except OSError as e:
+            raise SnapshotError(f"Gagal menulis snapshot: {e}")
+        return self.HEADER.size + len(meta) + len(payload)
+
+    def muat(self):
+        """
+        Baca snapshot.
+
+        Returns:
+            (AppState, watermark) atau None jika file tidak ada / tidak valid
+            (alasannya dicatat ke log)
+        """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            self.logger.warning(f"Snapshot {self.path} tidak bisa dibuka: {e}")
+            return None
+
+        with f:
+            try:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                buffer = f.read()      # mis. file kosong atau mmap tidak didukung
+            data = memoryview(buffer)
+            try:
+                return self._baca(data)
+            except SnapshotError as e:
+                self.logger.warning(f"Snapshot {self.path} diabaikan: {e}")
+                return None
+            finally:
+                data.release()
+                if isinstance(buffer, mmap.mmap):
+                    buffer.close()
+
+    def _baca(self, data):
+        if len(data) < self.HEADER.size:
+            raise SnapshotError("file terpotong")
+        magic, versi, panjang_meta = self.HEADER.unpack_from(data)
+        if magic != self.MAGIC:
+            raise SnapshotError("bukan file snapshot")
+        if versi != self.VERSI:
+            raise SnapshotError(f"versi {versi} tidak didukung (butuh {self.VERSI})")
+
+        awal = self.HEADER.size + panjang_meta
+        try:
+            meta = json.loads(bytes(data[self.HEADER.size:awal]))
+        except ValueError:
+            raise SnapshotError("meta rusak")
+        if meta.get("sidik") != self.sidik_skema():
+            raise SnapshotError("struktur AppState sudah berubah")
+
+        payload = data[awal:awal + meta["panjang"]]
+        if len(payload) != meta["panjang"] or zlib.crc32(payload) != meta["crc32"]:
+            raise SnapshotError("checksum payload tidak cocok")
+
+        # Jutaan objek kecil: GC otomatis selama unpickle hanya memperlambat.
+        # Objeknya baru dibekukan (gc.freeze) oleh DBLoader.load_snapshot setelah
+        # snapshot pasti dipakai; state yang dibuang harus tetap bisa dikoleksi.
+        gc_aktif = gc.isenabled()
+        gc.disable()
+        try:
+            state = pickle.loads(payload)
+        except Exception as e:
+            raise SnapshotError(f"payload tidak bisa dibaca: {e}")
+        finally:
+            payload.release()
+            if gc_aktif:
+                gc.enable()
+        return state, meta["watermark"]
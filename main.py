@@ -2,18 +2,47 @@
 # MAIN PROGRAM
 # ===============================
 
+import argparse
+
 from app import SistemAkademik
 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sistem Akademik")
+    parser.add_argument(
+        "--server", action="store_true",
+        help="Jalankan server TCP multi-sesi (telnet/nc) alih-alih menu terminal"
+    )
+    parser.add_argument("--host", help="Alamat bind server (default SIAK_SERVER_HOST atau 127.0.0.1)")
+    parser.add_argument("--port", type=int, help="Port server (default SIAK_SERVER_PORT atau 7000)")
+    parser.add_argument("--maks-sesi", type=int, help="Jumlah sesi bersamaan maksimum")
+    parser.add_argument(
+        "--write-behind", action="store_true", default=None,
+        help="Catat simpan MK/nilai/KRS ke jurnal lokal dan kirim ke database di background"
+    )
+    parser.add_argument(
+        "--snapshot", action="store_true", default=None,
+        help="Warm start dari snapshot biner state (hanya baris yang berubah diambil dari database)"
+    )
+    parser.add_argument(
+        "--refresh-interval", type=float, metavar="DETIK",
+        help="Tarik perubahan database (change_log) ke state tiap DETIK detik; 0 = nonaktif "
+             "(default SIAK_REFRESH_INTERVAL atau 0)"
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    sistem = SistemAkademik()
+    args = parse_args()
+    sistem = SistemAkademik(
+        write_behind=args.write_behind, snapshot=args.snapshot, refresh_interval=args.refresh_interval
+    )
 
-    while True:
-        sistem.login()
-        lagi = input("\nIngin login lagi? (y/n): ").lower()
-        if lagi == 'n':
-            print("Keluar dari sistem.")
-            break
-        elif lagi != 'y':
-            print("Input tidak valid. Keluar dari sistem.")
-            break
-            
\ No newline at end of file
+    try:
+        if args.server:
+            from presentation.server import ServerAkademik
+            ServerAkademik(sistem, host=args.host, port=args.port, maks_sesi=args.maks_sesi).jalankan()
+        else:
+            sistem.jalankan()
+    finally:
+        sistem.tutup()
@@ -86,6 +86,7 @@ class IsiPresensiCommand(Command):
     
     def execute(self):
         from presentation.ui.menu_ui_helper import MenuDisplay, MenuInputValidator, MenuUI
+        from domain.services.mahasiswa_service import MahasiswaServiceError
         MenuDisplay.subheader("Isi Presensi")
         
         presensi_list = self.mahasiswa_service.lihat_presensi_tersedia(self.mahasiswa)
@@ -108,10 +109,13 @@ class IsiPresensiCommand(Command):
             )
             
             pres = presensi_list[idx - 1]
-            pres.isi_hadir(self.mahasiswa)
+            # Lewat service: cek KRS + duplikat dilakukan atomik per sesi presensi
+            self.mahasiswa_service.ambil_presensi(self.mahasiswa, pres)
             MenuDisplay.success("Presensi berhasil diisi")
         except (ValueError, IndexError):
             MenuDisplay.error("Input tidak valid")
+        except MahasiswaServiceError as e:
+            MenuDisplay.error(str(e))
         
         MenuDisplay.pause()
     
@@ -242,7 +246,8 @@ class LihatSemuaMataKuliahCommand(Command):
         MenuUI.show_list(
             mk_list,
             title="Mata Kuliah",
-            item_format=lambda mk: mk.info()
+            item_format=lambda mk: mk.info(),
+            cari=self.admin_service.cari_mata_kuliah_prefix
         )
         MenuDisplay.pause()
     
@@ -273,7 +278,8 @@ class LihatSemuaMahasiswaCommand(Command):
         MenuUI.show_list(
             mhs_list,
             title="Mahasiswa",
-            item_format=lambda m: f"{m.nim} - {m.nama} ({m.prodi})"
+            item_format=lambda m: f"{m.nim} - {m.nama} ({m.prodi})",
+            cari=lambda prefix: (m for m in mhs_list if m.nim.startswith(prefix))
         )
         MenuDisplay.pause()
     
@@ -302,6 +308,22 @@ class LihatStatistikCommand(Command):
         print(f"Total KRS           : {stats['total_krs']}")
         print(f"Total Presensi      : {stats['total_presensi']}")
         print(f"Total Nilai         : {stats['total_nilai']}")
+        print(f"Rata-rata Kelas     : {stats['rata_rata_kelas']} mahasiswa")
+        if stats['sumber'] == 'database':
+            print("Sumber              : agregat database (mode lazy)")
+        
+        MenuDisplay.subheader("Mahasiswa per Prodi")
+        for prodi, jumlah in sorted(stats['mahasiswa_per_prodi'].items()):
+            print(f"• {prodi}: {jumlah}")
+        
+        MenuDisplay.subheader("Distribusi Nilai per Mata Kuliah")
+        for kode, distribusi in sorted(stats['distribusi_nilai'].items()):
+            isi = ", ".join(f"{huruf}={n}" for huruf, n in sorted(distribusi.items()))
+            print(f"• {kode}: {isi}")
+        
+        MenuDisplay.subheader("Tingkat Kehadiran per Mata Kuliah")
+        for kode, persen in sorted(stats['tingkat_kehadiran'].items()):
+            print(f"• {kode}: {persen}%")
         
         MenuDisplay.pause()
     
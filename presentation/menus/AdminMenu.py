@@ -4,26 +4,29 @@ Menu untuk admin.
 Menampilkan menu operasi: Manajemen Mata Kuliah dan Statistik.
 """
 
-from infrastructure.repositories import MataKuliahRepository
+from infrastructure.repositories import MataKuliahRepository, NilaiRepository, RepositoryError
 from presentation.ui.menu_ui_helper import MenuDisplay, MenuInputValidator, MenuUI
 from domain.services.admin_service import AdminService, AdminServiceError
+from application.use_cases.export_laporan import ExportLaporan, ExportLaporanError
 
 
 class AdminMenu:
     """Menu interface untuk admin"""
     
-    def __init__(self, state, service, conn):
+    def __init__(self, state, service, conn, antrean=None):
         """
         Args:
             state: AppState object
             service: AkademikService atau AdminService
-            conn: Database connection
+            conn: ConnectionPool (atau satu database connection)
+            antrean: AntreanTulis untuk mode write-behind (optional)
         """
         self.state = state
         self.service = service
         self.conn = conn
+        self.antrean = antrean
         self.admin_service = AdminService(state)
-        self.mk_repo = MataKuliahRepository(conn) if conn else None
+        self.mk_repo = MataKuliahRepository(conn, state, antrean=antrean) if conn else None
 
     def run(self, admin):
         """
@@ -47,6 +50,10 @@ class AdminMenu:
                     self._lihat_semua_mahasiswa()
                 elif pilih == "5":
                     self._lihat_statistik()
+                elif pilih == "6":
+                    self._hitung_ulang_statistik()
+                elif pilih == "7":
+                    self._export_laporan()
                 elif pilih == "0":
                     print("Logout admin...")
                     break
@@ -65,6 +72,8 @@ class AdminMenu:
         print("3. Edit mata kuliah")
         print("4. Lihat semua mahasiswa")
         print("5. Lihat statistik sistem")
+        print("6. Hitung ulang statistik (verifikasi)")
+        print("7. Export transkrip / lembar nilai")
         print("0. Logout")
 
     def _lihat_semua_mata_kuliah(self):
@@ -81,7 +90,8 @@ class AdminMenu:
         MenuUI.show_list(
             mk_list,
             title="Mata Kuliah",
-            item_format=lambda mk: mk.info()
+            item_format=lambda mk: mk.info(),
+            cari=self.admin_service.cari_mata_kuliah_prefix
         )
         MenuDisplay.pause()
 
@@ -109,39 +119,33 @@ class AdminMenu:
             MenuDisplay.pause()
             return
         
-        MenuUI.show_list(
+        dosen = MenuUI.pilih_item(
             self.state.daftar_dosen,
             title="Pilih Dosen Pengampu",
-            item_format=lambda d: d.nama
+            item_format=lambda d: f"{d.nidn} - {d.nama}",
+            cari=lambda prefix: (d for d in self.state.daftar_dosen if d.nidn.startswith(prefix))
         )
-        
-        try:
-            idx = MenuInputValidator.get_integer(
-                "Pilih: ",
-                min_val=1,
-                max_val=len(self.state.daftar_dosen)
-            )
-            dosen = self.state.daftar_dosen[idx - 1]
-        except ValueError:
-            MenuDisplay.error("Input tidak valid")
+        if dosen is None:
+            MenuDisplay.error("Dosen pengampu belum dipilih")
             MenuDisplay.pause()
             return
         
         # Tambah mata kuliah
         try:
             mk_baru = self.admin_service.tambah_mata_kuliah(
-                kode_mk, nama_mk, sks, deskripsi
+                kode_mk, nama_mk, sks, deskripsi, dosen=dosen
             )
-            mk_baru.dosen = dosen
             
-            # Simpan ke database (via repository)
+            # Simpan ke database (via repository, mk_by_id ikut di-index)
             if self.mk_repo:
-                new_id = self.mk_repo.simpan(mk_baru)
-                if hasattr(self.state, 'mk_by_id'):
-                    self.state.mk_by_id[new_id] = mk_baru
+                try:
+                    self.mk_repo.simpan(mk_baru)
+                except RepositoryError:
+                    self.state.hapus_mk(mk_baru)
+                    raise
             
             MenuDisplay.success("Mata kuliah berhasil ditambahkan")
-        except AdminServiceError as e:
+        except (AdminServiceError, RepositoryError) as e:
             MenuDisplay.error(str(e))
         
         MenuDisplay.pause()
@@ -150,33 +154,20 @@ class AdminMenu:
         """Menu untuk edit mata kuliah"""
         MenuDisplay.subheader("Edit Mata Kuliah")
         
-        mk_list = self.admin_service.lihat_semua_mata_kuliah()
-        
-        if not mk_list:
+        if not self.admin_service.lihat_semua_mata_kuliah():
             MenuDisplay.error("Belum ada mata kuliah")
             MenuDisplay.pause()
             return
         
         # Pilih mata kuliah
-        MenuUI.show_list(
-            mk_list,
-            title="Pilih Mata Kuliah yang Akan Diedit",
-            item_format=lambda mk: mk.info()
-        )
-        
-        try:
-            idx = MenuInputValidator.get_integer(
-                "Pilih: ",
-                min_val=1,
-                max_val=len(mk_list)
-            )
-            mk = mk_list[idx - 1]
-        except ValueError:
-            MenuDisplay.error("Input tidak valid")
+        mk = self._pilih_mata_kuliah("Pilih Mata Kuliah yang Akan Diedit")
+        if mk is None:
             MenuDisplay.pause()
             return
         
         kode_lama = mk.kode_mk
+        nama_lama = mk.nama_mk
+        sks_lama = mk.sks
         
         # Input perubahan
         print(f"\nKode MK saat ini: {mk.kode_mk}")
@@ -196,31 +187,51 @@ class AdminMenu:
                 MenuDisplay.pause()
                 return
         
-        # Update
+        # Update (kode baru dicek unik lewat index sebelum ada field yang berubah)
         try:
             mk_updated = self.admin_service.edit_mata_kuliah(
                 kode_lama,
                 nama=nama_baru if nama_baru else None,
                 sks=sks_baru,
-                deskripsi=None
+                deskripsi=None,
+                kode_baru=kode_baru if kode_baru else None
             )
-
-            # Jika kode diganti, validasi unik lalu update in-memory
-            if kode_baru and kode_baru != kode_lama:
-                if self.admin_service.cari_mata_kuliah_by_kode(kode_baru):
-                    raise AdminServiceError(f"Kode mata kuliah {kode_baru} sudah ada")
-                mk_updated.kode_mk = kode_baru
             
             # Simpan ke database (via repository)
             if self.mk_repo:
-                self.mk_repo.update(mk_updated, kode_lama=kode_lama)
+                try:
+                    self.mk_repo.update(mk_updated, kode_lama=kode_lama)
+                except RepositoryError:
+                    # Kembalikan katalog in-memory ke keadaan sebelum edit
+                    self.admin_service.edit_mata_kuliah(
+                        mk_updated.kode_mk, nama=nama_lama, sks=sks_lama, kode_baru=kode_lama
+                    )
+                    raise
             
             MenuDisplay.success("Mata kuliah berhasil diedit")
-        except AdminServiceError as e:
+        except (AdminServiceError, RepositoryError) as e:
             MenuDisplay.error(str(e))
         
         MenuDisplay.pause()
 
+    def _pilih_mata_kuliah(self, title):
+        """
+        Picker mata kuliah per halaman. Katalog besar bisa disaring dengan
+        prefix kode (index kode terurut) lewat perintah /<awalan>.
+        
+        Returns:
+            Mata Kuliah yang dipilih atau None
+        """
+        mk = MenuUI.pilih_item(
+            self.admin_service.lihat_semua_mata_kuliah(),
+            title=title,
+            item_format=lambda mk: mk.info(),
+            cari=self.admin_service.cari_mata_kuliah_prefix
+        )
+        if mk is None:
+            MenuDisplay.info("Tidak ada mata kuliah yang dipilih")
+        return mk
+
     def _lihat_semua_mahasiswa(self):
         """Menampilkan semua mahasiswa"""
         MenuDisplay.subheader("Daftar Semua Mahasiswa")
@@ -235,7 +246,8 @@ class AdminMenu:
         MenuUI.show_list(
             mhs_list,
             title="Mahasiswa",
-            item_format=lambda m: f"{m.nim} - {m.nama} ({m.prodi})"
+            item_format=lambda m: f"{m.nim} - {m.nama} ({m.prodi})",
+            cari=lambda prefix: (m for m in mhs_list if m.nim.startswith(prefix))
         )
         MenuDisplay.pause()
 
@@ -251,6 +263,94 @@ class AdminMenu:
         print(f"Total KRS           : {stats['total_krs']}")
         print(f"Total Presensi      : {stats['total_presensi']}")
         print(f"Total Nilai         : {stats['total_nilai']}")
+        print(f"Rata-rata Kelas     : {stats['rata_rata_kelas']} mahasiswa")
+        if stats['sumber'] == 'database':
+            print("Sumber              : agregat database (mode lazy)")
+        
+        MenuDisplay.subheader("Mahasiswa per Prodi")
+        for prodi, jumlah in sorted(stats['mahasiswa_per_prodi'].items()):
+            print(f"• {prodi}: {jumlah}")
+        
+        MenuDisplay.subheader("Distribusi Nilai per Mata Kuliah")
+        for kode, distribusi in sorted(stats['distribusi_nilai'].items()):
+            isi = ", ".join(f"{huruf}={n}" for huruf, n in sorted(distribusi.items()))
+            print(f"• {kode}: {isi}")
+        
+        MenuDisplay.subheader("Tingkat Kehadiran per Mata Kuliah")
+        for kode, persen in sorted(stats['tingkat_kehadiran'].items()):
+            print(f"• {kode}: {persen}%")
+        
+        MenuDisplay.pause()
+
+    def _hitung_ulang_statistik(self):
+        """Hitung ulang statistik dengan scan penuh dan laporkan selisihnya"""
+        MenuDisplay.subheader("Hitung Ulang Statistik")
+        
+        selisih = self.admin_service.hitung_ulang_statistik()
+        if selisih:
+            for pesan in selisih:
+                MenuDisplay.warning(pesan)
+            MenuDisplay.info("Statistik sudah diganti dengan hasil hitung ulang")
+        else:
+            MenuDisplay.success("Statistik inkremental sesuai dengan hitung ulang")
         
         MenuDisplay.pause()
 
+    def _export_laporan(self):
+        """Export transkrip mahasiswa atau lembar nilai ke file (streaming dari database)"""
+        MenuDisplay.subheader("Export Laporan Nilai")
+        
+        if not self.conn:
+            MenuDisplay.error("Export membutuhkan koneksi database")
+            MenuDisplay.pause()
+            return
+        
+        print("1. Transkrip mahasiswa (nilai, SKS, IPK)")
+        print("2. Lembar nilai per mata kuliah")
+        jenis = MenuInputValidator.get_string("Jenis laporan: ")
+        if jenis not in ("1", "2"):
+            MenuDisplay.error("Pilihan tidak valid")
+            MenuDisplay.pause()
+            return
+        
+        formats = ExportLaporan.get_available_formats()
+        format_file = MenuInputValidator.get_string(
+            f"Format ({'/'.join(formats)}, Enter untuk csv): ", allow_empty=True
+        ).strip().lower() or "csv"
+        
+        # Filter (Enter = semua)
+        prodi = MenuInputValidator.get_string("Filter prodi (Enter untuk semua): ", allow_empty=True).strip()
+        angkatan = MenuInputValidator.get_string("Filter angkatan (Enter untuk semua): ", allow_empty=True).strip()
+        tahun_ajaran = MenuInputValidator.get_string(
+            "Filter tahun ajaran, mis. 2025/2026 (Enter untuk semua): ", allow_empty=True
+        ).strip()
+        if angkatan and not angkatan.isdigit():
+            MenuDisplay.error("Angkatan harus berupa angka")
+            MenuDisplay.pause()
+            return
+        
+        nama_default = "transkrip" if jenis == "1" else "lembar_nilai"
+        path = MenuInputValidator.get_string(
+            f"Path file (Enter untuk {nama_default}.{format_file}): ", allow_empty=True
+        ).strip() or f"{nama_default}.{format_file}"
+        
+        exporter = ExportLaporan(NilaiRepository(self.conn, antrean=self.antrean))
+        filter_export = {
+            "prodi": prodi or None,
+            "angkatan": int(angkatan) if angkatan else None,
+            "tahun_ajaran": tahun_ajaran or None,
+        }
+        try:
+            if jenis == "1":
+                hasil = exporter.ekspor_transkrip(path, format_file, **filter_export)
+                label = "mahasiswa"
+            else:
+                hasil = exporter.ekspor_lembar_nilai(path, format_file, **filter_export)
+                label = "mata kuliah"
+            MenuDisplay.success(
+                f"{hasil.jumlah_grup} {label} ({hasil.jumlah_nilai} nilai) diexport ke {hasil.path}"
+            )
+        except ExportLaporanError as e:
+            MenuDisplay.error(str(e))
+        
+        MenuDisplay.pause()
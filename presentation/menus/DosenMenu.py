@@ -5,30 +5,35 @@ Menampilkan menu operasi: Presensi dan Nilai.
 """
 
 from datetime import datetime
-from infrastructure.repositories import NilaiRepository
+from infrastructure.repositories import NilaiRepository, PresensiRepository, RepositoryError
 from domain.entities.presensi import Presensi
 from domain.entities.nilai import Nilai
 from presentation.ui.menu_ui_helper import MenuDisplay, MenuInputValidator, MenuUI
 from domain.services.dosen_service import DosenService, DosenServiceError
 from domain.entities.grading_strategy import GradingFactory
+from application.use_cases.import_nilai import ImportNilai, ImportNilaiError
 
 
 class DosenMenu:
     """Menu interface untuk dosen"""
     
-    def __init__(self, state, service, conn):
+    def __init__(self, state, service, conn, antrean=None):
         """
         Args:
             state: AppState object
             service: AkademikService atau DosenService
-            conn: Database connection
+            conn: ConnectionPool (atau satu database connection)
+            antrean: AntreanTulis untuk mode write-behind (optional)
         """
         self.state = state
         self.service = service
         self.conn = conn
+        self.antrean = antrean
         self.dosen_service = DosenService(state)
-        self.grading_strategy = GradingFactory.create_strategy('standard')
-        self.nilai_repo = NilaiRepository(conn) if conn else None
+        # Skala yang sama untuk input nilai manual dan import CSV (Enter)
+        self.grading_strategy = GradingFactory.create_strategy(GradingFactory.DEFAULT)
+        self.nilai_repo = NilaiRepository(conn, state, antrean=antrean) if conn else None
+        self.presensi_repo = PresensiRepository(conn, state, antrean=antrean) if conn else None
 
     def run(self, dosen):
         """
@@ -52,6 +57,8 @@ class DosenMenu:
                     self._lihat_daftar_presensi(dosen)
                 elif pilih == "5":
                     self._input_nilai(dosen)
+                elif pilih == "6":
+                    self._import_nilai(dosen)
                 elif pilih == "0":
                     print("Logout dosen...")
                     break
@@ -70,6 +77,7 @@ class DosenMenu:
         print("3. Buat presensi")
         print("4. Lihat daftar presensi")
         print("5. Input nilai mahasiswa")
+        print("6. Import nilai dari file CSV")
         print("0. Logout")
 
     def _lihat_profil(self, dosen):
@@ -140,9 +148,21 @@ class DosenMenu:
         
         try:
             pres = self.dosen_service.buat_presensi(dosen, mk_pilih, tanggal)
-            MenuDisplay.success("Presensi berhasil dibuat")
         except DosenServiceError as e:
             MenuDisplay.error(str(e))
+            MenuDisplay.pause()
+            return
+
+        if self.presensi_repo:
+            try:
+                self.presensi_repo.simpan(pres)
+            except RepositoryError as e:
+                # Batalkan sesi di memori agar tidak hilang saat restart
+                self.state.hapus_presensi(pres)
+                MenuDisplay.error(f"Gagal menyimpan presensi: {e}")
+                MenuDisplay.pause()
+                return
+        MenuDisplay.success("Presensi berhasil dibuat")
         
         MenuDisplay.pause()
 
@@ -196,10 +216,8 @@ class DosenMenu:
             return
         
         # Dapatkan mahasiswa yang mengambil mata kuliah
-        mhs_yang_ambil = []
-        for krs in self.state.daftar_krs:
-            if mk_pilih in krs.daftar_mk:
-                mhs_yang_ambil.append(krs.mahasiswa)
+        self.state.pastikan_roster_termuat(mk_pilih)
+        mhs_yang_ambil = self.state.roster_mk(mk_pilih)
         
         if not mhs_yang_ambil:
             MenuDisplay.error("Belum ada mahasiswa yang mengambil mata kuliah ini")
@@ -238,9 +256,11 @@ class DosenMenu:
             return
         
         # Input nilai ke database
+        nilai_huruf, nilai_bobot = self.grading_strategy.konversi_nilai(nilai_angka)
         try:
             nilai_obj = self.dosen_service.input_nilai(
-                dosen, m_pilih, mk_pilih, nilai_angka
+                dosen, m_pilih, mk_pilih, nilai_angka,
+                nilai_huruf=nilai_huruf, nilai_bobot=nilai_bobot
             )
             
             # Simpan/update ke database (via repository)
@@ -253,3 +273,69 @@ class DosenMenu:
         
         MenuDisplay.pause()
 
+    def _import_nilai(self, dosen):
+        """Menu untuk import nilai satu mata kuliah dari file CSV"""
+        MenuDisplay.subheader("Import Nilai dari CSV")
+        
+        mk_dosen = [mk for mk in self.state.daftar_mk if mk.dosen == dosen]
+        if not mk_dosen:
+            MenuDisplay.error("Anda belum mengampu mata kuliah")
+            MenuDisplay.pause()
+            return
+        
+        MenuUI.show_list(
+            mk_dosen,
+            title="Pilih Mata Kuliah",
+            item_format=lambda mk: mk.info()
+        )
+        try:
+            idx_mk = MenuInputValidator.get_integer("Pilih: ", min_val=1, max_val=len(mk_dosen))
+            mk_pilih = mk_dosen[idx_mk - 1]
+        except ValueError:
+            MenuDisplay.error("Input tidak valid")
+            MenuDisplay.pause()
+            return
+        
+        # Pilih skala grading (Enter = skala yang sedang dipakai)
+        pilihan = GradingFactory.get_available_strategies()
+        print(f"Skala grading: {', '.join(pilihan)}")
+        nama_skala = MenuInputValidator.get_string(
+            f"Skala (Enter untuk {self.grading_strategy.get_description()}): ", allow_empty=True
+        )
+        try:
+            strategy = (
+                GradingFactory.create_strategy(nama_skala) if nama_skala else self.grading_strategy
+            )
+        except ValueError as e:
+            MenuDisplay.error(str(e))
+            MenuDisplay.pause()
+            return
+        
+        print("Format file: header 'nim,nilai' lalu satu mahasiswa per baris")
+        path = MenuInputValidator.get_string("Path file CSV: ")
+        
+        # Repository tanpa state: state diperbarui ImportNilai lewat DosenService setelah commit
+        import_nilai = ImportNilai(
+            self.state,
+            self.dosen_service,
+            nilai_repo=NilaiRepository(self.conn, antrean=self.antrean) if self.conn else None,
+            strategy=strategy
+        )
+        try:
+            hasil = import_nilai.jalankan(path, dosen, mk_pilih)
+        except ImportNilaiError as e:
+            MenuDisplay.error(str(e))
+            MenuDisplay.pause()
+            return
+        
+        MenuDisplay.success(
+            f"{hasil.berhasil} dari {hasil.total_baris} baris berhasil diimport ({strategy.get_description()})"
+        )
+        if hasil.jumlah_error:
+            MenuDisplay.warning(f"{hasil.jumlah_error} baris gagal:")
+            for nomor_baris, pesan in hasil.errors[:20]:
+                print(f"• Baris {nomor_baris}: {pesan}")
+            if hasil.jumlah_error > 20:
+                print(f"... dan {hasil.jumlah_error - 20} error lainnya")
+        
+        MenuDisplay.pause()
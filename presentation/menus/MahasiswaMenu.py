@@ -4,26 +4,30 @@ Menu untuk mahasiswa.
 Menampilkan menu operasi: KRS, Presensi, Nilai.
 """
 
-from infrastructure.repositories import KRSRepository
+from infrastructure.repositories import KRSRepository, PresensiRepository, RepositoryError
 from presentation.ui.menu_ui_helper import MenuDisplay, MenuInputValidator, MenuUI
 from domain.services.mahasiswa_service import MahasiswaService, MahasiswaServiceError
+from utils.konkurensi import KunciAgregat
 
 
 class MahasiswaMenu:
     """Menu interface untuk mahasiswa"""
     
-    def __init__(self, state, service, conn):
+    def __init__(self, state, service, conn, antrean=None):
         """
         Args:
             state: AppState object
             service: AkademikService atau MahasiswaService
-            conn: Database connection
+            conn: ConnectionPool (atau satu database connection)
+            antrean: AntreanTulis untuk mode write-behind (optional)
         """
         self.state = state
         self.service = service
         self.conn = conn
+        self.antrean = antrean
         self.mahasiswa_service = MahasiswaService(state)
-        self.krs_repo = KRSRepository(conn) if conn else None
+        self.krs_repo = KRSRepository(conn, state, antrean=antrean) if conn else None
+        self.presensi_repo = PresensiRepository(conn, state, antrean=antrean) if conn else None
 
     def run(self, mhs):
         """
@@ -99,40 +103,30 @@ class MahasiswaMenu:
 
         temp_pilihan = []
         
-        while True:
-            # Filter mata kuliah yang belum diambil
-            mk_tersedia = [
-                mk for mk in self.state.daftar_mk 
+        def tersedia(daftar_mk):
+            # Filter lazy: hanya halaman yang dibuka yang diperiksa dan diformat
+            return (
+                mk for mk in daftar_mk
                 if mk not in krs.daftar_mk and mk not in temp_pilihan
-            ]
-            
-            if not mk_tersedia:
+            )
+        
+        while True:
+            if next(tersedia(self.state.daftar_mk), None) is None:
                 MenuDisplay.info("Tidak ada mata kuliah lagi yang bisa diambil")
                 break
 
-            # Tampilkan daftar mata kuliah tersedia
-            MenuUI.show_list(
-                mk_tersedia,
-                title="Daftar Mata Kuliah Tersedia",
-                item_format=lambda mk: mk.info()
+            # Tampilkan daftar mata kuliah tersedia per halaman
+            mk = MenuUI.pilih_item(
+                tersedia(self.state.daftar_mk),
+                title="Daftar Mata Kuliah Tersedia (q = selesai memilih)",
+                item_format=lambda mk: mk.info(),
+                cari=lambda prefix: tersedia(self.state.iterasi_mk_prefix(prefix))
             )
-            print("0. Selesai memilih")
+            if mk is None:
+                break
             
-            try:
-                pilih_mk = MenuInputValidator.get_integer(
-                    "Pilih nomor mata kuliah (0 untuk selesai): ",
-                    min_val=0,
-                    max_val=len(mk_tersedia)
-                )
-                
-                if pilih_mk == 0:
-                    break
-                
-                mk = mk_tersedia[pilih_mk - 1]
-                temp_pilihan.append(mk)
-                MenuDisplay.success(f"Mata kuliah {mk.kode_mk} ditambahkan ke daftar pilihan")
-            except ValueError:
-                MenuDisplay.error("Input tidak valid")
+            temp_pilihan.append(mk)
+            MenuDisplay.success(f"Mata kuliah {mk.kode_mk} ditambahkan ke daftar pilihan")
 
         if temp_pilihan:
             # Tampilkan preview
@@ -142,22 +136,21 @@ class MahasiswaMenu:
             
             # Konfirmasi
             if MenuInputValidator.confirm_action("Yakin simpan ke KRS? (y/n): "):
-                try:
-                    for mk in temp_pilihan:
-                        krs.tambah_mk(mk)
-
-                    # Simpan ke database (via repository)
-                    if self.krs_repo:
-                        if getattr(krs, 'id_krs', None):
-                            self.krs_repo.tambah_detail(krs, temp_pilihan)
-                        else:
-                            new_krs_id = self.krs_repo.simpan(krs)
-                            if hasattr(self.state, 'krs_by_id'):
-                                self.state.krs_by_id[new_krs_id] = krs
-                    MenuDisplay.success("Mata kuliah berhasil disimpan ke KRS")
-                except Exception as e:
-                    MenuDisplay.error(f"Gagal menyimpan KRS: {str(e)}")
-                    krs.daftar_mk = krs.daftar_mk[:-len(temp_pilihan)]  # Rollback
+                # Sesi lain milik mahasiswa yang sama menunggu sampai KRS tersimpan
+                with self.state.kunci.tulis(KunciAgregat.KRS, mhs.id):
+                    ditambah = [mk for mk in temp_pilihan if krs.tambah_mk(mk)]
+                    try:
+                        # Simpan ke database (via repository)
+                        if self.krs_repo and ditambah:
+                            if getattr(krs, 'id_krs', None):
+                                self.krs_repo.tambah_detail(krs, ditambah)
+                            else:
+                                self.krs_repo.simpan(krs)
+                        MenuDisplay.success("Mata kuliah berhasil disimpan ke KRS")
+                    except Exception as e:
+                        MenuDisplay.error(f"Gagal menyimpan KRS: {str(e)}")
+                        for mk in ditambah:  # Rollback
+                            krs.hapus_mk(mk)
             else:
                 MenuDisplay.warning("Perubahan KRS dibatalkan")
         else:
@@ -190,10 +183,20 @@ class MahasiswaMenu:
             )
             
             pres = presensi_list[idx - 1]
-            pres.isi_hadir(mhs)
+            self.mahasiswa_service.ambil_presensi(mhs, pres)
+            if self.presensi_repo:
+                try:
+                    self.presensi_repo.tambah_hadir(pres.id, mhs.id)
+                except RepositoryError as e:
+                    pres.hapus_hadir(mhs)
+                    MenuDisplay.error(f"Gagal menyimpan presensi: {e}")
+                    MenuDisplay.pause()
+                    return
             MenuDisplay.success("Presensi berhasil diisi")
         except (ValueError, IndexError):
             MenuDisplay.error("Input tidak valid")
+        except MahasiswaServiceError as e:
+            MenuDisplay.error(str(e))
         
         MenuDisplay.pause()
 
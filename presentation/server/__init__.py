@@ -0,0 +1,5 @@
+# Presentation - Server jaringan (multi-sesi)
+from .sesi_io import SesiIO, SesiTerputus
+from .tcp_server import ServerAkademik
+
+__all__ = ['SesiIO', 'SesiTerputus', 'ServerAkademik']
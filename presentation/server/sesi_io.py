@@ -0,0 +1,152 @@
+"""
+presentation/server/sesi_io.py
+Stream I/O per sesi untuk server TCP.
+
+Menu memakai input()/print() biasa. Selama server berjalan, sys.stdin dan
+sys.stdout diganti proxy yang meneruskan ke SesiIO milik thread sesi yang
+sedang berjalan (thread lain, termasuk thread utama, tetap memakai stream asli).
+"""
+
+import asyncio
+import queue
+import sys
+import threading
+
+
+class SesiTerputus(BaseException):
+    """
+    Koneksi sesi ditutup client atau idle terlalu lama.
+    Turunan BaseException (seperti KeyboardInterrupt) agar tidak tertangkap
+    `except Exception` di loop menu dan langsung mengakhiri sesi.
+    """
+    pass
+
+
+class SesiIO:
+    """
+    Stream teks satu sesi.
+
+    - readline() dipanggil thread sesi; menunggu baris dari antrean yang diisi
+      event loop (masukkan) dari socket.
+    - write() dipanggil thread sesi; data dikirim ke socket lewat event loop.
+    - flush() menunggu buffer socket terkirim (backpressure per prompt).
+    """
+
+    def __init__(self, loop, writer, batas_idle=None, batas_flush=30):
+        """
+        Args:
+            loop: Event loop asyncio pemilik writer
+            writer: asyncio.StreamWriter koneksi client
+            batas_idle: Detik menunggu input sebelum sesi diputus (None = tanpa batas)
+            batas_flush: Detik menunggu buffer socket terkirim
+        """
+        self._loop = loop
+        self._writer = writer
+        self._baris = queue.Queue()
+        self.batas_idle = batas_idle
+        self.batas_flush = batas_flush
+        self.encoding = "utf-8"
+
+    # ============ Dipanggil dari event loop ============
+
+    def masukkan(self, baris):
+        """Masukkan satu baris input dari client (None = koneksi ditutup)"""
+        self._baris.put(baris)
+
+    # ============ Dipanggil dari thread sesi ============
+
+    def readline(self, size=-1):
+        try:
+            baris = self._baris.get(timeout=self.batas_idle)
+        except queue.Empty:
+            raise SesiTerputus("Sesi idle terlalu lama")
+        if baris is None:
+            raise SesiTerputus("Koneksi ditutup client")
+        return baris
+
+    def write(self, teks):
+        if teks:
+            data = teks.replace("\n", "\r\n").encode(self.encoding, errors="replace")
+            self._loop.call_soon_threadsafe(self._kirim, data)
+        return len(teks)
+
+    def flush(self):
+        if self._writer.is_closing():
+            raise SesiTerputus("Koneksi ditutup client")
+        future = asyncio.run_coroutine_threadsafe(self._drain(), self._loop)
+        try:
+            future.result(self.batas_flush)
+        except Exception:
+            future.cancel()
+            raise SesiTerputus("Gagal mengirim ke client")
+
+    def isatty(self):
+        return False
+
+    # ============ Helper (event loop) ============
+
+    def _kirim(self, data):
+        if not self._writer.is_closing():
+            self._writer.write(data)
+
+    async def _drain(self):
+        if not self._writer.is_closing():
+            await self._writer.drain()
+
+
+class _StreamPerThread:
+    """Proxy stream: thread yang memasang SesiIO memakainya, thread lain memakai stream asli"""
+
+    def __init__(self, asli):
+        self._asli = asli
+        self._lokal = threading.local()
+
+    def pasang(self, stream):
+        self._lokal.stream = stream
+
+    def lepas(self):
+        self._lokal.stream = None
+
+    def _aktif(self):
+        return getattr(self._lokal, "stream", None) or self._asli
+
+    def write(self, teks):
+        return self._aktif().write(teks)
+
+    def readline(self, size=-1):
+        return self._aktif().readline(size)
+
+    def flush(self):
+        return self._aktif().flush()
+
+    def __getattr__(self, nama):
+        # fileno/isatty/encoding dst. diteruskan ke stream aktif
+        return getattr(self._aktif(), nama)
+
+
+class RouterStdio:
+    """Pasang/lepas proxy sys.stdin dan sys.stdout per thread"""
+
+    def __init__(self):
+        self._stdin = None
+        self._stdout = None
+
+    def aktifkan(self):
+        if self._stdin is None:
+            self._stdin = _StreamPerThread(sys.stdin)
+            self._stdout = _StreamPerThread(sys.stdout)
+            sys.stdin, sys.stdout = self._stdin, self._stdout
+
+    def nonaktifkan(self):
+        if self._stdin is not None:
+            sys.stdin, sys.stdout = self._stdin._asli, self._stdout._asli
+            self._stdin = self._stdout = None
+
+    def pasang(self, sesi_io):
+        """Arahkan input()/print() thread ini ke sesi_io"""
+        self._stdin.pasang(sesi_io)
+        self._stdout.pasang(sesi_io)
+
+    def lepas(self):
+        self._stdin.lepas()
+        self._stdout.lepas()
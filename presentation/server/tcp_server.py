@@ -0,0 +1,137 @@
+"""
+presentation/server/tcp_server.py
+Front end jaringan berbasis baris (TCP / telnet / nc) untuk SistemAkademik.
+
+Banyak sesi login berjalan bersamaan di atas satu AppState dan service layer.
+Event loop asyncio hanya memompa byte socket; setiap sesi (menu, service,
+query repository yang blocking) berjalan di thread milik executor berukuran
+terbatas, jadi SQL yang lambat hanya menahan sesinya sendiri.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from presentation.server.sesi_io import RouterStdio, SesiIO, SesiTerputus
+from utils.logger import SystemLogger
+
+
+class ServerAkademik:
+    """
+    Server TCP multi-sesi.
+
+    Konfigurasi default dari environment:
+    SIAK_SERVER_HOST (127.0.0.1), SIAK_SERVER_PORT (7000),
+    SIAK_SERVER_MAKS_SESI (32), SIAK_SERVER_IDLE (900 detik).
+    """
+
+    def __init__(self, sistem, host=None, port=None, maks_sesi=None, batas_idle=None):
+        """
+        Args:
+            sistem: SistemAkademik yang sudah di-load (state, service, menu dipakai bersama)
+            host: Alamat bind
+            port: Port TCP
+            maks_sesi: Jumlah sesi bersamaan maksimum (= ukuran thread executor)
+            batas_idle: Detik tanpa input sebelum sesi diputus
+        """
+        self.sistem = sistem
+        self.host = host or os.environ.get("SIAK_SERVER_HOST", "127.0.0.1")
+        self.port = int(port if port is not None else os.environ.get("SIAK_SERVER_PORT", "7000"))
+        self.maks_sesi = int(maks_sesi or os.environ.get("SIAK_SERVER_MAKS_SESI", "32"))
+        self.batas_idle = float(batas_idle or os.environ.get("SIAK_SERVER_IDLE", "900"))
+        if self.maks_sesi < 1:
+            raise ValueError("Jumlah sesi maksimum minimal 1")
+
+        self.logger = SystemLogger()
+        self._router = RouterStdio()
+        self._executor = None
+        self._sesi_aktif = set()      # SesiIO yang sedang berjalan (diakses dari event loop)
+        self._server = None
+
+    def jalankan(self):
+        """Jalankan server sampai dihentikan (Ctrl+C)"""
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            self.logger.info("Server dihentikan")
+
+    async def serve(self):
+        """Coroutine utama server (bisa dipakai dari event loop lain)"""
+        self._executor = ThreadPoolExecutor(max_workers=self.maks_sesi, thread_name_prefix="sesi")
+        self._router.aktifkan()
+        self._server = await asyncio.start_server(self._tangani_client, self.host, self.port)
+        alamat = ", ".join(str(sock.getsockname()) for sock in self._server.sockets)
+        self.logger.info(f"Server akademik berjalan di {alamat} (maks {self.maks_sesi} sesi)")
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            await self._tutup()
+
+    @property
+    def jumlah_sesi(self):
+        return len(self._sesi_aktif)
+
+    # ============ Per koneksi (event loop) ============
+
+    async def _tangani_client(self, reader, writer):
+        peer = writer.get_extra_info("peername")
+        if len(self._sesi_aktif) >= self.maks_sesi:
+            writer.write("[ERROR] Server penuh, coba lagi nanti.\r\n".encode())
+            await self._tutup_writer(writer)
+            self.logger.warning(f"Koneksi {peer} ditolak: server penuh")
+            return
+
+        loop = asyncio.get_running_loop()
+        sesi_io = SesiIO(loop, writer, batas_idle=self.batas_idle)
+        self._sesi_aktif.add(sesi_io)
+        pompa = asyncio.create_task(self._pompa_input(reader, sesi_io))
+        self.logger.info(f"Sesi baru dari {peer} ({len(self._sesi_aktif)} aktif)")
+        try:
+            await loop.run_in_executor(self._executor, self._jalankan_sesi, sesi_io)
+        finally:
+            pompa.cancel()
+            self._sesi_aktif.discard(sesi_io)
+            await self._tutup_writer(writer)
+            self.logger.info(f"Sesi {peer} selesai ({len(self._sesi_aktif)} aktif)")
+
+    async def _pompa_input(self, reader, sesi_io):
+        """Baca baris dari socket dan teruskan ke thread sesi"""
+        try:
+            while True:
+                data = await reader.readline()
+                if not data:
+                    break
+                sesi_io.masukkan(data.decode("utf-8", errors="replace").rstrip("\r\n") + "\n")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            sesi_io.masukkan(None)
+
+    async def _tutup_writer(self, writer):
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+    async def _tutup(self):
+        """Putus semua sesi lalu tunggu thread sesi selesai"""
+        for sesi_io in list(self._sesi_aktif):
+            sesi_io.masukkan(None)
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        self._router.nonaktifkan()
+
+    # ============ Per sesi (thread executor) ============
+
+    def _jalankan_sesi(self, sesi_io):
+        self._router.pasang(sesi_io)
+        try:
+            print("Sistem Akademik - sesi jaringan")
+            self.sistem.jalankan()
+        except SesiTerputus:
+            pass
+        except Exception as e:
+            self.logger.error("Sesi berhenti karena error", e)
+        finally:
+            self._router.lepas()
@@ -4,6 +4,9 @@ Helper class untuk UI dan input validation.
 Menangani display dan input yang berulang di menu-menu.
 """
 
+from abc import ABC, abstractmethod
+from itertools import islice
+
 
 class MenuInputError(Exception):
     """Custom exception untuk input validation"""
@@ -171,56 +174,246 @@ class MenuDisplay:
         input(f"\n{message}")
 
 
+class SumberHalaman(ABC):
+    """Abstract base class sumber data untuk tampilan per halaman"""
+    
+    def __init__(self, ukuran):
+        self.ukuran = ukuran
+    
+    @abstractmethod
+    def ambil(self, nomor):
+        """
+        Ambil satu halaman.
+        
+        Args:
+            nomor: Nomor halaman (mulai 0)
+        
+        Returns:
+            List item halaman tersebut, atau list kosong jika di luar data
+        """
+        pass
+    
+    def jumlah_halaman(self):
+        """Jumlah halaman, atau None jika belum diketahui"""
+        return None
+
+
+class HalamanList(SumberHalaman):
+    """Halaman dari list/tuple yang sudah ada di memori (slice per halaman)"""
+    
+    def __init__(self, items, ukuran):
+        super().__init__(ukuran)
+        self.items = items
+    
+    def ambil(self, nomor):
+        return list(self.items[nomor * self.ukuran:(nomor + 1) * self.ukuran])
+    
+    def jumlah_halaman(self):
+        return max(1, -(-len(self.items) // self.ukuran))
+
+
+class HalamanIterator(SumberHalaman):
+    """
+    Halaman dari iterator/generator (mis. hasil filter atau cursor streaming).
+    Item ditarik hanya saat halamannya dibuka; halaman yang sudah dibuka
+    disimpan agar bisa kembali ke halaman sebelumnya.
+    """
+    
+    def __init__(self, iterable, ukuran):
+        super().__init__(ukuran)
+        self._iter = iter(iterable)
+        self._halaman = []
+        self._habis = False
+    
+    def ambil(self, nomor):
+        while len(self._halaman) <= nomor and not self._habis:
+            halaman = list(islice(self._iter, self.ukuran))
+            if halaman:
+                self._halaman.append(halaman)
+            if len(halaman) < self.ukuran:
+                self._habis = True
+        return self._halaman[nomor] if nomor < len(self._halaman) else []
+    
+    def jumlah_halaman(self):
+        return max(1, len(self._halaman)) if self._habis else None
+
+
 class MenuUI:
     """Combined helper untuk menu operations"""
     
+    # List yang lebih panjang dari ini (atau iterator) ditampilkan per halaman
+    UKURAN_HALAMAN = 20
+    
     @staticmethod
-    def show_list(items, title="Daftar Item", item_format=None):
+    def show_list(items, title="Daftar Item", item_format=None, ukuran_halaman=None, cari=None):
         """
         Display list of items dengan numbered format.
+        List panjang, iterator, atau SumberHalaman ditampilkan per halaman
+        (lihat paginate); nomor item tetap berurutan lintas halaman.
         
         Args:
-            items: List of items
+            items: List of items, iterator, atau SumberHalaman
             title: Title untuk list
             item_format: Function untuk format setiap item (optional)
+            ukuran_halaman: Jumlah item per halaman (default UKURAN_HALAMAN)
+            cari: Callable prefix -> items untuk pencarian (optional)
         """
+        def render(halaman, nomor_awal):
+            for i, item in enumerate(halaman, nomor_awal):
+                if item_format:
+                    print(f"{i}. {item_format(item)}")
+                else:
+                    print(f"{i}. {item}")
+        
+        ukuran = ukuran_halaman or MenuUI.UKURAN_HALAMAN
+        if MenuUI._perlu_halaman(items, ukuran):
+            MenuUI.paginate(items, title, render, ukuran, cari=cari)
+            return
+        
         MenuDisplay.subheader(title)
         
         if not items:
             print("(Kosong)")
             return
         
-        for i, item in enumerate(items, 1):
-            if item_format:
-                print(f"{i}. {item_format(item)}")
-            else:
-                print(f"{i}. {item}")
+        render(items, 1)
     
     @staticmethod
-    def show_data_table(data, columns, col_widths=None, title="Data"):
+    def show_data_table(data, columns, col_widths=None, title="Data", ukuran_halaman=None, cari=None):
         """
         Display data dalam format table.
+        Data panjang, iterator, atau SumberHalaman ditampilkan per halaman.
         
         Args:
-            data: List of dictionaries or objects
+            data: List of dictionaries or objects, iterator, atau SumberHalaman
             columns: List of column names/keys
             col_widths: Column widths (optional)
             title: Table title
+            ukuran_halaman: Jumlah baris per halaman (default UKURAN_HALAMAN)
+            cari: Callable prefix -> data untuk pencarian (optional)
         """
+        def render(halaman, nomor_awal):
+            MenuDisplay.table_header(columns, col_widths)
+            for row in halaman:
+                if isinstance(row, dict):
+                    values = [str(row.get(col, '-')) for col in columns]
+                else:
+                    values = [str(getattr(row, col, '-')) for col in columns]
+                MenuDisplay.table_row(values, col_widths)
+        
+        ukuran = ukuran_halaman or MenuUI.UKURAN_HALAMAN
+        if MenuUI._perlu_halaman(data, ukuran):
+            MenuUI.paginate(data, title, render, ukuran, cari=cari)
+            return
+        
         MenuDisplay.subheader(title)
         
         if not data:
             print("(Kosong)")
             return
         
-        MenuDisplay.table_header(columns, col_widths)
+        render(data, 1)
+    
+    @staticmethod
+    def pilih_item(items, title="Pilih Item", item_format=None, ukuran_halaman=None, cari=None):
+        """
+        Picker per halaman: user menavigasi lalu mengetik nomor item.
+        
+        Returns:
+            Item yang dipilih, atau None jika user keluar tanpa memilih
+        """
+        def render(halaman, nomor_awal):
+            for i, item in enumerate(halaman, nomor_awal):
+                print(f"{i}. {item_format(item) if item_format else item}")
         
-        for row in data:
-            if isinstance(row, dict):
-                values = [str(row.get(col, '-')) for col in columns]
+        return MenuUI.paginate(
+            items, title, render, ukuran_halaman or MenuUI.UKURAN_HALAMAN, cari=cari, pilih=True
+        )
+    
+    @staticmethod
+    def paginate(items, title, render, ukuran, cari=None, pilih=False):
+        """
+        Loop navigasi per halaman. Hanya halaman yang sedang dibuka yang
+        diambil dan diformat.
+        
+        Perintah: n (berikut), p (sebelum), g <nomor> (ke halaman),
+        /<prefix> (cari; '/' saja kembali ke semua data), nomor item
+        (jika pilih), q atau Enter (keluar).
+        
+        Args:
+            items: List, iterator, atau SumberHalaman
+            title: Judul daftar
+            render: Callable (item_halaman, nomor_awal) yang mencetak satu halaman
+            ukuran: Jumlah item per halaman
+            cari: Callable prefix -> items (optional)
+            pilih: Jika True, user bisa memilih item dengan nomornya
+        
+        Returns:
+            Item yang dipilih (pilih=True), selain itu None
+        """
+        semua = MenuUI._sumber(items, ukuran)
+        sumber = semua
+        nomor = 0
+        while True:
+            halaman = sumber.ambil(nomor)
+            if not halaman and nomor > 0:
+                MenuDisplay.info("Sudah di halaman terakhir")
+                nomor = (sumber.jumlah_halaman() or nomor) - 1
+                continue
+            
+            total = sumber.jumlah_halaman()
+            MenuDisplay.subheader(f"{title} - halaman {nomor + 1}" + (f"/{total}" if total else ""))
+            if halaman:
+                render(halaman, nomor * ukuran + 1)
+            else:
+                print("(Kosong)")
+            
+            bantuan = "n=berikut p=sebelum g <no>=ke halaman"
+            if cari:
+                bantuan += " /<awalan>=cari"
+            if pilih:
+                bantuan += " <no item>=pilih"
+            perintah = input(f"[{bantuan} q=keluar]: ").strip()
+            
+            if perintah in ("", "q"):
+                return None
+            elif perintah == "n":
+                nomor += 1
+            elif perintah == "p":
+                if nomor == 0:
+                    MenuDisplay.info("Sudah di halaman pertama")
+                nomor = max(0, nomor - 1)
+            elif perintah.startswith("g"):
+                try:
+                    nomor = max(0, int(perintah[1:]) - 1)
+                except ValueError:
+                    MenuDisplay.error("Format: g <nomor halaman>")
+            elif perintah.startswith("/") and cari:
+                prefix = perintah[1:].strip()
+                sumber = MenuUI._sumber(cari(prefix), ukuran) if prefix else semua
+                nomor = 0
+            elif pilih and perintah.isdigit():
+                indeks = int(perintah) - 1
+                item_halaman = sumber.ambil(indeks // ukuran) if indeks >= 0 else []
+                if indeks >= 0 and indeks % ukuran < len(item_halaman):
+                    return item_halaman[indeks % ukuran]
+                MenuDisplay.error("Nomor item tidak valid")
             else:
-                values = [str(getattr(row, col, '-')) for col in columns]
-            MenuDisplay.table_row(values, col_widths)
+                MenuDisplay.error("Perintah tidak dikenal")
+    
+    @staticmethod
+    def _sumber(items, ukuran):
+        if isinstance(items, SumberHalaman):
+            return items
+        if isinstance(items, (list, tuple)):
+            return HalamanList(items, ukuran)
+        return HalamanIterator(items, ukuran)
+    
+    @staticmethod
+    def _perlu_halaman(items, ukuran):
+        if isinstance(items, (list, tuple)):
+            return len(items) > ukuran
+        return items is not None
     
     @staticmethod
     def get_multiple_choice(items, title="Pilih item", allow_multiple=False):
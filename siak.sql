@@ -9,7 +9,8 @@ USE `siak`;
 CREATE TABLE IF NOT EXISTS `admin` (
   `id_admin` int(11) NOT NULL,
   `id_user` int(11) NOT NULL,
-  `username` varchar(100) NOT NULL
+  `username` varchar(100) NOT NULL,
+  `updated_at` timestamp(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 --
@@ -21,6 +22,36 @@ INSERT INTO `admin` (`id_admin`, `id_user`, `username`) VALUES
 
 -- --------------------------------------------------------
 
+--
+-- Struktur dari tabel `change_log`
+-- Log perubahan (insert/update/delete) yang diisi trigger di akhir file.
+-- Dipakai DBLoader.refresh() untuk menarik delta sejak id_log terakhir.
+-- `entitas`/`id_entitas` menunjuk agregat yang harus dibaca ulang:
+--   users -> id_user, admin -> id_admin, dosen -> id_dosen,
+--   mahasiswa -> id_mahasiswa, mata_kuliah -> id_mk,
+--   krs -> id_krs (termasuk krs_detail), presensi -> id_presensi
+--   (termasuk presensi_detail), nilai -> id_mahasiswa dengan id_terkait = id_mk.
+-- Baris yang sudah tidak ada saat dibaca ulang = dihapus (tombstone).
+-- Entri lama boleh dipangkas (DELETE ... WHERE waktu < ...); node yang
+-- tertinggal melewati entri yang dipangkas akan load ulang penuh.
+-- Database lama: jalankan CREATE TABLE ini, blok trigger di akhir file dan
+--   ALTER TABLE <tabel> ADD `updated_at` timestamp(6) NOT NULL
+--     DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+--
+
+CREATE TABLE IF NOT EXISTS `change_log` (
+  `id_log` bigint(20) NOT NULL AUTO_INCREMENT,
+  `entitas` varchar(32) NOT NULL,
+  `id_entitas` int(11) NOT NULL,
+  `id_terkait` int(11) DEFAULT NULL,
+  `aksi` enum('insert','update','delete') NOT NULL,
+  `waktu` timestamp(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+  PRIMARY KEY (`id_log`),
+  KEY `waktu` (`waktu`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Struktur dari tabel `dosen`
 --
@@ -29,7 +60,8 @@ CREATE TABLE `dosen` (
   `id_dosen` int(11) NOT NULL,
   `id_user` int(11) NOT NULL,
   `nidn` varchar(30) NOT NULL,
-  `departemen` varchar(100) DEFAULT NULL
+  `departemen` varchar(100) DEFAULT NULL,
+  `updated_at` timestamp(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 --
@@ -42,6 +74,20 @@ INSERT INTO `dosen` (`id_dosen`, `id_user`, `nidn`, `departemen`) VALUES
 
 -- --------------------------------------------------------
 
+--
+-- Struktur dari tabel `jurnal_flush`
+-- Posisi (seq) jurnal write-behind yang sudah di-commit, per instance aplikasi.
+-- Database lama: cukup jalankan CREATE TABLE ini saja.
+--
+
+CREATE TABLE IF NOT EXISTS `jurnal_flush` (
+  `id_jurnal` varchar(64) NOT NULL,
+  `seq_terakhir` bigint(20) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`id_jurnal`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Struktur dari tabel `krs`
 --
@@ -50,7 +96,8 @@ CREATE TABLE `krs` (
   `id_krs` int(11) NOT NULL,
   `id_mahasiswa` int(11) NOT NULL,
   `semester` int(11) NOT NULL,
-  `tahun_ajaran` varchar(20) NOT NULL
+  `tahun_ajaran` varchar(20) NOT NULL,
+  `updated_at` timestamp(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 --
@@ -73,7 +120,8 @@ INSERT INTO `krs` (`id_krs`, `id_mahasiswa`, `semester`, `tahun_ajaran`) VALUES
 CREATE TABLE `krs_detail` (
   `id_krs_detail` int(11) NOT NULL,
   `id_krs` int(11) NOT NULL,
-  `id_mk` int(11) NOT NULL
+  `id_mk` int(11) NOT NULL,
+  `updated_at` timestamp(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 --
@@ -100,7 +148,8 @@ CREATE TABLE `mahasiswa` (
   `id_user` int(11) NOT NULL,
   `nim` varchar(20) NOT NULL,
   `prodi` varchar(50) DEFAULT NULL,
-  `angkatan` int(11) DEFAULT NULL
+  `angkatan` int(11) DEFAULT NULL,
+  `updated_at` timestamp(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 --
@@ -122,7 +171,8 @@ CREATE TABLE `mata_kuliah` (
   `kode_mk` varchar(20) NOT NULL,
   `nama_mk` varchar(100) NOT NULL,
   `sks` int(11) NOT NULL,
-  `id_dosen` int(11) DEFAULT NULL
+  `id_dosen` int(11) DEFAULT NULL,
+  `updated_at` timestamp(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 --
@@ -141,6 +191,9 @@ INSERT INTO `mata_kuliah` (`id_mk`, `kode_mk`, `nama_mk`, `sks`, `id_dosen`) VAL
 
 --
 -- Struktur dari tabel `nilai`
+-- `bobot` = bobot IPK dari skala grading yang menghasilkan `nilai_huruf`;
+-- NULL (nilai lama) berarti bobot diambil dari tabel BOBOT_HURUF aplikasi.
+-- Database lama: ALTER TABLE `nilai` ADD `bobot` decimal(3,2) DEFAULT NULL AFTER `nilai_huruf`;
 --
 
 CREATE TABLE `nilai` (
@@ -148,7 +201,9 @@ CREATE TABLE `nilai` (
   `id_mahasiswa` int(11) NOT NULL,
   `id_mk` int(11) NOT NULL,
   `nilai_angka` decimal(5,2) DEFAULT NULL,
-  `nilai_huruf` char(2) DEFAULT NULL
+  `nilai_huruf` char(2) DEFAULT NULL,
+  `bobot` decimal(3,2) DEFAULT NULL,
+  `updated_at` timestamp(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 --
@@ -162,6 +217,33 @@ INSERT INTO `nilai` (`id_nilai`, `id_mahasiswa`, `id_mk`, `nilai_angka`, `nilai_
 
 -- --------------------------------------------------------
 
+--
+-- Struktur dari tabel `presensi`
+--
+
+CREATE TABLE `presensi` (
+  `id_presensi` int(11) NOT NULL,
+  `id_dosen` int(11) NOT NULL,
+  `id_mk` int(11) NOT NULL,
+  `tanggal` date NOT NULL,
+  `updated_at` timestamp(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- --------------------------------------------------------
+
+--
+-- Struktur dari tabel `presensi_detail`
+--
+
+CREATE TABLE `presensi_detail` (
+  `id_presensi_detail` int(11) NOT NULL,
+  `id_presensi` int(11) NOT NULL,
+  `id_mahasiswa` int(11) NOT NULL,
+  `updated_at` timestamp(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Struktur dari tabel `users`
 --
@@ -171,7 +253,8 @@ CREATE TABLE `users` (
   `nama` varchar(100) NOT NULL,
   `email` varchar(100) NOT NULL,
   `password` varchar(100) NOT NULL,
-  `role` enum('mahasiswa','dosen','admin') NOT NULL
+  `role` enum('mahasiswa','dosen','admin') NOT NULL,
+  `updated_at` timestamp(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 --
@@ -239,11 +322,32 @@ ALTER TABLE `mata_kuliah`
 --
 -- Indeks untuk tabel `nilai`
 --
+-- Satu nilai per (mahasiswa, mata kuliah); dipakai untuk upsert
+-- INSERT ... ON DUPLICATE KEY UPDATE di NilaiRepository.
+-- Untuk database lama: hapus duplikat dulu, lalu
+--   ALTER TABLE `nilai` DROP INDEX `id_mahasiswa`,
+--     ADD UNIQUE KEY `uniq_nilai_mahasiswa_mk` (`id_mahasiswa`, `id_mk`);
 ALTER TABLE `nilai`
   ADD PRIMARY KEY (`id_nilai`),
-  ADD KEY `id_mahasiswa` (`id_mahasiswa`),
+  ADD UNIQUE KEY `uniq_nilai_mahasiswa_mk` (`id_mahasiswa`, `id_mk`),
   ADD KEY `id_mk` (`id_mk`);
 
+--
+-- Indeks untuk tabel `presensi`
+--
+ALTER TABLE `presensi`
+  ADD PRIMARY KEY (`id_presensi`),
+  ADD KEY `id_mk_tanggal` (`id_mk`, `tanggal`),
+  ADD KEY `id_dosen` (`id_dosen`);
+
+--
+-- Indeks untuk tabel `presensi_detail`
+--
+ALTER TABLE `presensi_detail`
+  ADD PRIMARY KEY (`id_presensi_detail`),
+  ADD UNIQUE KEY `uniq_presensi_mahasiswa` (`id_presensi`, `id_mahasiswa`),
+  ADD KEY `id_mahasiswa` (`id_mahasiswa`);
+
 --
 -- Indeks untuk tabel `users`
 --
@@ -297,6 +401,18 @@ ALTER TABLE `mata_kuliah`
 ALTER TABLE `nilai`
   MODIFY `id_nilai` int(11) NOT NULL AUTO_INCREMENT, AUTO_INCREMENT=7;
 
+--
+-- AUTO_INCREMENT untuk tabel `presensi`
+--
+ALTER TABLE `presensi`
+  MODIFY `id_presensi` int(11) NOT NULL AUTO_INCREMENT, AUTO_INCREMENT=1;
+
+--
+-- AUTO_INCREMENT untuk tabel `presensi_detail`
+--
+ALTER TABLE `presensi_detail`
+  MODIFY `id_presensi_detail` int(11) NOT NULL AUTO_INCREMENT, AUTO_INCREMENT=1;
+
 --
 -- AUTO_INCREMENT untuk tabel `users`
 --
@@ -350,6 +466,91 @@ ALTER TABLE `mata_kuliah`
 ALTER TABLE `nilai`
   ADD CONSTRAINT `nilai_ibfk_1` FOREIGN KEY (`id_mahasiswa`) REFERENCES `mahasiswa` (`id_mahasiswa`),
   ADD CONSTRAINT `nilai_ibfk_2` FOREIGN KEY (`id_mk`) REFERENCES `mata_kuliah` (`id_mk`);
+
+--
+-- Ketidakleluasaan untuk tabel `presensi`
+--
+ALTER TABLE `presensi`
+  ADD CONSTRAINT `presensi_ibfk_1` FOREIGN KEY (`id_dosen`) REFERENCES `dosen` (`id_dosen`),
+  ADD CONSTRAINT `presensi_ibfk_2` FOREIGN KEY (`id_mk`) REFERENCES `mata_kuliah` (`id_mk`);
+
+--
+-- Ketidakleluasaan untuk tabel `presensi_detail`
+--
+ALTER TABLE `presensi_detail`
+  ADD CONSTRAINT `presensi_detail_ibfk_1` FOREIGN KEY (`id_presensi`) REFERENCES `presensi` (`id_presensi`),
+  ADD CONSTRAINT `presensi_detail_ibfk_2` FOREIGN KEY (`id_mahasiswa`) REFERENCES `mahasiswa` (`id_mahasiswa`);
+--
+-- Trigger change_log (lihat struktur tabel `change_log`)
+--
+
+-- users: hanya update; insert/delete akun selalu bersama baris admin/dosen/mahasiswa
+CREATE TRIGGER `trg_users_u` AFTER UPDATE ON `users` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('users', NEW.`id_user`, NULL, 'update');
+
+CREATE TRIGGER `trg_admin_i` AFTER INSERT ON `admin` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('admin', NEW.`id_admin`, NULL, 'insert');
+CREATE TRIGGER `trg_admin_u` AFTER UPDATE ON `admin` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('admin', NEW.`id_admin`, NULL, 'update');
+CREATE TRIGGER `trg_admin_d` AFTER DELETE ON `admin` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('admin', OLD.`id_admin`, NULL, 'delete');
+
+CREATE TRIGGER `trg_dosen_i` AFTER INSERT ON `dosen` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('dosen', NEW.`id_dosen`, NULL, 'insert');
+CREATE TRIGGER `trg_dosen_u` AFTER UPDATE ON `dosen` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('dosen', NEW.`id_dosen`, NULL, 'update');
+CREATE TRIGGER `trg_dosen_d` AFTER DELETE ON `dosen` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('dosen', OLD.`id_dosen`, NULL, 'delete');
+
+CREATE TRIGGER `trg_mahasiswa_i` AFTER INSERT ON `mahasiswa` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('mahasiswa', NEW.`id_mahasiswa`, NULL, 'insert');
+CREATE TRIGGER `trg_mahasiswa_u` AFTER UPDATE ON `mahasiswa` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('mahasiswa', NEW.`id_mahasiswa`, NULL, 'update');
+CREATE TRIGGER `trg_mahasiswa_d` AFTER DELETE ON `mahasiswa` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('mahasiswa', OLD.`id_mahasiswa`, NULL, 'delete');
+
+CREATE TRIGGER `trg_mata_kuliah_i` AFTER INSERT ON `mata_kuliah` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('mata_kuliah', NEW.`id_mk`, NULL, 'insert');
+CREATE TRIGGER `trg_mata_kuliah_u` AFTER UPDATE ON `mata_kuliah` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('mata_kuliah', NEW.`id_mk`, NULL, 'update');
+CREATE TRIGGER `trg_mata_kuliah_d` AFTER DELETE ON `mata_kuliah` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('mata_kuliah', OLD.`id_mk`, NULL, 'delete');
+
+CREATE TRIGGER `trg_krs_i` AFTER INSERT ON `krs` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('krs', NEW.`id_krs`, NULL, 'insert');
+CREATE TRIGGER `trg_krs_u` AFTER UPDATE ON `krs` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('krs', NEW.`id_krs`, NULL, 'update');
+CREATE TRIGGER `trg_krs_d` AFTER DELETE ON `krs` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('krs', OLD.`id_krs`, NULL, 'delete');
+
+CREATE TRIGGER `trg_krs_detail_i` AFTER INSERT ON `krs_detail` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('krs', NEW.`id_krs`, NULL, 'insert');
+CREATE TRIGGER `trg_krs_detail_u` AFTER UPDATE ON `krs_detail` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('krs', OLD.`id_krs`, NULL, 'update'), ('krs', NEW.`id_krs`, NULL, 'update');
+CREATE TRIGGER `trg_krs_detail_d` AFTER DELETE ON `krs_detail` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('krs', OLD.`id_krs`, NULL, 'delete');
+
+CREATE TRIGGER `trg_nilai_i` AFTER INSERT ON `nilai` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('nilai', NEW.`id_mahasiswa`, NEW.`id_mk`, 'insert');
+CREATE TRIGGER `trg_nilai_u` AFTER UPDATE ON `nilai` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('nilai', OLD.`id_mahasiswa`, OLD.`id_mk`, 'update'), ('nilai', NEW.`id_mahasiswa`, NEW.`id_mk`, 'update');
+CREATE TRIGGER `trg_nilai_d` AFTER DELETE ON `nilai` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('nilai', OLD.`id_mahasiswa`, OLD.`id_mk`, 'delete');
+
+CREATE TRIGGER `trg_presensi_i` AFTER INSERT ON `presensi` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('presensi', NEW.`id_presensi`, NULL, 'insert');
+CREATE TRIGGER `trg_presensi_u` AFTER UPDATE ON `presensi` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('presensi', NEW.`id_presensi`, NULL, 'update');
+CREATE TRIGGER `trg_presensi_d` AFTER DELETE ON `presensi` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('presensi', OLD.`id_presensi`, NULL, 'delete');
+
+CREATE TRIGGER `trg_presensi_detail_i` AFTER INSERT ON `presensi_detail` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('presensi', NEW.`id_presensi`, NULL, 'insert');
+CREATE TRIGGER `trg_presensi_detail_u` AFTER UPDATE ON `presensi_detail` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('presensi', OLD.`id_presensi`, NULL, 'update'), ('presensi', NEW.`id_presensi`, NULL, 'update');
+CREATE TRIGGER `trg_presensi_detail_d` AFTER DELETE ON `presensi_detail` FOR EACH ROW
+  INSERT INTO `change_log` (`entitas`, `id_entitas`, `id_terkait`, `aksi`) VALUES ('presensi', OLD.`id_presensi`, NULL, 'delete');
+
 COMMIT;
 
 /*!40101 SET CHARACTER_SET_CLIENT=@OLD_CHARACTER_SET_CLIENT */;
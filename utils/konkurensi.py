@@ -0,0 +1,168 @@
+"""
+utils/konkurensi.py
+Primitif konkurensi untuk AppState yang dipakai banyak sesi/thread sekaligus.
+
+- KunciRW: reader-writer lock (writer diprioritaskan, re-entrant untuk writer)
+- KunciAgregat: kunci RW per agregat (KRS per mahasiswa, presensi per jadwal,
+  nilai per mata kuliah) dengan lock striping agar jumlah lock tetap terbatas
+- PenghitungID: alokasi ID berurutan yang atomik
+- dengan_kunci: decorator method yang dijalankan di bawah lock milik objeknya
+"""
+
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+
+class KunciRW:
+    """
+    Reader-writer lock.
+
+    Banyak pembaca boleh masuk bersamaan; penulis eksklusif. Penulis yang
+    menunggu menahan pembaca baru agar tidak kelaparan. Thread pemegang kunci
+    tulis boleh masuk lagi (tulis atau baca) tanpa deadlock.
+    """
+
+    def __init__(self):
+        self._kondisi = threading.Condition(threading.Lock())
+        self._pembaca = 0
+        self._penulis = None          # ident thread pemegang kunci tulis
+        self._kedalaman = 0           # jumlah masuk ulang oleh penulis
+        self._menunggu_tulis = 0
+
+    def acquire_baca(self):
+        saya = threading.get_ident()
+        with self._kondisi:
+            if self._penulis == saya:
+                self._kedalaman += 1
+                return
+            while self._penulis is not None or self._menunggu_tulis:
+                self._kondisi.wait()
+            self._pembaca += 1
+
+    def release_baca(self):
+        with self._kondisi:
+            if self._penulis == threading.get_ident():
+                self._kedalaman -= 1
+                return
+            self._pembaca -= 1
+            if self._pembaca == 0:
+                self._kondisi.notify_all()
+
+    def acquire_tulis(self):
+        saya = threading.get_ident()
+        with self._kondisi:
+            if self._penulis == saya:
+                self._kedalaman += 1
+                return
+            self._menunggu_tulis += 1
+            try:
+                while self._penulis is not None or self._pembaca:
+                    self._kondisi.wait()
+            finally:
+                self._menunggu_tulis -= 1
+            self._penulis = saya
+            self._kedalaman = 1
+
+    def release_tulis(self):
+        with self._kondisi:
+            self._kedalaman -= 1
+            if self._kedalaman == 0:
+                self._penulis = None
+                self._kondisi.notify_all()
+
+    @contextmanager
+    def baca(self):
+        self.acquire_baca()
+        try:
+            yield
+        finally:
+            self.release_baca()
+
+    @contextmanager
+    def tulis(self):
+        self.acquire_tulis()
+        try:
+            yield
+        finally:
+            self.release_tulis()
+
+
+class KunciAgregat:
+    """
+    Kunci RW per agregat, dialamatkan dengan (jenis, kunci).
+
+    Agregat dipetakan ke salah satu `jumlah_stripe` KunciRW berdasarkan hash,
+    jadi 200 ribu mahasiswa tidak butuh 200 ribu objek lock. Dua agregat yang
+    kebetulan berbagi stripe hanya saling menunggu, tidak pernah deadlock,
+    selama satu thread memegang paling banyak satu kunci agregat sekaligus
+    (kunci stripe re-entrant untuk thread yang sama).
+    """
+
+    KRS = "krs"                # kunci: id mahasiswa
+    PRESENSI = "presensi"      # kunci: AppState.kunci_jadwal(dosen, mk, tanggal)
+    NILAI = "nilai"            # kunci: objek MataKuliah (tetap sama saat MK write-behind mendapat id_mk)
+
+    def __init__(self, jumlah_stripe=256):
+        if jumlah_stripe < 1:
+            raise ValueError("Jumlah stripe minimal 1")
+        self._stripe = [KunciRW() for _ in range(jumlah_stripe)]
+
+    def kunci(self, jenis, kunci):
+        """KunciRW untuk agregat (jenis, kunci)"""
+        return self._stripe[hash((jenis, kunci)) % len(self._stripe)]
+
+    def baca(self, jenis, kunci):
+        """Context manager baca konsisten satu agregat (pembacaan biasa tidak perlu kunci)"""
+        return self.kunci(jenis, kunci).baca()
+
+    def tulis(self, jenis, kunci):
+        """Context manager untuk cek-lalu-ubah satu agregat secara atomik"""
+        return self.kunci(jenis, kunci).tulis()
+
+
+class PenghitungID:
+    """Alokasi ID berurutan yang aman dipanggil dari banyak thread"""
+
+    def __init__(self, mulai=1):
+        self._lock = threading.Lock()
+        self._berikutnya = mulai
+
+    @property
+    def berikutnya(self):
+        """ID yang akan dialokasikan berikutnya (tanpa mengalokasikan)"""
+        return self._berikutnya
+
+    def ambil(self):
+        """Alokasikan satu ID baru"""
+        with self._lock:
+            nilai = self._berikutnya
+            self._berikutnya += 1
+            return nilai
+
+    def atur(self, nilai):
+        """Set ulang ID berikutnya (mis. saat state di-reset loader)"""
+        with self._lock:
+            self._berikutnya = nilai
+
+    def naikkan_ke(self, minimal):
+        """Pastikan ID berikutnya >= minimal (ID yang sudah dipakai database tidak dialokasikan lagi)"""
+        with self._lock:
+            if self._berikutnya < minimal:
+                self._berikutnya = minimal
+
+
+def dengan_kunci(atribut):
+    """
+    Decorator: jalankan method di bawah lock `self.<atribut>`.
+
+    Args:
+        atribut: Nama atribut lock (threading.Lock/RLock) di objek pemilik method
+    """
+    def dekorator(fungsi):
+        @wraps(fungsi)
+        def pembungkus(self, *args, **kwargs):
+            with getattr(self, atribut):
+                return fungsi(self, *args, **kwargs)
+        return pembungkus
+    return dekorator